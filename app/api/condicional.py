@@ -0,0 +1,44 @@
+"""Validación condicional HTTP (ETag / If-None-Match) y políticas Cache-Control.
+
+El ETag se arma con datos baratos (contadores de versión, ids, parámetros),
+nunca con el cuerpo: así el 304 sale antes de ejecutar la consulta costosa.
+"""
+import hashlib
+
+from fastapi import Request, Response
+
+# Datos del usuario: el navegador guarda la copia pero revalida siempre
+PRIVADA_REVALIDAR = "private, no-cache"
+# Catálogos: pueden usarse un rato sin revalidar
+PRIVADA_CORTA = "private, max-age=300"
+
+
+class NoModificado(Exception):
+    def __init__(self, etag: str, cache_control: str):
+        self.etag = etag
+        self.cache_control = cache_control
+
+
+def etag_de(*partes) -> str:
+    crudo = "|".join(str(p) for p in partes).encode()
+    return f'W/"{hashlib.sha1(crudo).hexdigest()[:20]}"'
+
+
+def coincide(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # Comparación débil: W/"x" y "x" son equivalentes para If-None-Match
+    candidatos = {e.strip().removeprefix("W/") for e in if_none_match.split(",")}
+    return "*" in candidatos or etag.removeprefix("W/") in candidatos
+
+
+def validar(request: Request, response: Response, etag: str, cache_control: str = PRIVADA_REVALIDAR) -> None:
+    """Lanza NoModificado (-> 304) si el cliente ya tiene esta versión; si no, deja las cabeceras."""
+    if coincide(request.headers.get("if-none-match"), etag):
+        raise NoModificado(etag, cache_control)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+async def manejar_no_modificado(request: Request, exc: NoModificado) -> Response:
+    return Response(status_code=304, headers={"ETag": exc.etag, "Cache-Control": exc.cache_control})
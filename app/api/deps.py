@@ -1,38 +1,34 @@
 # app/api/deps.py
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 
-from app.core.config import settings
 from app.db.database import get_db
-from app.db.models.user import User
+# Una sola implementación (con cache de usuario) en app/core/security.py
+from app.core.security import get_current_user, oauth2_scheme
+from app.services.permisos import resolver_permisos
+from app.services.user_cache import UsuarioActual
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")  # con slash
+__all__ = ["get_current_user", "oauth2_scheme", "require"]
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="No se pudo validar el token",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
 
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
-        user_id_str = payload.get("sub")
-        if user_id_str is None:
-            raise credentials_exception
-        user_id = int(user_id_str)
-    except (JWTError, ValueError):
-        raise credentials_exception
+def require(*codigos: str):
+    """Dependencia que exige todos los permisos indicados (por Permiso.codigo).
 
-    result = await db.execute(select(User).where(User.ID_Usuario == user_id))
-    user = result.scalar_one_or_none()
-    if user is None:
-        raise credentials_exception
+    Uso: `current_user = Depends(require("prestamo.aprobar"))`
+    """
 
-    return user
+    async def verificar_permisos(
+        current_user: UsuarioActual = Depends(get_current_user),
+        # Permisos del primario: un permiso revocado no debe seguir valiendo por el retraso de la réplica
+        db: AsyncSession = Depends(get_db),
+    ) -> UsuarioActual:
+        permisos = await resolver_permisos.permisos_de(db, current_user.ID_Usuario)
+        faltantes = [c for c in codigos if not resolver_permisos.tiene(permisos, c)]
+        if faltantes:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Permiso requerido: {', '.join(faltantes)}",
+            )
+        return current_user
+
+    return verificar_permisos
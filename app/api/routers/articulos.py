@@ -0,0 +1,46 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, File, HTTPException, Path, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import require
+from app.core.config import settings
+from app.db.database import get_db
+from app.db.models.articulo import Articulo
+from app.services.fotos import FotoInvalida, subir_fotos
+from app.utils.almacen import ArchivoDemasiadoGrande
+from app.utils.auditoria import registrar_auditoria
+
+router = APIRouter()
+
+
+@router.post("/{id_articulo}/fotos", status_code=status.HTTP_201_CREATED)
+async def subir_fotos_articulo(
+    id_articulo: int = Path(..., ge=1),
+    fotos: list[UploadFile] = File(..., description="Varias fotos por solicitud (jpeg, png, webp)"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require("articulo.subir_fotos")),
+):
+    if len(fotos) > settings.FOTOS_MAX_POR_SOLICITUD:
+        raise HTTPException(status_code=400, detail=f"Máximo {settings.FOTOS_MAX_POR_SOLICITUD} fotos por solicitud")
+    if await db.get(Articulo, id_articulo) is None:
+        raise HTTPException(status_code=404, detail="Artículo no encontrado")
+
+    try:
+        subidas = await subir_fotos(db, id_articulo, fotos)
+    except ArchivoDemasiadoGrande as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except FotoInvalida as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    nuevas = [s.id_foto for s in subidas if not s.duplicada]
+    if nuevas:
+        await registrar_auditoria(
+            db=db,
+            usuario_id=current_user.ID_Usuario,
+            accion="SUBIR_FOTOS",
+            modulo="Articulo",
+            detalle=f"Artículo ID {id_articulo}: fotos {nuevas} subidas por usuario {current_user.ID_Usuario}",
+        )
+    await db.commit()
+    return [asdict(s) for s in subidas]
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -6,18 +6,17 @@ from app.db.database import get_db
 from app.schemas.auth import UserRegister, UserLogin, UserResponse, GoogleToken
 from app.services.auth_service import AuthService
 from app.core.security import create_access_token
+from app.api.condicional import etag_de, validar
 from app.api.deps import get_current_user
 from app.db.models.user import User
+from app.services.user_cache import UsuarioActual
 from app.core.config import settings
 
-# Verificación de ID token de Google
-from google.oauth2 import id_token as google_id_token
-from google.auth.transport import requests as google_requests
+# Verificación local de ID tokens de Google (certificados en memoria)
+from app.services.google_verifier import verificador_google, CertificadosNoDisponibles
 
 import secrets
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.utils.hashing import hash_password_async
 
 router = APIRouter()
 
@@ -50,7 +49,7 @@ async def login_user(data: UserLogin, db: AsyncSession = Depends(get_db)):
     if not user:
         raise HTTPException(status_code=401, detail="Credenciales inválidas")
 
-    access_token = create_access_token({"sub": str(user.ID_Usuario)})
+    access_token = create_access_token({"sub": str(user.ID_Usuario), "ver": user.Token_version or 0})
     return {"access_token": access_token, "token_type": "bearer"}
 
 
@@ -59,11 +58,9 @@ async def login_user(data: UserLogin, db: AsyncSession = Depends(get_db)):
 async def login_with_google(payload: GoogleToken, db: AsyncSession = Depends(get_db)):
     # 1) Verificar token de Google usando tu CLIENT_ID como audiencia
     try:
-        info = google_id_token.verify_oauth2_token(
-            payload.id_token,
-            google_requests.Request(),
-            settings.GOOGLE_CLIENT_ID,  # audiencia
-        )
+        info = await verificador_google.verificar(payload.id_token)
+    except CertificadosNoDisponibles:
+        raise HTTPException(status_code=503, detail="No se pudo validar con Google, intente de nuevo")
     except Exception:
         raise HTTPException(status_code=401, detail="Token de Google inválido")
 
@@ -90,7 +87,7 @@ async def login_with_google(payload: GoogleToken, db: AsyncSession = Depends(get
     result = await db.execute(select(User).where(User.Correo == email))
     user = result.scalar_one_or_none()
     if user is None:
-        dummy = pwd_context.hash(secrets.token_urlsafe(16))
+        dummy = await hash_password_async(secrets.token_urlsafe(16))
         user = User(
             Nombre=nombre,
             Correo=email,
@@ -103,10 +100,16 @@ async def login_with_google(payload: GoogleToken, db: AsyncSession = Depends(get
         await db.refresh(user)
 
     # 4) Emitir JWT
-    access_token = create_access_token({"sub": str(user.ID_Usuario)})
+    access_token = create_access_token({"sub": str(user.ID_Usuario), "ver": user.Token_version or 0})
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/me")
-async def read_profile(current_user: User = Depends(get_current_user)):
+async def read_profile(
+    request: Request,
+    response: Response,
+    current_user: UsuarioActual = Depends(get_current_user),
+):
+    # Del usuario ya cacheado: sin consulta para responder 304
+    validar(request, response, etag_de("me", current_user.ID_Usuario, current_user.Token_version, current_user.Updated_At))
     return {"usuario": current_user.Nombre, "email": current_user.Correo}
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import require
+from app.db.database import get_db, get_read_db
+from app.services import cartera
+
+router = APIRouter()
+
+
+@router.get("/aging")
+async def aging_cartera(
+    id_tipo: int | None = None,
+    id_estado: int | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(require("cartera.ver")),
+):
+    return await cartera.consultar(db, id_tipo, id_estado)
+
+
+@router.post("/reconstruir")
+async def reconstruir_cartera(
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require("cartera.reconstruir")),
+):
+    total = await cartera.reconstruir(db)
+    return {"prestamos": total}
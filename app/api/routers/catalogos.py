@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.condicional import PRIVADA_CORTA, etag_de, validar
+from app.api.deps import get_current_user, require
+from app.db.database import get_db
+from app.services.catalogos import CatalogoIncompleto, catalogos, registro_catalogos
+
+router = APIRouter()
+
+
+def _serializar() -> dict:
+    actual = catalogos()
+    return {
+        nombre: [{"id": i, "nombre": n} for i, n in getattr(actual, nombre).por_id.items()]
+        for nombre in ("estado_solicitud", "estado_articulo", "estado_prestamo",
+                       "estado_pago", "estado_inventario", "tipo_articulo")
+    }
+
+
+@router.get("")
+async def listar_catalogos(request: Request, response: Response, current_user=Depends(get_current_user)):
+    validar(request, response, etag_de("catalogos", catalogos().version), PRIVADA_CORTA)
+    return _serializar()
+
+
+@router.post("/recargar")
+async def recargar_catalogos(
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require("catalogo.recargar")),
+):
+    try:
+        actual = await registro_catalogos.cargar(db)
+    except CatalogoIncompleto as e:
+        # Se conserva el catálogo anterior
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"recargado_en": actual.cargado_en}
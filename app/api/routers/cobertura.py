@@ -0,0 +1,30 @@
+from dataclasses import asdict
+from datetime import datetime
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user
+from app.db.database import get_read_db
+from app.schemas.cobertura import DireccionVerificar, VerificacionLote, VerificacionOut
+from app.services.cobertura import Verificacion, indice_cobertura
+
+router = APIRouter()
+
+
+def verificar_direccion(d: DireccionVerificar, momento: datetime) -> Verificacion:
+    return indice_cobertura.verificar_entrega(
+        d.direccion, d.departamento, d.municipio, d.zona, d.colonia, d.valor, momento
+    )
+
+
+@router.post("/verificar", response_model=list[VerificacionOut])
+async def verificar_lote(
+    payload: VerificacionLote,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_current_user),
+):
+    # Una sola carga del índice; cada dirección se resuelve en memoria
+    await indice_cobertura.asegurar(db)
+    momento = payload.momento or datetime.now()
+    return [asdict(verificar_direccion(d, momento)) for d in payload.direcciones]
@@ -0,0 +1,24 @@
+from dataclasses import asdict
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import require
+from app.db.database import get_db
+from app.services.cobranza import planificar_cobranza
+
+router = APIRouter()
+
+
+@router.post("/rutas/planificar")
+async def planificar_rutas(
+    fecha: date | None = None,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require("cobranza.planificar")),
+):
+    try:
+        plan = await planificar_cobranza(db, fecha or date.today())
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return asdict(plan)
@@ -1,12 +1,37 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.database import get_db
-from sqlalchemy import text
+from fastapi import APIRouter, Response, status
+
+from app.db.database import estadisticas_pool
+from app.services.salud import monitor_salud
 
 router = APIRouter()
 
+
 @router.get("")
-async def health_check(db: AsyncSession = Depends(get_db)):
-    await db.execute(text("SELECT 1"))
+async def health_check(response: Response):
+    # Mismo criterio que /health/ready (fallos consecutivos, pool saturado, apagando),
+    # con el cuerpo de siempre; no abre sesión ni toma conexión del pool
+    estado = monitor_salud.estado
+    if not estado.listo:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": f"error - {estado.motivo}"}
     return {"status": "ok - conectado a BD"}
 
+
+@router.get("/live")
+async def liveness():
+    """El proceso y su event loop responden; no depende de la BD."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def readiness(response: Response):
+    """Listo para recibir tráfico según la última muestra de fondo (BD y pool)."""
+    estado = monitor_salud.estado
+    if not estado.listo:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return estado.como_dict()
+
+
+@router.get("/pool")
+async def pool_stats():
+    return estadisticas_pool()
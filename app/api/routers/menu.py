@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.condicional import etag_de, validar
+from app.api.deps import get_current_user
+from app.db.database import get_db, get_read_db
+from app.services import versiones
+from app.services.menus import arboles_menu
+from app.services.permisos import resolver_permisos
+
+router = APIRouter()
+
+
+@router.get("")
+async def menu_usuario(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    primario: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    # Roles y árbol salen de cache; la versión del ETag sí es una consulta por
+    # llave primaria en cada petición. Los permisos van al cache compartido con
+    # require(): se compilan del primario
+    permisos = await resolver_permisos.permisos_de(primario, current_user.ID_Usuario)
+    version = await versiones.version(db, versiones.MENU)
+    validar(request, response, etag_de("menu", version, sorted(permisos.roles)))
+    return await arboles_menu.arbol_para(db, permisos.roles)
@@ -0,0 +1,17 @@
+import secrets
+
+from fastapi import APIRouter, Header, HTTPException, Response, status
+
+from app.core.config import settings
+from app.core.metricas import TIPO_CONTENIDO, registro
+
+router = APIRouter()
+
+
+@router.get("", include_in_schema=False)
+async def metricas(authorization: str | None = Header(None)):
+    if settings.METRICAS_TOKEN and not secrets.compare_digest(
+        authorization or "", f"Bearer {settings.METRICAS_TOKEN}"
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="No autorizado")
+    return Response(registro.exponer(), media_type=TIPO_CONTENIDO)
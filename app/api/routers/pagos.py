@@ -0,0 +1,49 @@
+from dataclasses import asdict
+from datetime import date
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import require
+from app.db.database import get_db
+from app.services.catalogos import CatalogoIncompleto
+from app.services.conciliacion import ExtractoInvalido, conciliar
+from app.utils.auditoria import registrar_auditoria
+
+router = APIRouter()
+
+
+@router.post("/conciliacion")
+async def conciliar_extracto(
+    desde: date,
+    hasta: date | None = None,
+    dry_run: bool = False,
+    delimitador: str = ",",
+    extracto: UploadFile = File(..., description="CSV del banco con columnas fecha, referencia y monto"),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require("pago.conciliar")),
+):
+    if len(delimitador) != 1:
+        raise HTTPException(status_code=400, detail="El delimitador debe ser un solo carácter")
+    try:
+        reporte = await conciliar(db, extracto.file, desde, hasta, dry_run, delimitador)
+    except ExtractoInvalido as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="El extracto debe estar en UTF-8")
+    except CatalogoIncompleto as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if not dry_run:
+        await registrar_auditoria(
+            db=db,
+            usuario_id=current_user.ID_Usuario,
+            accion="CONCILIAR_EXTRACTO",
+            modulo="Pago",
+            detalle=(
+                f"Extracto {extracto.filename} ({reporte.desde}..{reporte.hasta}): {reporte.lineas} líneas, "
+                f"{reporte.actualizados} pagos aplicados por usuario {current_user.ID_Usuario}"
+            ),
+        )
+        await db.commit()
+    return asdict(reporte)
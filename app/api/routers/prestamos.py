@@ -0,0 +1,166 @@
+from dataclasses import asdict
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.condicional import coincide
+from app.api.deps import get_current_user, require
+from app.db.database import get_db
+from app.services import contratos
+from app.services.amortizacion import generar_cuotas, simular
+from app.services.catalogos import CatalogoIncompleto
+from app.services.pagos import PagoConflicto, PagoIn, registrar_pago
+from app.services.permisos import resolver_permisos
+
+router = APIRouter()
+
+# Límites realistas para un préstamo prendario: más allá la tabla deja de tener sentido
+TASA_MENSUAL_MAX = Decimal("0.20")
+PLAZO_MESES_MAX = 60
+
+
+class Escenario(BaseModel):
+    tasa_mensual: Decimal = Field(..., ge=0, le=TASA_MENSUAL_MAX, max_digits=7, decimal_places=6)
+    plazo_meses: int = Field(..., ge=1, le=PLAZO_MESES_MAX)
+
+
+class SimulacionIn(BaseModel):
+    monto: Decimal = Field(..., gt=0, max_digits=12, decimal_places=2)
+    fecha_inicio: date | None = None
+    escenarios: list[Escenario] = Field(..., min_length=1, max_length=500)
+    incluir_cuotas: bool = True
+
+
+class GenerarCuotasIn(BaseModel):
+    ids_prestamo: list[int] = Field(..., min_length=1, max_length=50000)
+    tasa_mensual: Decimal | None = Field(None, ge=0, le=TASA_MENSUAL_MAX, max_digits=7, decimal_places=6)
+
+
+class ReemitirContratosIn(BaseModel):
+    ids_prestamo: list[int] = Field(..., min_length=1, max_length=50000)
+
+
+class PagoEntrada(BaseModel):
+    monto: Decimal = Field(..., gt=0, max_digits=12, decimal_places=2)
+    fecha_pago: datetime | None = None
+    medio_pago: str | None = Field(None, max_length=20)
+    ref_bancaria: str | None = Field(None, max_length=60)
+    tipo_pago: str | None = Field(None, max_length=200)
+    clave_idempotencia: str | None = Field(None, max_length=80)
+
+
+@router.post("/simulacion")
+async def simular_prestamo(payload: SimulacionIn, current_user=Depends(get_current_user)):
+    # Sin BD: todos los escenarios se calculan juntos en memoria
+    inicio = payload.fecha_inicio or date.today()
+    tablas = simular(payload.monto, [(e.tasa_mensual, e.plazo_meses) for e in payload.escenarios], inicio)
+    resultado = []
+    for escenario, plan in zip(payload.escenarios, tablas):
+        intereses = sum((c.interes for c in plan), Decimal("0.00"))
+        item = {
+            "tasa_mensual": escenario.tasa_mensual,
+            "plazo_meses": escenario.plazo_meses,
+            "cuota": plan[0].monto,
+            "total_intereses": intereses,
+            "total_pagar": payload.monto + intereses,
+        }
+        if payload.incluir_cuotas:
+            item["cuotas"] = plan
+        resultado.append(item)
+    return resultado
+
+
+@router.post("/cuotas/generar")
+async def generar_cuotas_prestamos(
+    payload: GenerarCuotasIn,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require("prestamo.generar_cuotas")),
+):
+    creadas = await generar_cuotas(db, payload.ids_prestamo, payload.tasa_mensual)
+    return {"cuotas_creadas": creadas}
+
+
+@router.post("/contratos/reemitir")
+async def reemitir_contratos(
+    payload: ReemitirContratosIn,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require("contrato.reemitir")),
+):
+    return await contratos.reemitir(db, payload.ids_prestamo)
+
+
+@router.post("/{id_prestamo}/pagos", status_code=201)
+async def registrar_pago_prestamo(
+    id_prestamo: int,
+    payload: PagoEntrada,
+    response: Response,
+    idempotency_key: str | None = Header(None, max_length=80),
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require("pago.registrar")),
+):
+    pago = PagoIn(
+        id_prestamo=id_prestamo,
+        id_validador=current_user.ID_Usuario,
+        **payload.model_dump(exclude={"clave_idempotencia"}),
+        clave_idempotencia=payload.clave_idempotencia or idempotency_key,
+    )
+    try:
+        resultado = await registrar_pago(db, pago)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Préstamo no encontrado")
+    except (ValueError, PagoConflicto, CatalogoIncompleto) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    # Reintento: mismo pago, sin aplicar de nuevo
+    if resultado.duplicado:
+        response.status_code = 200
+    return asdict(resultado)
+
+
+@router.post("/{id_prestamo}/contrato")
+async def emitir_contrato(
+    id_prestamo: int,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require("contrato.emitir")),
+):
+    emitidos = await contratos.emitir(db, [id_prestamo])
+    if id_prestamo not in emitidos:
+        raise HTTPException(status_code=404, detail="Préstamo no encontrado")
+    await db.commit()
+    return emitidos[id_prestamo]
+
+
+@router.get("/{id_prestamo}/contrato")
+async def descargar_contrato(
+    id_prestamo: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    if await contratos.cliente_de(db, id_prestamo) != current_user.ID_Usuario:
+        permisos = await resolver_permisos.permisos_de(db, current_user.ID_Usuario)
+        if not resolver_permisos.tiene(permisos, "contrato.ver"):
+            raise HTTPException(status_code=403, detail="Permiso requerido: contrato.ver")
+
+    try:
+        archivo = await contratos.archivo_contrato(db, id_prestamo)
+    except contratos.ContratoNoDisponible as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if archivo is None:
+        raise HTTPException(status_code=404, detail="El préstamo no tiene contrato emitido")
+    ruta, hash_doc = archivo
+
+    # El hash del contenido es el ETag: mismo documento, mismos bytes
+    etag = f'"{hash_doc}"'
+    cabeceras = {"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"}
+    if coincide(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cabeceras)
+    return FileResponse(
+        ruta,
+        media_type="application/pdf",
+        filename=f"contrato-{id_prestamo:08d}.pdf",
+        headers=cabeceras,
+    )
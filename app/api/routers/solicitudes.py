@@ -1,25 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import base64
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from app.db.database import get_db
-from app.db.models.solicitud import Solicitud
+from sqlalchemy import and_, or_, select
+from app.db.database import ReadSessionLocal, get_db, get_read_db
 from app.db.models.estado_solicitud import EstadoSolicitud
+from app.db.models.solicitud import Solicitud
+from app.schemas.cobertura import UbicacionEntrega
+from app.services.cobertura import indice_cobertura
+from app.services.ingreso import ArticuloIngreso, SolicitudIngreso, insertar_lote, validar_lote
+from app.services.catalogos import CatalogoIncompleto, catalogos
+from app.services import versiones
+from app.services.permisos import resolver_permisos
 from app.utils.auditoria import registrar_auditoria
 from app.core.security import get_current_user
-from sqlalchemy.orm import selectinload
+from app.api.condicional import etag_de, validar
+from app.api.deps import require
 
 router = APIRouter(prefix="/solicitudes", tags=["Solicitudes"])
 
 class SolicitudCreate(BaseModel):
     metodo_entrega: str = Field(..., description="domicilio | oficina")
     direccion_entrega: str | None = Field(None, max_length=300)
+    ubicacion: UbicacionEntrega | None = Field(None, description="Departamento/municipio/zona/colonia para validar cobertura")
+
+class ArticuloLoteIn(BaseModel):
+    id_tipo: int
+    descripcion: str = Field(..., min_length=1, max_length=800)
+    valor_estimado: Decimal = Field(Decimal("0.00"), ge=0, max_digits=12, decimal_places=2)
+    condicion: str | None = Field(None, max_length=120)
+    fotos: list[str] = Field(default_factory=list, max_length=30, description="URLs ya subidas")
+
+class SolicitudLoteIn(SolicitudCreate):
+    id_usuario: int = Field(..., description="Cliente dueño de la solicitud")
+    articulos: list[ArticuloLoteIn] = Field(default_factory=list, max_length=50)
+
+class LoteSolicitudesIn(BaseModel):
+    solicitudes: list[SolicitudLoteIn] = Field(..., min_length=1, max_length=1000)
 
 class SolicitudOut(BaseModel):
     id_solicitud: int
     estado: str
     metodo_entrega: str
     direccion_entrega: str | None
+    fecha_envio: datetime | None = None
 
     class Config:
         from_attributes = True
@@ -37,14 +66,24 @@ async def crear_solicitud(
     if metodo == "domicilio" and not payload.direccion_entrega:
         raise HTTPException(status_code=400, detail="Debe proporcionar una dirección si el método es domicilio")
 
-    result = await db.execute(select(EstadoSolicitud).where(EstadoSolicitud.Nombre == "pendiente"))
-    estado = result.scalar_one_or_none()
-    if not estado:
-        raise HTTPException(status_code=500, detail="Estado 'pendiente' no existe en el catálogo")
+    if metodo == "domicilio":
+        # Índice en memoria; sin zonas configuradas no se restringe
+        await indice_cobertura.asegurar(db)
+        if indice_cobertura.configurado:
+            u = payload.ubicacion or UbicacionEntrega()
+            verificacion = indice_cobertura.verificar_entrega(
+                payload.direccion_entrega, u.departamento, u.municipio, u.zona, u.colonia
+            )
+            if not verificacion.permitido:
+                raise HTTPException(status_code=400, detail=verificacion.motivo)
+
+    # Catálogo en memoria: 'pendiente' se valida al arrancar la app
+    estados = catalogos().estado_solicitud
+    id_pendiente = estados.id("pendiente")
 
     nueva = Solicitud(
         id_usuario=current_user.ID_Usuario,
-        id_estado=estado.Id_Estado_Solicitud,
+        id_estado=id_pendiente,
         metodo_entrega=metodo,
         direccion_entrega=payload.direccion_entrega
     )
@@ -58,7 +97,7 @@ async def crear_solicitud(
         accion="CREAR_SOLICITUD",
         modulo="Solicitud",
         detalle=f"Solicitud ID {nueva.id_solicitud} creada por usuario {current_user.ID_Usuario}",
-        valores_nuevos=nueva.__dict__,
+        valores_nuevos=nueva,
     )
 
     await db.commit()
@@ -66,27 +105,164 @@ async def crear_solicitud(
 
     return SolicitudOut(
         id_solicitud=nueva.id_solicitud,
-        estado=estado.Nombre,
+        estado=estados.nombre(id_pendiente),
         metodo_entrega=nueva.metodo_entrega,
-        direccion_entrega=nueva.direccion_entrega
+        direccion_entrega=nueva.direccion_entrega,
+        fecha_envio=nueva.fecha_envio,
+    )
+
+@router.post("/lote", status_code=status.HTTP_201_CREATED)
+async def crear_solicitudes_lote(
+    payload: LoteSolicitudesIn,
+    db: AsyncSession = Depends(get_db),
+    current_user=Depends(require("solicitud.carga_lote")),
+):
+    solicitudes = [
+        SolicitudIngreso(
+            id_usuario=s.id_usuario,
+            metodo_entrega=s.metodo_entrega,
+            direccion_entrega=s.direccion_entrega,
+            ubicacion=s.ubicacion.model_dump() if s.ubicacion else {},
+            articulos=[ArticuloIngreso(**a.model_dump()) for a in s.articulos],
+        )
+        for s in payload.solicitudes
+    ]
+    # Todo o nada: cualquier error rechaza el lote completo, con todos los errores juntos
+    errores = await validar_lote(db, solicitudes)
+    if errores:
+        raise HTTPException(status_code=422, detail=errores)
+
+    try:
+        creadas = await insertar_lote(db, solicitudes)
+    except CatalogoIncompleto as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    ids = [c["id_solicitud"] for c in creadas]
+    await registrar_auditoria(
+        db=db,
+        usuario_id=current_user.ID_Usuario,
+        accion="CREAR_SOLICITUDES_LOTE",
+        modulo="Solicitud",
+        detalle=f"{len(ids)} solicitudes (ID {min(ids)}-{max(ids)}) creadas por usuario {current_user.ID_Usuario}",
     )
+    await db.commit()
+    return creadas
+
+def _codificar_cursor(fecha_envio: datetime, id_solicitud: int) -> str:
+    crudo = json.dumps([fecha_envio.isoformat(), id_solicitud]).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+
+def _decodificar_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        fecha, id_solicitud = json.loads(crudo)
+        return datetime.fromisoformat(fecha), int(id_solicitud)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def _consulta_solicitudes(
+    id_usuario: int,
+    estado: str | None,
+    desde: date | None,
+    hasta: date | None,
+):
+    # El nombre del estado sale del JOIN, sin un segundo SELECT
+    query = (
+        select(
+            Solicitud.id_solicitud,
+            Solicitud.fecha_envio,
+            Solicitud.metodo_entrega,
+            Solicitud.direccion_entrega,
+            EstadoSolicitud.Nombre.label("estado"),
+        )
+        .join(EstadoSolicitud, Solicitud.id_estado == EstadoSolicitud.Id_Estado_Solicitud)
+        .where(Solicitud.id_usuario == id_usuario)
+        .order_by(Solicitud.fecha_envio.desc(), Solicitud.id_solicitud.desc())
+    )
+    if estado:
+        estados = catalogos().estado_solicitud
+        if estado not in estados:
+            raise HTTPException(status_code=400, detail=f"Estado de solicitud desconocido: {estado}")
+        query = query.where(Solicitud.id_estado == estados.id(estado))
+    if desde:
+        query = query.where(Solicitud.fecha_envio >= datetime.combine(desde, time.min))
+    if hasta:
+        query = query.where(Solicitud.fecha_envio < datetime.combine(hasta + timedelta(days=1), time.min))
+    return query
+
+
+def _a_salida(fila) -> SolicitudOut:
+    return SolicitudOut(
+        id_solicitud=fila.id_solicitud,
+        estado=fila.estado or "",
+        metodo_entrega=fila.metodo_entrega,
+        direccion_entrega=fila.direccion_entrega,
+        fecha_envio=fila.fecha_envio,
+    )
+
 
 @router.get("/mis", response_model=list[SolicitudOut])
 async def listar_mis_solicitudes(
+    request: Request,
+    response: Response,
+    limite: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None, description="Valor de X-Siguiente-Cursor de la página anterior"),
+    estado: str | None = None,
+    desde: date | None = None,
+    hasta: date | None = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_current_user),
+):
+    # ETag por versión de las solicitudes del usuario: 304 sin ejecutar el listado
+    version = await versiones.version(db, versiones.SOLICITUDES, current_user.ID_Usuario)
+    validar(request, response, etag_de("mis", current_user.ID_Usuario, version, limite, cursor, estado, desde, hasta))
+
+    # Paginación por llave sobre (fecha_envio, id_solicitud), más recientes primero
+    query = _consulta_solicitudes(current_user.ID_Usuario, estado, desde, hasta)
+    if cursor:
+        fecha, id_solicitud = _decodificar_cursor(cursor)
+        query = query.where(
+            or_(
+                Solicitud.fecha_envio < fecha,
+                and_(Solicitud.fecha_envio == fecha, Solicitud.id_solicitud < id_solicitud),
+            )
+        )
+
+    result = await db.execute(query.limit(limite + 1))
+    filas = result.all()
+    if len(filas) > limite:
+        filas = filas[:limite]
+        ultima = filas[-1]
+        response.headers["X-Siguiente-Cursor"] = _codificar_cursor(ultima.fecha_envio, ultima.id_solicitud)
+
+    return [_a_salida(f) for f in filas]
+
+
+@router.get("/exportar")
+async def exportar_solicitudes(
+    id_usuario: int | None = Query(None, description="Otro usuario (requiere solicitud.exportar)"),
+    estado: str | None = None,
+    desde: date | None = None,
+    hasta: date | None = None,
+    # Solo para permisos: van al cache compartido con require() y se leen del primario
     db: AsyncSession = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
-    result = await db.execute(
-        select(Solicitud)
-        .options(selectinload(Solicitud.estado))
-        .where(Solicitud.id_usuario == current_user.ID_Usuario)
-    )
-    solicitudes = result.scalars().all()
-    return [
-        SolicitudOut(
-            id_solicitud=s.id_solicitud,
-            estado=s.estado.Nombre if s.estado else "",
-            metodo_entrega=s.metodo_entrega,
-            direccion_entrega=s.direccion_entrega
-        ) for s in solicitudes
-    ]
\ No newline at end of file
+    objetivo = id_usuario or current_user.ID_Usuario
+    if objetivo != current_user.ID_Usuario:
+        permisos = await resolver_permisos.permisos_de(db, current_user.ID_Usuario)
+        if not resolver_permisos.tiene(permisos, "solicitud.exportar"):
+            raise HTTPException(status_code=403, detail="Permiso requerido: solicitud.exportar")
+
+    query = _consulta_solicitudes(objetivo, estado, desde, hasta)
+
+    async def generar():
+        # La sesión de get_db se cierra antes de enviar el cuerpo: se abre una propia
+        async with ReadSessionLocal() as sesion:
+            filas = await sesion.stream(query.execution_options(yield_per=1000))
+            async for lote in filas.partitions():
+                yield "".join(_a_salida(f).model_dump_json() + "\n" for f in lote)
+
+    return StreamingResponse(generar(), media_type="application/x-ndjson")
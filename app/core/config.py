@@ -1,16 +1,114 @@
+from decimal import Decimal
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DB_URL: str
+    # Réplica de solo lectura opcional (get_read_db)
+    DB_READ_URL: str | None = None
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: float = 10.0
     JWT_SECRET: str
     JWT_ALG: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # Cache del usuario autenticado (por ID_Usuario + Token_version)
+    USER_CACHE_TTL_SEGUNDOS: float = 60.0
+    USER_CACHE_MAX_ENTRADAS: int = 10000
+    # Permisos efectivos compilados por usuario
+    PERMISOS_CACHE_TTL_SEGUNDOS: float = 300.0
+    PERMISOS_CACHE_MAX_ENTRADAS: int = 10000
+    # Árboles de menú por combinación de roles
+    MENU_CACHE_TTL_SEGUNDOS: float = 3600.0
+    MENU_CACHE_MAX_ENTRADAS: int = 1000
+    # Índice de cobertura: recarga periódica para ver cambios hechos por otros procesos
+    COBERTURA_RECARGA_SEGUNDOS: float = 300.0
     GOOGLE_CLIENT_ID: str = ""
+    # Certificados PEM de Google; apuntar a un servidor local para pruebas
+    GOOGLE_CERTS_URL: str = "https://www.googleapis.com/oauth2/v1/certs"
+    # Si Google no responde, los certificados vencidos se siguen usando hasta max-age + gracia
+    GOOGLE_CERTS_GRACIA_SEGUNDOS: int = 6 * 3600
     ALLOWED_EMAIL_DOMAIN: str | None = None
   
+    # Logging y métricas (app/core/logging.py, GET /metrics)
+    LOG_NIVEL: str = "INFO"
+    LOG_FORMATO: str = "json"
+    SQL_LENTA_MS: float = 500.0
+    # Si se define, /metrics exige "Authorization: Bearer <token>"
+    METRICAS_TOKEN: str | None = None
+
     CORS_ORIGINS: str = "*"   
     ROOT_PATH: str = ""       
-    DOCS_URL: str = "/docs"   
+    DOCS_URL: str = "/docs"
+
+    # Sondas /health/ready: muestreo de la BD en segundo plano (app/services/salud.py)
+    SALUD_INTERVALO_SEGUNDOS: float = 2.0
+    SALUD_TIMEOUT_SEGUNDOS: float = 1.0
+    SALUD_FALLOS_MAX: int = 3
+    SALUD_LATENCIA_MAX_MS: float = 500.0
+    SALUD_SATURACION_MAX: float = 0.9
+    SALUD_SATURACION_REANUDAR: float = 0.75
+
+    # Recarga de Configuraciones_Generales (app/services/configuracion.py)
+    CONFIG_RECARGA_SEGUNDOS: float = 60.0
+
+    # Devengo nocturno de intereses y mora (app/tasks/cron_prestamos.py)
+    TASA_INTERES_DIARIA: Decimal = Decimal("0.0020")
+    TASA_MORA_DIARIA: Decimal = Decimal("0.0010")
+    ESTADOS_PRESTAMO_DEVENGO: str = "activo,vencido"
+    CRON_TAMANO_LOTE: int = 5000
+    # Aplicación de pagos (app/services/pagos.py): estado del pago aplicado y del préstamo saldado
+    ESTADO_PAGO_APLICADO: str = "validado"
+    ESTADO_PRESTAMO_PAGADO: str = "pagado"
+    # Conciliación de extractos bancarios (app/services/conciliacion.py)
+    ESTADO_PAGO_PENDIENTE: str = "pendiente"
+    CONCILIACION_COLUMNAS: str = "fecha,referencia,monto"
+    CONCILIACION_TOLERANCIA_DIAS: int = 3
+    CONCILIACION_TAMANO_LOTE: int = 1000
+    CONCILIACION_MAX_DETALLE: int = 200
+    # Rebaja del inventario en venta por días en bodega (app/tasks/cron_inventario.py)
+    CURVA_REBAJA_INVENTARIO: str = '{"default": [[0, 1.0], [30, 0.9], [60, 0.8], [90, 0.7], [180, 0.5]]}'
+    # Estado con el que entran los artículos del ingreso masivo (Estado_Articulo)
+    ESTADO_ARTICULO_INICIAL: str = "pendiente"
+    # Rutas de cobranza (app/services/cobranza.py)
+    ROL_COBRADOR: str = "cobrador"
+    RUTAS_CELDA_GRADOS: float = 0.01
+    RUTAS_LIMITE_SEGUNDOS: float = 5.0
+    # Tabla de amortización (cuota fija mensual)
+    TASA_INTERES_MENSUAL: Decimal = Decimal("0.05")
+
+    # Pool para bcrypt fuera del event loop (thread | process)
+    HASH_POOL_TIPO: str = "thread"
+    HASH_POOL_WORKERS: int = 4
+    HASH_MAX_CONCURRENCIA: int = 4
+    # Pool de procesos para trabajo de CPU (rutas, imágenes, PDFs)
+    CPU_POOL_WORKERS: int = 2
+    # Hilos para E/S de disco (subidas y media)
+    ARCHIVOS_POOL_WORKERS: int = 4
+
+    # Media en disco local, servida en MEDIA_URL (app/utils/almacen.py)
+    MEDIA_DIR: str = "media"
+    MEDIA_URL: str = "/media"
+    FOTO_MAX_BYTES: int = 15 * 1024 * 1024
+    FOTOS_MAX_POR_SOLICITUD: int = 20
+    FOTO_LADO_GRANDE: int = 1600
+    FOTO_LADO_MINIATURA: int = 320
+    # Fotos sin Articulo_Foto más viejas que esto se borran (app/tasks/cron_fotos.py)
+    FOTOS_HUERFANAS_GRACIA_SEGUNDOS: int = 24 * 3600
+    # PDFs de contrato ya generados por este proceso (app/services/contratos.py)
+    CONTRATO_CACHE_TTL_SEGUNDOS: float = 3600.0
+    CONTRATO_CACHE_MAX_ENTRADAS: int = 10000
+
+    # Escritor de auditoría por lotes (app/middlewares/audit_log.py)
+    AUDITORIA_MAX_PENDIENTES: int = 10000
+    AUDITORIA_TAMANO_LOTE: int = 500
+    AUDITORIA_INTERVALO_SEGUNDOS: float = 1.0
+    AUDITORIA_ESPERA_MAX_SEGUNDOS: float = 2.0
+    # Lote que no se pudo insertar: reintentos con espera creciente y luego este archivo (JSONL)
+    AUDITORIA_REINTENTOS: int = 3
+    AUDITORIA_ESPERA_REINTENTO_SEGUNDOS: float = 0.5
+    AUDITORIA_RESPALDO: str | None = "auditoria_pendiente.jsonl"
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,64 @@
+"""Logging estructurado: una línea JSON por evento, con el contexto de la petición.
+
+El middleware de métricas fija `contexto_peticion` al entrar cada petición;
+todo lo que se loguee mientras se atiende (incluidas las consultas lentas)
+lleva su id y su ruta. Los datos extra van en `extra={"datos": {...}}`.
+"""
+import json
+import logging
+import sys
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+SIN_RUTA = "<sin_ruta>"
+
+
+@dataclass
+class ContextoPeticion:
+    id: str
+    metodo: str
+    scope: dict
+    consultas: int = 0
+    segundos_db: float = 0.0
+
+    @property
+    def ruta(self) -> str:
+        # FastAPI deja la ruta resuelta en el scope; la plantilla evita una serie por id
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or SIN_RUTA
+
+
+contexto_peticion: ContextVar[ContextoPeticion | None] = ContextVar("contexto_peticion", default=None)
+
+
+class FormatoJSON(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensaje": record.getMessage(),
+        }
+        ctx = contexto_peticion.get()
+        if ctx is not None:
+            datos["peticion"] = ctx.id
+            datos["ruta"] = ctx.ruta
+        datos.update(getattr(record, "datos", None) or {})
+        if record.exc_info:
+            datos["excepcion"] = self.formatException(record.exc_info)
+        return json.dumps(datos, default=str, ensure_ascii=False)
+
+
+def configurar_logging(nivel: str = "INFO", formato: str = "json") -> None:
+    """Un solo handler a stdout en el logger raíz; idempotente."""
+    if formato not in ("json", "texto"):
+        raise ValueError(f"Formato de log inválido: {formato} (json | texto)")
+    handler = logging.StreamHandler(sys.stdout)
+    if formato == "json":
+        handler.setFormatter(FormatoJSON())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    raiz = logging.getLogger()
+    raiz.handlers = [handler]
+    raiz.setLevel(nivel.upper())
@@ -0,0 +1,166 @@
+"""Métricas del proceso en memoria, expuestas en formato de texto de Prometheus.
+
+Sin dependencias: contadores, medidores e histogramas con etiquetas. Cada
+worker de uvicorn tiene su propio registro, así que Prometheus debe raspar
+cada proceso (o correr un worker por contenedor).
+"""
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+TIPO_CONTENIDO = "text/plain; version=0.0.4; charset=utf-8"
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_SQL = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+BUCKETS_CONTEO = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+Serie = tuple[tuple, float]  # (valores de etiquetas, valor)
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _numero(valor: float) -> str:
+    if valor == math.inf:
+        return "+Inf"
+    return repr(float(valor))
+
+
+def _linea(nombre: str, etiquetas: tuple[str, ...], valores: tuple, valor: float, le: float | None = None) -> str:
+    partes = [f'{n}="{_escapar(v)}"' for n, v in zip(etiquetas, valores)]
+    if le is not None:
+        partes.append(f'le="{_numero(le)}"')
+    return f"{nombre}{{{','.join(partes)}}} {_numero(valor)}" if partes else f"{nombre} {_numero(valor)}"
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: tuple[str, ...] = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._lock = threading.Lock()
+
+    def muestras(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def exponer(self) -> list[str]:
+        return [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}", *self.muestras()]
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: tuple[str, ...] = ()):
+        super().__init__(nombre, ayuda, etiquetas)
+        self._valores: dict[tuple, float] = {}
+
+    def inc(self, *etiquetas, cantidad: float = 1.0) -> None:
+        with self._lock:
+            self._valores[etiquetas] = self._valores.get(etiquetas, 0.0) + cantidad
+
+    def muestras(self) -> Iterable[str]:
+        for valores, valor in list(self._valores.items()):
+            yield _linea(self.nombre, self.etiquetas, valores, valor)
+
+
+class Medidor(_Metrica):
+    """Valor instantáneo; con `leer` se calcula al momento de exponer."""
+
+    tipo = "gauge"
+
+    def __init__(
+        self,
+        nombre: str,
+        ayuda: str,
+        etiquetas: tuple[str, ...] = (),
+        leer: Callable[[], Iterable[Serie]] | None = None,
+    ):
+        super().__init__(nombre, ayuda, etiquetas)
+        self._valores: dict[tuple, float] = {}
+        self._leer = leer
+
+    def fijar(self, valor: float, *etiquetas) -> None:
+        self._valores[etiquetas] = valor
+
+    def sumar(self, cantidad: float, *etiquetas) -> None:
+        with self._lock:
+            self._valores[etiquetas] = self._valores.get(etiquetas, 0.0) + cantidad
+
+    def muestras(self) -> Iterable[str]:
+        series = self._leer() if self._leer is not None else list(self._valores.items())
+        for valores, valor in series:
+            yield _linea(self.nombre, self.etiquetas, valores, valor)
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(
+        self,
+        nombre: str,
+        ayuda: str,
+        etiquetas: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = BUCKETS_LATENCIA,
+    ):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(sorted(buckets))
+        # etiquetas -> [conteo por bucket..., suma, total]
+        self._series: dict[tuple, list] = {}
+
+    def observar(self, valor: float, *etiquetas) -> None:
+        i = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(etiquetas)
+            if serie is None:
+                serie = self._series[etiquetas] = [0] * len(self.buckets) + [0.0, 0]
+            if i < len(self.buckets):
+                serie[i] += 1
+            serie[-2] += valor
+            serie[-1] += 1
+
+    def muestras(self) -> Iterable[str]:
+        with self._lock:
+            series = [(valores, list(serie)) for valores, serie in self._series.items()]
+        for valores, serie in series:
+            acumulado = 0
+            for le, conteo in zip(self.buckets, serie):
+                acumulado += conteo
+                yield _linea(f"{self.nombre}_bucket", self.etiquetas, valores, acumulado, le=le)
+            yield _linea(f"{self.nombre}_bucket", self.etiquetas, valores, serie[-1], le=math.inf)
+            yield _linea(f"{self.nombre}_sum", self.etiquetas, valores, serie[-2])
+            yield _linea(f"{self.nombre}_count", self.etiquetas, valores, serie[-1])
+
+
+class Registro:
+    def __init__(self):
+        self._metricas: dict[str, _Metrica] = {}
+
+    def _registrar(self, metrica: _Metrica) -> _Metrica:
+        if metrica.nombre in self._metricas:
+            raise ValueError(f"Métrica duplicada: {metrica.nombre}")
+        self._metricas[metrica.nombre] = metrica
+        return metrica
+
+    def contador(self, nombre: str, ayuda: str, etiquetas: tuple[str, ...] = ()) -> Contador:
+        return self._registrar(Contador(nombre, ayuda, etiquetas))
+
+    def medidor(self, nombre: str, ayuda: str, etiquetas: tuple[str, ...] = (), leer=None) -> Medidor:
+        return self._registrar(Medidor(nombre, ayuda, etiquetas, leer))
+
+    def histograma(
+        self, nombre: str, ayuda: str, etiquetas: tuple[str, ...] = (), buckets: tuple[float, ...] = BUCKETS_LATENCIA
+    ) -> Histograma:
+        return self._registrar(Histograma(nombre, ayuda, etiquetas, buckets))
+
+    def exponer(self) -> str:
+        lineas = []
+        for metrica in self._metricas.values():
+            lineas.extend(metrica.exponer())
+        return "\n".join(lineas) + "\n"
+
+
+registro = Registro()
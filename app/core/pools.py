@@ -0,0 +1,97 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from app.core.config import settings
+from app.core.metricas import registro
+
+# Todos los pools creados en el proceso, para exponer su estado
+_pools: list["PoolAcotado"] = []
+
+pool_espera = registro.histograma("pool_espera_segundos", "Espera en cola antes de entrar al executor", ("pool",))
+pool_ejecucion = registro.histograma("pool_ejecucion_segundos", "Duración de la tarea en el executor", ("pool",))
+
+
+class PoolAcotado:
+    """Ejecuta trabajo bloqueante (CPU o E/S síncrona) fuera del event loop.
+
+    Un semáforo limita cuántas tareas pueden estar en el executor a la vez;
+    el resto espera en cola sin ocupar hilos. `en_cola` es la métrica de
+    profundidad de cola.
+    """
+
+    def __init__(self, nombre: str, tipo: str = "thread", workers: int = 4, max_concurrencia: int | None = None):
+        if tipo not in ("thread", "process"):
+            raise ValueError(f"Tipo de pool inválido: {tipo} (thread | process)")
+        self.nombre = nombre
+        self.tipo = tipo
+        self.workers = workers
+        self.max_concurrencia = max_concurrencia or workers
+        self.en_cola = 0
+        self.en_curso = 0
+        self.completadas = 0
+        self._semaforo = asyncio.Semaphore(self.max_concurrencia)
+        self._executor: Executor | None = None
+        _pools.append(self)
+
+    def _obtener_executor(self) -> Executor:
+        if self._executor is None:
+            if self.tipo == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.nombre)
+        return self._executor
+
+    async def ejecutar(self, fn, *args, **kwargs):
+        self.en_cola += 1
+        esperando = True
+        inicio = time.perf_counter()
+        try:
+            async with self._semaforo:
+                self.en_cola -= 1
+                esperando = False
+                self.en_curso += 1
+                entrada = time.perf_counter()
+                pool_espera.observar(entrada - inicio, self.nombre)
+                try:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._obtener_executor(), partial(fn, *args, **kwargs))
+                finally:
+                    pool_ejecucion.observar(time.perf_counter() - entrada, self.nombre)
+                    self.en_curso -= 1
+                    self.completadas += 1
+        finally:
+            if esperando:
+                self.en_cola -= 1
+
+    def estadisticas(self) -> dict:
+        return {
+            "nombre": self.nombre,
+            "tipo": self.tipo,
+            "workers": self.workers,
+            "max_concurrencia": self.max_concurrencia,
+            "en_cola": self.en_cola,
+            "en_curso": self.en_curso,
+            "completadas": self.completadas,
+        }
+
+    def cerrar(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+def _tareas():
+    for pool in _pools:
+        yield (pool.nombre, "en_cola"), pool.en_cola
+        yield (pool.nombre, "en_curso"), pool.en_curso
+        yield (pool.nombre, "max_concurrencia"), pool.max_concurrencia
+
+
+registro.medidor("pool_tareas", "Tareas por pool: en_cola, en_curso y max_concurrencia", ("pool", "estado"), leer=_tareas)
+
+# Pool de procesos compartido para trabajo de CPU en Python puro (rutas, imágenes, PDFs)
+pool_cpu = PoolAcotado("cpu", tipo="process", workers=settings.CPU_POOL_WORKERS)
+# Hilos para E/S de disco síncrona (copias de archivos subidos, lecturas de media)
+pool_archivos = PoolAcotado("archivos", tipo="thread", workers=settings.ARCHIVOS_POOL_WORKERS)
@@ -1,3 +1,4 @@
+import logging
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
@@ -8,6 +9,9 @@ from sqlalchemy.future import select
 from app.core.config import settings
 from app.db.database import get_db
 from app.db.models.user import User
+from app.services.user_cache import UsuarioActual, guardar_usuario, obtener_usuario_cacheado
+
+logger = logging.getLogger(__name__)
 
 
 def create_access_token(data: dict, expires_delta: int = None):
@@ -26,13 +30,18 @@ def verify_token(token: str):
         return None
 
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+
+
+async def _buscar_usuario(db: AsyncSession, user_id: int) -> User | None:
+    result = await db.execute(select(User).where(User.ID_Usuario == user_id))
+    return result.scalar_one_or_none()
 
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
-) -> User:
+) -> UsuarioActual:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudo validar el token",
@@ -41,7 +50,7 @@ async def get_current_user(
 
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
-        print("Payload JWT:", payload)
+        logger.debug("Token válido para sub=%s", payload.get("sub"))
 
         user_id_str = payload.get("sub")
         if user_id_str is None:
@@ -52,13 +61,24 @@ async def get_current_user(
         except ValueError:
             raise credentials_exception
 
+        # Tokens emitidos antes de incluir "ver" no traen versión
+        token_version = payload.get("ver")
+
     except JWTError:
         raise credentials_exception
 
-    result = await db.execute(select(User).where(User.ID_Usuario == user_id))
-    user = result.scalar_one_or_none()
-
+    user = obtener_usuario_cacheado(user_id, token_version)
     if user is None:
+        # Siempre del primario: en la réplica un Token_version o un Estado_Activo
+        # atrasado dejaría pasar tokens ya revocados
+        modelo = await _buscar_usuario(db, user_id)
+        if modelo is None:
+            raise credentials_exception
+        user = UsuarioActual.desde_modelo(modelo)
+        guardar_usuario(user)
+
+    # Un cambio de Token_version revoca los tokens anteriores
+    if not user.Estado_Activo or (token_version is not None and token_version != user.Token_version):
         raise credentials_exception
 
     return user
@@ -1,12 +1,65 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.orm import declarative_base  
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import QueuePool
 
 from app.core.config import settings
+from app.db.instrumentacion import PoolMedido, instrumentar
 
-engine = create_async_engine(settings.DB_URL, pool_pre_ping=True)
+
+def _crear_engine(url: str, nombre: str) -> AsyncEngine:
+    opciones = {"pool_pre_ping": True}
+    # SQLite en memoria usa StaticPool; el resto (incluido SQLite en archivo) un pool acotado
+    if make_url(url).database not in (None, "", ":memory:"):
+        opciones.update(
+            poolclass=PoolMedido,
+            pool_logging_name=nombre,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    engine = create_async_engine(url, **opciones)
+    instrumentar(engine, nombre)
+    return engine
+
+
+engine = _crear_engine(settings.DB_URL, "primario")
 SessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False)
 
-Base = declarative_base()  
+# Réplica de solo lectura opcional; sin DB_READ_URL las lecturas van al primario
+read_engine = _crear_engine(settings.DB_READ_URL, "replica") if settings.DB_READ_URL else engine
+ReadSessionLocal = async_sessionmaker(bind=read_engine, expire_on_commit=False)
+
+Base = declarative_base()
 async def get_db() -> AsyncSession:
     async with SessionLocal() as session:
         yield session
+
+
+async def get_read_db() -> AsyncSession:
+    """Sesión para endpoints de solo lectura (GET); puede ir a la réplica."""
+    async with ReadSessionLocal() as session:
+        yield session
+
+
+def estadisticas_pool() -> dict:
+    engines = {"primario": engine}
+    if read_engine is not engine:
+        engines["replica"] = read_engine
+
+    stats = {}
+    for nombre, eng in engines.items():
+        pool = eng.sync_engine.pool
+        datos = {"clase": type(pool).__name__, "estado": pool.status()}
+        if isinstance(pool, QueuePool):
+            datos.update(
+                tamano=pool.size(),
+                en_uso=pool.checkedout(),
+                libres=pool.checkedin(),
+                desborde=pool.overflow(),
+                max_desborde=pool._max_overflow,
+                timeout=pool.timeout(),
+            )
+        stats[nombre] = datos
+    return stats
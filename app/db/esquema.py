@@ -0,0 +1,107 @@
+"""Creación del esquema y migraciones incrementales.
+
+- `crear_esquema` crea todas las tablas de app/db/models en una base vacía
+  (MySQL, o SQLite para pruebas) y marca todas las migraciones como aplicadas.
+- `migrar` aplica en orden los archivos app/db/migraciones/NNN_*.sql (DDL de
+  MySQL) que todavía no figuran en `Migracion_Esquema`: así se actualiza una
+  base existente.
+
+    python -m app.db.esquema --crear        # base vacía
+    python -m app.db.esquema                # aplica las migraciones pendientes
+    python -m app.db.esquema --pendientes   # solo las lista
+"""
+import argparse
+import asyncio
+import importlib
+import pkgutil
+from pathlib import Path
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn
+
+import app.db.models as paquete_modelos
+from app.db.database import Base, engine
+from app.db.models.migracion_esquema import MigracionEsquema
+
+DIRECTORIO_MIGRACIONES = Path(__file__).parent / "migraciones"
+
+
+@compiles(CreateColumn, "sqlite")
+def _columna_sqlite(element, compiler, **kw):
+    # Los modelos usan "ON UPDATE CURRENT_TIMESTAMP" de MySQL; SQLite solo admite el default
+    return compiler.visit_create_column(element, **kw).replace(" ON UPDATE CURRENT_TIMESTAMP", "")
+
+
+def cargar_modelos() -> None:
+    """Importa todos los modelos para que queden registrados en Base.metadata."""
+    for modulo in pkgutil.iter_modules(paquete_modelos.__path__):
+        importlib.import_module(f"{paquete_modelos.__name__}.{modulo.name}")
+
+
+def migraciones() -> list[Path]:
+    return sorted(DIRECTORIO_MIGRACIONES.glob("*.sql"))
+
+
+def sentencias(archivo: Path) -> list[str]:
+    """Sentencias del archivo, separadas por ';' al final de línea; ignora comentarios '--'."""
+    lineas = [l for l in archivo.read_text(encoding="utf-8").splitlines() if not l.lstrip().startswith("--")]
+    partes = (s.strip().rstrip(";").strip() for s in "\n".join(lineas).split(";\n"))
+    return [s for s in partes if s]
+
+
+async def crear_esquema(motor: AsyncEngine = engine) -> None:
+    cargar_modelos()
+    async with motor.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        aplicadas = set((await conn.execute(select(MigracionEsquema.nombre))).scalars())
+        nuevas = [{MigracionEsquema.nombre.name: m.name} for m in migraciones() if m.name not in aplicadas]
+        if nuevas:
+            await conn.execute(insert(MigracionEsquema.__table__), nuevas)
+
+
+async def pendientes(motor: AsyncEngine = engine) -> list[Path]:
+    async with motor.begin() as conn:
+        await conn.run_sync(MigracionEsquema.__table__.create, checkfirst=True)
+        aplicadas = set((await conn.execute(select(MigracionEsquema.nombre))).scalars())
+    return [m for m in migraciones() if m.name not in aplicadas]
+
+
+async def migrar(motor: AsyncEngine = engine) -> list[str]:
+    aplicadas = []
+    for archivo in await pendientes(motor):
+        # En MySQL el DDL hace commit implícito: cada archivo se registra apenas termina
+        async with motor.begin() as conn:
+            for sentencia in sentencias(archivo):
+                await conn.exec_driver_sql(sentencia)
+            await conn.execute(insert(MigracionEsquema.__table__).values({MigracionEsquema.nombre: archivo.name}))
+        aplicadas.append(archivo.name)
+    return aplicadas
+
+
+async def _ejecutar(crear: bool, solo_listar: bool) -> None:
+    try:
+        if crear:
+            await crear_esquema()
+            print("Esquema creado")
+        elif solo_listar:
+            for archivo in await pendientes():
+                print(archivo.name)
+        else:
+            aplicadas = await migrar()
+            print("\n".join(aplicadas) if aplicadas else "Sin migraciones pendientes")
+    finally:
+        await engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Esquema de la base de datos")
+    parser.add_argument("--crear", action="store_true", help="Crea todas las tablas en una base vacía")
+    parser.add_argument("--pendientes", action="store_true", help="Lista las migraciones sin aplicar")
+    args = parser.parse_args(argv)
+    asyncio.run(_ejecutar(args.crear, args.pendientes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Métricas de SQL y del pool de conexiones, con hooks de eventos de SQLAlchemy.
+
+- Cada consulta se mide entre before/after_cursor_execute: histograma por
+  engine y operación, y suma de consultas/tiempo en el contexto de la petición.
+- Las que superan `SQL_LENTA_MS` se loguean con la ruta que las emitió.
+- `PoolMedido` mide cuánto espera una sesión por una conexión y cuántas
+  están esperando; la ocupación se lee del pool al exponer las métricas.
+"""
+import logging
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.core.logging import contexto_peticion
+from app.core.metricas import BUCKETS_SQL, registro
+
+logger = logging.getLogger(__name__)
+
+SIN_PETICION = "<tarea>"
+_INICIOS = "metricas_inicios"
+
+# nombre -> engine instrumentado
+_engines: dict[str, AsyncEngine] = {}
+
+sql_duracion = registro.histograma(
+    "db_consulta_segundos", "Duración de las consultas SQL", ("engine", "operacion"), BUCKETS_SQL
+)
+sql_errores = registro.contador("db_consulta_errores_total", "Consultas SQL que fallaron", ("engine",))
+sql_lentas = registro.contador(
+    "db_consultas_lentas_total", "Consultas por encima de SQL_LENTA_MS", ("engine", "ruta")
+)
+pool_espera = registro.histograma(
+    "db_pool_espera_segundos", "Espera por una conexión del pool (incluye abrirla)", ("engine",), BUCKETS_SQL
+)
+pool_agotado = registro.contador(
+    "db_pool_timeouts_total", "Sesiones que no obtuvieron conexión en DB_POOL_TIMEOUT", ("engine",)
+)
+pool_esperando = registro.medidor(
+    "db_pool_esperando", "Sesiones esperando una conexión en este momento", ("engine",)
+)
+
+
+class PoolMedido(AsyncAdaptedQueuePool):
+    """Pool acotado que mide la espera por conexión (el nombre viene de pool_logging_name)."""
+
+    def _do_get(self):
+        nombre = self._orig_logging_name or "primario"
+        pool_esperando.sumar(1, nombre)
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_agotado.inc(nombre)
+            raise
+        finally:
+            pool_esperando.sumar(-1, nombre)
+            pool_espera.observar(time.perf_counter() - inicio, nombre)
+
+
+def _operacion(sql: str) -> str:
+    palabra = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ""
+    return palabra if palabra in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTRA"
+
+
+def instrumentar(engine: AsyncEngine, nombre: str) -> None:
+    _engines[nombre] = engine
+    sync = engine.sync_engine
+
+    @event.listens_for(sync, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_INICIOS, []).append(time.perf_counter())
+
+    @event.listens_for(sync, "after_cursor_execute")
+    def _despues(conn, cursor, statement, parameters, context, executemany):
+        duracion = time.perf_counter() - conn.info[_INICIOS].pop()
+        sql_duracion.observar(duracion, nombre, _operacion(statement))
+        ctx = contexto_peticion.get()
+        if ctx is not None:
+            ctx.consultas += 1
+            ctx.segundos_db += duracion
+        if duracion * 1000 >= settings.SQL_LENTA_MS:
+            ruta = ctx.ruta if ctx is not None else SIN_PETICION
+            sql_lentas.inc(nombre, ruta)
+            logger.warning(
+                "Consulta lenta (%.0f ms) en %s",
+                duracion * 1000,
+                ruta,
+                extra={"datos": {"engine": nombre, "duracion_ms": round(duracion * 1000, 1), "sql": statement[:2000]}},
+            )
+
+    @event.listens_for(sync, "handle_error")
+    def _error(contexto):
+        inicios = contexto.connection.info.get(_INICIOS) if contexto.connection is not None else None
+        if inicios:
+            inicios.pop()
+        sql_errores.inc(nombre)
+
+
+def ocupacion(engine: AsyncEngine) -> tuple[int, int, int] | None:
+    """(en uso, libres, capacidad) del pool; None si no es un pool acotado."""
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, QueuePool):
+        return None
+    return pool.checkedout(), pool.checkedin(), pool.size() + max(pool._max_overflow, 0)
+
+
+def saturacion(engine: AsyncEngine) -> float:
+    datos = ocupacion(engine)
+    if datos is None or not datos[2]:
+        return 0.0
+    return datos[0] / datos[2]
+
+
+def _ocupacion():
+    for nombre, engine in _engines.items():
+        datos = ocupacion(engine)
+        if datos is None:
+            continue
+        en_uso, libres, capacidad = datos
+        yield (nombre, "en_uso"), en_uso
+        yield (nombre, "libres"), libres
+        yield (nombre, "capacidad"), capacidad
+        yield (nombre, "saturacion"), saturacion(engine)
+
+
+registro.medidor(
+    "db_pool_conexiones",
+    "Conexiones del pool: en_uso, libres, capacidad (size + max_overflow) y saturacion (en_uso/capacidad)",
+    ("engine", "estado"),
+    leer=_ocupacion,
+)
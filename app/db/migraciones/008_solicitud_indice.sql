@@ -0,0 +1,2 @@
+-- Paginación por cursor de /solicitudes/mis y exportación por usuario
+CREATE INDEX ix_solicitud_usuario_fecha ON `Solicitud` (`Id_Usuario`, `Fecha_envio`, `Id_Solicitud`);
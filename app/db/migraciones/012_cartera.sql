@@ -0,0 +1,26 @@
+-- Aging de cartera mantenido por diferencias (app/services/cartera.py).
+-- Después de aplicarla: python -m app.tasks.cron_cartera --reconstruir
+CREATE TABLE `Cartera_Prestamo` (
+    `Id_prestamo` INTEGER NOT NULL,
+    `Id_tipo` INTEGER NOT NULL,
+    `Id_estado` INTEGER NOT NULL,
+    `Tramo` VARCHAR(10) NOT NULL,
+    `Saldo` DECIMAL(12, 2) NOT NULL DEFAULT 0.00,
+    `Primer_venc_pendiente` DATE NULL,
+    PRIMARY KEY (`Id_prestamo`),
+    FOREIGN KEY (`Id_prestamo`) REFERENCES `Prestamo` (`Id_PRESTAMO`)
+);
+
+CREATE INDEX ix_cartera_prestamo_tramo_venc ON `Cartera_Prestamo` (`Tramo`, `Primer_venc_pendiente`);
+
+CREATE TABLE `Resumen_Cartera` (
+    `Id_tipo` INTEGER NOT NULL,
+    `Id_estado` INTEGER NOT NULL,
+    `Tramo` VARCHAR(10) NOT NULL,
+    `Prestamos` INTEGER NOT NULL DEFAULT 0,
+    `Saldo` DECIMAL(14, 2) NOT NULL DEFAULT 0.00,
+    `Actualizado_en` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (`Id_tipo`, `Id_estado`, `Tramo`),
+    FOREIGN KEY (`Id_tipo`) REFERENCES `Cat_Tipo_Articulo` (`IdTipo`),
+    FOREIGN KEY (`Id_estado`) REFERENCES `Estado_Prestamo` (`Id_Estado_Prestamo`)
+);
@@ -0,0 +1,3 @@
+-- Datos con que se generó cada contrato (app/services/contratos.py): la descarga
+-- regenera el PDF firmado a partir de ellos, nunca de los datos actuales
+ALTER TABLE `Contrato` ADD COLUMN `Datos` TEXT NULL;
@@ -0,0 +1,14 @@
+-- Contadores de versión de los ETag (app/services/versiones.py)
+CREATE TABLE `Version_Recurso` (
+    `Recurso` VARCHAR(50) NOT NULL,
+    `Clave` INTEGER NOT NULL DEFAULT 0,
+    `Version` BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (`Recurso`, `Clave`)
+);
+
+-- Un renglón por recurso existente: las escrituras solo incrementan y los ETag
+-- calculados antes de la migración (versión 0) dejan de coincidir
+INSERT INTO `Version_Recurso` (`Recurso`, `Clave`, `Version`)
+SELECT 'solicitudes', `ID_Usuario`, 1 FROM `Usuario`;
+
+INSERT INTO `Version_Recurso` (`Recurso`, `Clave`, `Version`) VALUES ('menu', 0, 1);
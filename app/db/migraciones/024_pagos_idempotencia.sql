@@ -0,0 +1,11 @@
+-- Abonos parciales por cuota e idempotencia de pagos (app/services/pagos.py)
+ALTER TABLE `Cuota` ADD COLUMN `Abonado` DECIMAL(12, 2) NOT NULL DEFAULT 0.00;
+
+-- Las cuotas ya pagadas quedan cubiertas por completo
+UPDATE `Cuota` SET `Abonado` = `Monto` WHERE `Pagada` = 1;
+
+ALTER TABLE `Pago` ADD COLUMN `Clave_Idempotencia` VARCHAR(80) NULL;
+
+CREATE UNIQUE INDEX ux_pago_clave_idempotencia ON `Pago` (`Clave_Idempotencia`);
+
+CREATE INDEX ix_pago_ref_bancaria ON `Pago` (`Ref_bancaria`);
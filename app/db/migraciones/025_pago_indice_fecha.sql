@@ -0,0 +1,2 @@
+-- Rango de fechas del índice de conciliación (app/services/conciliacion.py)
+CREATE INDEX ix_pago_fecha ON `Pago` (`Fecha_pago`);
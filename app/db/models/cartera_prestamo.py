@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DECIMAL, Date, ForeignKey, Index
+from app.db.database import Base
+
+class CarteraPrestamo(Base):
+    __tablename__ = "Cartera_Prestamo"
+
+    # Aporte actual de cada préstamo a Resumen_Cartera, para aplicar solo diferencias
+    id_prestamo = Column("Id_prestamo", Integer, ForeignKey("Prestamo.Id_PRESTAMO"), primary_key=True)
+    id_tipo = Column("Id_tipo", Integer, nullable=False)
+    id_estado = Column("Id_estado", Integer, nullable=False)
+    tramo = Column("Tramo", String(10), nullable=False)
+    saldo = Column("Saldo", DECIMAL(12, 2), nullable=False, default=0.00)
+    primer_venc_pendiente = Column("Primer_venc_pendiente", Date, nullable=True)
+
+    __table_args__ = (
+        Index("ix_cartera_prestamo_tramo_venc", tramo, primer_venc_pendiente),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, ForeignKey
 from app.db.database import Base
 
 class Contrato(Base):
@@ -8,5 +8,7 @@ class Contrato(Base):
     id_prestamo = Column("Id_prestamo", Integer, ForeignKey("Prestamo.Id_PRESTAMO"), nullable=False)
     url_pdf = Column("URL_pdf", String(300), nullable=False)
     hash_doc = Column("hash_doc", String(128), nullable=True)
+    # JSON con los datos con que se generó el PDF: permite regenerar exactamente ese documento
+    datos = Column("Datos", Text, nullable=True)
     firma_cliente_en = Column("Firma_cliente_en", TIMESTAMP, nullable=True)
     firma_empresa_en = Column("Firma_empresa_en", TIMESTAMP, nullable=True)
@@ -10,3 +10,5 @@ class Cuota(Base):
     fecha_venc = Column("Fecha_venc", Date, nullable=False)
     monto = Column("Monto", DECIMAL(12, 2), nullable=False)
     pagada = Column("Pagada", Integer, nullable=False, default=0)  # 0 = false, 1 = true
+    # Parte ya cubierta por pagos (abonos parciales); Pagada = 1 cuando llega a Monto
+    abonado = Column("Abonado", DECIMAL(12, 2), nullable=False, default=0.00)
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, String, TIMESTAMP, text
+from app.db.database import Base
+
+class MigracionEsquema(Base):
+    __tablename__ = "Migracion_Esquema"
+
+    # Archivo de app/db/migraciones ya aplicado a esta base
+    nombre = Column("Nombre", String(200), primary_key=True)
+    aplicada_en = Column("Aplicada_en", TIMESTAMP, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DECIMAL, DateTime, String, ForeignKey
+from sqlalchemy import Column, Integer, DECIMAL, DateTime, String, ForeignKey, Index
 from app.db.database import Base
 
 class Pago(Base):
@@ -13,3 +13,11 @@ class Pago(Base):
     tipo_pago = Column("Tipo_pago", String(200), nullable=True)
     medio_pago = Column("Medio_pago", String(20), nullable=True)
     ref_bancaria = Column("Ref_bancaria", String(60), nullable=True)
+    # Clave del cliente (o "ref:<Ref_bancaria>"): un reintento no registra el pago dos veces
+    clave_idempotencia = Column("Clave_Idempotencia", String(80), nullable=True)
+
+    __table_args__ = (
+        Index("ux_pago_clave_idempotencia", clave_idempotencia, unique=True),
+        Index("ix_pago_ref_bancaria", ref_bancaria),
+        Index("ix_pago_fecha", fecha_pago),
+    )
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DECIMAL, TIMESTAMP, ForeignKey, text
+from app.db.database import Base
+
+class ResumenCartera(Base):
+    __tablename__ = "Resumen_Cartera"
+
+    # Un renglón por tipo de artículo, estado del préstamo y tramo de atraso
+    id_tipo = Column("Id_tipo", Integer, ForeignKey("Cat_Tipo_Articulo.IdTipo"), primary_key=True)
+    id_estado = Column("Id_estado", Integer, ForeignKey("Estado_Prestamo.Id_Estado_Prestamo"), primary_key=True)
+    tramo = Column("Tramo", String(10), primary_key=True)  # al_dia | 1_30 | 31_60 | 61_90 | 90_mas
+    prestamos = Column("Prestamos", Integer, nullable=False, default=0)
+    saldo = Column("Saldo", DECIMAL(14, 2), nullable=False, default=0.00)
+    actualizado_en = Column(
+        "Actualizado_en",
+        TIMESTAMP,
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP")
+    )
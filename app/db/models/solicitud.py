@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.database import Base
@@ -15,6 +15,11 @@ class Solicitud(Base):
 
     estado = relationship("EstadoSolicitud", backref="solicitudes")
 
+    # Soporta la paginación por llave de /solicitudes/mis
+    __table_args__ = (
+        Index("ix_solicitud_usuario_fecha", id_usuario, fecha_envio, id_solicitud),
+    )
+
     @property
     def estado_nombre(self):
         return self.estado.Nombre if self.estado else None
@@ -0,0 +1,10 @@
+from sqlalchemy import BigInteger, Column, Integer, String
+from app.db.database import Base
+
+class VersionRecurso(Base):
+    __tablename__ = "Version_Recurso"
+
+    # Contador que sube con cada cambio; base de los ETag (p. ej. ("solicitudes", id_usuario))
+    recurso = Column("Recurso", String(50), primary_key=True)
+    clave = Column("Clave", Integer, primary_key=True, default=0)
+    version = Column("Version", BigInteger, nullable=False, default=0)
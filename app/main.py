@@ -1,8 +1,25 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 
-from app.api.routers import health, auth, solicitudes
+from app.api.condicional import NoModificado, manejar_no_modificado
+from app.api.routers import health, auth, solicitudes, catalogos, menu, prestamos, cartera, cobranza, cobertura, articulos, metricas, pagos
 from app.core.config import settings
+from app.core.logging import configurar_logging
+from app.core.pools import pool_archivos, pool_cpu
+from app.db.database import SessionLocal, engine, read_engine
+from app.middlewares.audit_log import escritor_auditoria
+from app.middlewares.metricas import MiddlewareMetricas
+from app.services.catalogos import registro_catalogos
+from app.services.configuracion import configuracion
+from app.services.google_verifier import verificador_google
+from app.services.salud import monitor_salud
+from app.utils.almacen import almacen
+from app.utils.hashing import pool_hash
+
+configurar_logging(settings.LOG_NIVEL, settings.LOG_FORMATO)
 
 
 def parse_origins(raw: str | None) -> list[str]:
@@ -26,13 +43,38 @@ for o in fallback:
 
 allow_origin_regex = r"https://.*\.vercel\.app"
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Falla al arrancar si falta un estado requerido en los catálogos
+    async with SessionLocal() as db:
+        await registro_catalogos.cargar(db)
+    await configuracion.iniciar(SessionLocal)
+    await verificador_google.iniciar()
+    await escritor_auditoria.iniciar()
+    engines = {"primario": engine} | ({"replica": read_engine} if read_engine is not engine else {})
+    await monitor_salud.iniciar(engines)
+    yield
+    # Primero deja de reportarse listo para que el balanceador drene
+    await monitor_salud.detener()
+    await escritor_auditoria.detener()
+    await verificador_google.detener()
+    await configuracion.detener()
+    pool_hash.cerrar()
+    pool_cpu.cerrar()
+    pool_archivos.cerrar()
+
+
 app = FastAPI(
     title="API Pignoraticios",
+    lifespan=lifespan,
     root_path=getattr(settings, "ROOT_PATH", ""),
     docs_url=getattr(settings, "DOCS_URL", "/docs"),
     redoc_url=None,
 )
 
+app.add_exception_handler(NoModificado, manejar_no_modificado)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -40,11 +82,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Siguiente-Cursor", "ETag", "X-Request-ID"],
 )
+# Último en agregarse = más externo: mide también CORS y los 304
+app.add_middleware(MiddlewareMetricas)
 
 app.include_router(health.router,      prefix="/health",      tags=["health"])
 app.include_router(auth.router,        prefix="/auth",        tags=["auth"])
 app.include_router(solicitudes.router, prefix="/solicitudes", tags=["solicitudes"])
+app.include_router(catalogos.router,   prefix="/catalogos",   tags=["catalogos"])
+app.include_router(menu.router,        prefix="/menu",        tags=["menu"])
+app.include_router(prestamos.router,   prefix="/prestamos",   tags=["prestamos"])
+app.include_router(cartera.router,     prefix="/cartera",     tags=["cartera"])
+app.include_router(cobranza.router,    prefix="/cobranza",    tags=["cobranza"])
+app.include_router(cobertura.router,   prefix="/cobertura",   tags=["cobertura"])
+app.include_router(articulos.router,   prefix="/articulos",   tags=["articulos"])
+app.include_router(pagos.router,       prefix="/pagos",       tags=["pagos"])
+app.include_router(metricas.router,    prefix="/metrics",     tags=["metricas"])
+
+# Fotos y documentos direccionados por contenido: inmutables, cacheables
+almacen.preparar()
+app.mount(settings.MEDIA_URL, StaticFiles(directory=settings.MEDIA_DIR), name="media")
 
 
 @app.get("/")
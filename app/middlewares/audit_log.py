@@ -0,0 +1,252 @@
+"""Escritura de auditoría en segundo plano, por lotes.
+
+`registrar_auditoria` deja cada registro pendiente en la sesión de la
+petición; solo cuando esa transacción hace commit pasa a la cola del
+escritor, que lo inserta junto con otros en INSERTs multi-fila desde una
+tarea de fondo. Si la transacción hace rollback, el registro se descarta.
+
+La cola está acotada: cuando se llena, la petición espera un cupo hasta
+`AUDITORIA_ESPERA_MAX_SEGUNDOS` y, si no lo obtiene, la auditoría se
+escribe dentro de la propia transacción como antes.
+
+Un lote que no se puede insertar se reintenta `AUDITORIA_REINTENTOS` veces
+con espera creciente; si sigue fallando se agrega a `AUDITORIA_RESPALDO`
+(JSON por línea) y el escritor lo vuelve a insertar al iniciar. Solo se
+pierde un registro si tampoco se puede escribir ese archivo (queda en el log).
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models.auditoria import Auditoria
+
+logger = logging.getLogger(__name__)
+
+_PENDIENTES = "auditoria_pendiente"
+
+
+def _json_default(valor):
+    if isinstance(valor, (datetime, date, time)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    return str(valor)
+
+
+def serializar_valores(valores) -> str | None:
+    """JSON compacto con solo los valores de columna (sin `_sa_instance_state`)."""
+    if valores is None:
+        return None
+    if isinstance(valores, dict):
+        datos = {k: v for k, v in valores.items() if not k.startswith("_")}
+    else:
+        # Solo atributos ya cargados: leer uno expirado dispararía IO en contexto async
+        estado = inspect(valores)
+        datos = {a.key: estado.dict[a.key] for a in estado.mapper.column_attrs if a.key in estado.dict}
+    if not datos:
+        return None
+    return json.dumps(datos, default=_json_default, separators=(",", ":"), ensure_ascii=False)
+
+
+class EscritorAuditoria:
+    def __init__(
+        self,
+        max_pendientes: int,
+        tamano_lote: int,
+        intervalo: float,
+        espera_max: float,
+        reintentos: int = 3,
+        espera_reintento: float = 0.5,
+        respaldo: str | None = None,
+    ):
+        self.max_pendientes = max_pendientes
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo
+        self.espera_max = espera_max
+        self.reintentos = reintentos
+        self.espera_reintento = espera_reintento
+        self.respaldo = respaldo
+        self.escritos = 0
+        self.fallidos = 0
+        self.respaldados = 0
+        self.desbordes = 0
+        self._cupos = asyncio.Semaphore(max_pendientes)
+        self._pendientes: deque[dict] = deque()
+        self._hay_datos = asyncio.Event()
+        self._activo = False
+        self._tarea: asyncio.Task | None = None
+
+    @property
+    def activo(self) -> bool:
+        return self._activo
+
+    async def reservar(self) -> bool:
+        """Espera un cupo en la cola; False si no está activo o no hubo cupo a tiempo."""
+        if not self._activo:
+            return False
+        try:
+            await asyncio.wait_for(self._cupos.acquire(), self.espera_max)
+        except asyncio.TimeoutError:
+            self.desbordes += 1
+            return False
+        return True
+
+    def liberar(self, cantidad: int) -> None:
+        for _ in range(cantidad):
+            self._cupos.release()
+
+    def encolar(self, registros: list[dict]) -> None:
+        self._pendientes.extend(registros)
+        if len(self._pendientes) >= self.tamano_lote:
+            self._hay_datos.set()
+
+    async def _insertar(self, lote: list[dict]) -> None:
+        async with SessionLocal() as db:
+            await db.execute(insert(Auditoria), lote)
+            await db.commit()
+
+    async def _escribir(self, lote: list[dict]) -> None:
+        for intento in range(self.reintentos + 1):
+            try:
+                await self._insertar(lote)
+                self.escritos += len(lote)
+                return
+            except Exception:
+                if intento == self.reintentos:
+                    logger.exception("No se pudo escribir un lote de %d registros de auditoría", len(lote))
+                    break
+                espera = self.espera_reintento * 2 ** intento
+                logger.warning("Falló un lote de auditoría; reintento %d en %.1f s", intento + 1, espera)
+                await asyncio.sleep(espera)
+        self.fallidos += len(lote)
+        await self._respaldar(lote)
+
+    def _agregar_respaldo(self, lote: list[dict]) -> None:
+        with open(self.respaldo, "a", encoding="utf-8") as archivo:
+            for registro in lote:
+                archivo.write(json.dumps(registro, default=_json_default, ensure_ascii=False) + "\n")
+            archivo.flush()
+            os.fsync(archivo.fileno())
+
+    async def _respaldar(self, lote: list[dict]) -> None:
+        if not self.respaldo:
+            logger.error("Auditoría perdida (sin AUDITORIA_RESPALDO): %s", lote)
+            return
+        try:
+            await asyncio.to_thread(self._agregar_respaldo, lote)
+            self.respaldados += len(lote)
+        except OSError:
+            logger.exception("No se pudo respaldar la auditoría en %s: %s", self.respaldo, lote)
+
+    def _leer_respaldo(self) -> list[dict] | None:
+        # Se renombra antes de leer: lo que falle de nuevo se agrega a un archivo nuevo
+        recuperando = f"{self.respaldo}.recuperando"
+        if not os.path.exists(recuperando):
+            if not os.path.exists(self.respaldo):
+                return None
+            os.replace(self.respaldo, recuperando)
+        with open(recuperando, encoding="utf-8") as archivo:
+            registros = [json.loads(linea) for linea in archivo if linea.strip()]
+        for registro in registros:
+            registro["fecha_hora"] = datetime.fromisoformat(registro["fecha_hora"])
+        return registros
+
+    async def _recuperar_respaldo(self) -> None:
+        if not self.respaldo:
+            return
+        try:
+            registros = await asyncio.to_thread(self._leer_respaldo)
+        except (OSError, ValueError):
+            logger.exception("No se pudo leer el respaldo de auditoría %s", self.respaldo)
+            return
+        if registros is None:
+            return
+        for i in range(0, len(registros), self.tamano_lote):
+            await self._escribir(registros[i:i + self.tamano_lote])
+        os.remove(f"{self.respaldo}.recuperando")
+        logger.info("Recuperados %d registros de auditoría del respaldo", len(registros))
+
+    async def _vaciar(self) -> None:
+        while self._pendientes:
+            lote = [self._pendientes.popleft() for _ in range(min(self.tamano_lote, len(self._pendientes)))]
+            try:
+                await self._escribir(lote)
+            finally:
+                self.liberar(len(lote))
+
+    async def _bucle(self) -> None:
+        await self._recuperar_respaldo()
+        while self._activo or self._pendientes:
+            try:
+                await asyncio.wait_for(self._hay_datos.wait(), self.intervalo)
+            except asyncio.TimeoutError:
+                pass
+            self._hay_datos.clear()
+            await self._vaciar()
+
+    async def iniciar(self) -> None:
+        if self._tarea is None:
+            # Primitivas nuevas por arranque: quedan ligadas al event loop actual
+            self._cupos = asyncio.Semaphore(self.max_pendientes)
+            self._hay_datos = asyncio.Event()
+            self._activo = True
+            self._tarea = asyncio.create_task(self._bucle())
+
+    async def detener(self) -> None:
+        """Deja de aceptar registros y escribe todo lo pendiente."""
+        if self._tarea is None:
+            return
+        self._activo = False
+        self._hay_datos.set()
+        await self._tarea
+        self._tarea = None
+
+    def estadisticas(self) -> dict:
+        return {
+            "pendientes": len(self._pendientes),
+            "max_pendientes": self.max_pendientes,
+            "escritos": self.escritos,
+            "fallidos": self.fallidos,
+            "respaldados": self.respaldados,
+            "desbordes": self.desbordes,
+        }
+
+
+escritor_auditoria = EscritorAuditoria(
+    max_pendientes=settings.AUDITORIA_MAX_PENDIENTES,
+    tamano_lote=settings.AUDITORIA_TAMANO_LOTE,
+    intervalo=settings.AUDITORIA_INTERVALO_SEGUNDOS,
+    espera_max=settings.AUDITORIA_ESPERA_MAX_SEGUNDOS,
+    reintentos=settings.AUDITORIA_REINTENTOS,
+    espera_reintento=settings.AUDITORIA_ESPERA_REINTENTO_SEGUNDOS,
+    respaldo=settings.AUDITORIA_RESPALDO,
+)
+
+
+def agregar_pendiente(session: Session, registro: dict) -> None:
+    session.info.setdefault(_PENDIENTES, []).append(registro)
+
+
+@event.listens_for(Session, "after_commit")
+def _encolar_al_confirmar(session: Session) -> None:
+    registros = session.info.pop(_PENDIENTES, None)
+    if registros:
+        escritor_auditoria.encolar(registros)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _descartar_sin_confirmar(session: Session, transaction) -> None:
+    if transaction.parent is not None:
+        return
+    registros = session.info.pop(_PENDIENTES, None)
+    if registros:
+        escritor_auditoria.liberar(len(registros))
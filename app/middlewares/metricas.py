@@ -0,0 +1,95 @@
+"""Middleware ASGI de métricas y log por petición.
+
+Por ruta (plantilla, no URL concreta): conteo por estado, histograma de
+latencia, consultas SQL y tiempo en BD por petición. Deja una línea de log
+estructurada por petición y devuelve el id en `X-Request-ID`.
+"""
+import logging
+import time
+import uuid
+
+from app.core.logging import ContextoPeticion, contexto_peticion
+from app.core.metricas import BUCKETS_CONTEO, BUCKETS_SQL, registro
+
+logger = logging.getLogger("app.peticiones")
+
+# Sondas y scraping: varias por segundo, solo se loguean en DEBUG
+RUTAS_SILENCIOSAS = {"/health", "/health/live", "/health/ready", "/metrics"}
+
+http_peticiones = registro.contador(
+    "http_peticiones_total", "Peticiones atendidas", ("metodo", "ruta", "estado")
+)
+http_duracion = registro.histograma(
+    "http_peticion_segundos", "Latencia de las peticiones", ("metodo", "ruta")
+)
+http_consultas = registro.histograma(
+    "http_peticion_consultas", "Consultas SQL por petición", ("metodo", "ruta"), BUCKETS_CONTEO
+)
+http_db = registro.histograma(
+    "http_peticion_db_segundos", "Tiempo en BD por petición", ("metodo", "ruta"), BUCKETS_SQL
+)
+http_en_curso = registro.medidor("http_peticiones_en_curso", "Peticiones en curso")
+
+
+def _id_peticion(scope: dict) -> str:
+    for nombre, valor in scope.get("headers", ()):
+        if nombre == b"x-request-id" and 0 < len(valor) <= 64:
+            return valor.decode("latin-1")
+    return uuid.uuid4().hex[:16]
+
+
+class MiddlewareMetricas:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        ctx = ContextoPeticion(id=_id_peticion(scope), metodo=scope["method"], scope=scope)
+        token = contexto_peticion.set(ctx)
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+                mensaje["headers"] = [*mensaje.get("headers", ()), (b"x-request-id", ctx.id.encode("latin-1"))]
+            await send(mensaje)
+
+        http_en_curso.sumar(1)
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracion = time.perf_counter() - inicio
+            http_en_curso.sumar(-1)
+            ruta = ctx.ruta
+            http_peticiones.inc(ctx.metodo, ruta, str(estado))
+            http_duracion.observar(duracion, ctx.metodo, ruta)
+            http_consultas.observar(ctx.consultas, ctx.metodo, ruta)
+            http_db.observar(ctx.segundos_db, ctx.metodo, ruta)
+            if ruta in RUTAS_SILENCIOSAS:
+                nivel = logging.DEBUG
+            else:
+                nivel = logging.ERROR if estado >= 500 else logging.INFO
+            logger.log(
+                nivel,
+                "%s %s %d %.1f ms",
+                ctx.metodo,
+                scope["path"],
+                estado,
+                duracion * 1000,
+                extra={
+                    "datos": {
+                        "metodo": ctx.metodo,
+                        "path": scope["path"],
+                        "estado": estado,
+                        "duracion_ms": round(duracion * 1000, 1),
+                        "consultas": ctx.consultas,
+                        "db_ms": round(ctx.segundos_db * 1000, 1),
+                    }
+                },
+            )
+            contexto_peticion.reset(token)
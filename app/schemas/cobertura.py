@@ -0,0 +1,28 @@
+from datetime import datetime
+from decimal import Decimal
+
+from pydantic import BaseModel, Field
+
+
+class UbicacionEntrega(BaseModel):
+    departamento: str | None = Field(None, max_length=60)
+    municipio: str | None = Field(None, max_length=60)
+    zona: str | None = Field(None, max_length=20)
+    colonia: str | None = Field(None, max_length=80)
+
+
+class DireccionVerificar(UbicacionEntrega):
+    direccion: str | None = Field(None, max_length=300, description="Texto libre si no hay campos estructurados")
+    valor: Decimal | None = None
+
+
+class VerificacionLote(BaseModel):
+    momento: datetime | None = None
+    direcciones: list[DireccionVerificar] = Field(..., max_length=1000)
+
+
+class VerificacionOut(BaseModel):
+    permitido: bool
+    motivo: str | None = None
+    id_zona: int | None = None
+    riesgo: str | None = None
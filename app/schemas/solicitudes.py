@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 class SolicitudOut(BaseModel):
@@ -5,6 +7,7 @@ class SolicitudOut(BaseModel):
     estado: str
     metodo_entrega: str
     direccion_entrega: str | None
+    fecha_envio: datetime | None = None
 
     class Config:
         from_attributes = True
@@ -0,0 +1,186 @@
+"""Tablas de amortización (cuota fija, sistema francés) para préstamos.
+
+Los factores de anualidad de muchos préstamos o escenarios se calculan de
+una vez como arreglos de numpy (una fila por préstamo, una columna por
+cuota). Cada tabla se arma después en Decimal sobre el saldo redondeado a
+centavos: el interés es saldo × tasa y la cuota se recalcula sobre el saldo
+que queda, así el redondeo no se acumula de una cuota a la siguiente (las
+cuotas difieren a lo sumo en centavos) y la última liquida exacto el capital.
+
+Al generar las cuotas de un préstamo su interés programado se carga al
+préstamo (`interes_acumulada` y `deuda_actual`, más un movimiento INTERES):
+la deuda queda igual a la suma de las cuotas y un pago se reparte primero a
+ese interés. Desde entonces el devengo diario ya no le cobra interés
+ordinario (app/tasks/cron_prestamos.py).
+"""
+import calendar
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+from sqlalchemy import exists, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.cuota import Cuota
+from app.db.models.prestamo import Prestamo
+from app.db.models.prestamo_movimiento import PrestamoMovimiento
+from app.services.cartera import actualizar_prestamos
+from app.services.configuracion import configuracion
+
+CENTAVO = Decimal("0.01")
+
+
+@dataclass(frozen=True)
+class CuotaPlan:
+    numero: int
+    fecha_venc: date
+    monto: Decimal
+    capital: Decimal
+    interes: Decimal
+    saldo: Decimal
+
+
+def sumar_meses(fecha: date, meses: int) -> date:
+    total = fecha.month - 1 + meses
+    anio, mes = fecha.year + total // 12, total % 12 + 1
+    return date(anio, mes, min(fecha.day, calendar.monthrange(anio, mes)[1]))
+
+
+def meses_entre(inicio: date, fin: date) -> int:
+    meses = (fin.year - inicio.year) * 12 + fin.month - inicio.month
+    return max(meses, 1)
+
+
+def cuota_fija(montos: np.ndarray, tasas: np.ndarray, plazos: np.ndarray) -> np.ndarray:
+    montos, tasas, plazos = (np.asarray(a, dtype=np.float64) for a in (montos, tasas, plazos))
+    con_tasa = tasas > 0
+    # Con tasa 0 la fórmula se indetermina: la cuota es monto / plazo
+    seguras = np.where(con_tasa, tasas, 1.0)
+    # 1 - (1 + t)^-n con expm1/log1p: sin cancelación cuando la tasa es muy chica
+    descuento = -np.expm1(-plazos * np.log1p(seguras))
+    return np.where(con_tasa, montos * seguras / descuento, montos / plazos)
+
+
+def _a_centavos(valor: float) -> Decimal:
+    return Decimal(repr(float(valor))).quantize(CENTAVO, ROUND_HALF_UP)
+
+
+def _plan(monto: Decimal, tasa: Decimal, factores: np.ndarray, fecha_inicio: date) -> list[CuotaPlan]:
+    plan, saldo, plazo = [], monto, len(factores)
+    for i in range(plazo):
+        intr = (saldo * tasa).quantize(CENTAVO, ROUND_HALF_UP)
+        if i == plazo - 1:
+            cap = saldo
+        else:
+            cuota = _a_centavos(float(saldo) * factores[i])
+            cap = min(max(cuota - intr, Decimal("0.00")), saldo)
+        saldo -= cap
+        plan.append(CuotaPlan(
+            numero=i + 1,
+            fecha_venc=sumar_meses(fecha_inicio, i + 1),
+            monto=cap + intr,
+            capital=cap,
+            interes=intr,
+            saldo=saldo,
+        ))
+    return plan
+
+
+def planes(
+    montos: list[Decimal],
+    tasas: list[Decimal],
+    plazos: list[int],
+    fechas_inicio: list[date],
+) -> list[list[CuotaPlan]]:
+    if not montos:
+        return []
+    plazos = np.asarray(plazos, dtype=np.int64)
+    # Cuota por peso de saldo con `plazo - k` cuotas por delante, para cada préstamo y cuota k
+    restantes = np.maximum(plazos[:, None] - np.arange(int(plazos.max()))[None, :], 1)
+    tasas_f = np.asarray([float(t) for t in tasas])[:, None]
+    factores = cuota_fija(np.ones(restantes.shape), np.broadcast_to(tasas_f, restantes.shape), restantes)
+    return [
+        _plan(Decimal(m).quantize(CENTAVO), Decimal(str(t)), factores[i, :n], f)
+        for i, (m, t, n, f) in enumerate(zip(montos, tasas, plazos.tolist(), fechas_inicio))
+    ]
+
+
+def simular(monto: Decimal, escenarios: list[tuple[Decimal, int]], fecha_inicio: date) -> list[list[CuotaPlan]]:
+    """Una tabla por escenario (tasa mensual, plazo en meses) en una sola pasada."""
+    return planes(
+        [monto] * len(escenarios),
+        [t for t, _ in escenarios],
+        [n for _, n in escenarios],
+        [fecha_inicio] * len(escenarios),
+    )
+
+
+async def generar_cuotas(
+    db: AsyncSession,
+    ids_prestamo: list[int],
+    tasa_mensual: Decimal | None = None,
+    tamano_lote: int = 1000,
+) -> int:
+    """Crea las cuotas de los préstamos indicados que aún no tienen; devuelve cuántas."""
+    # Sin tasa explícita, la vigente a la fecha de inicio de cada préstamo
+    tasa_en = configuracion.resolvedor("TASA_INTERES_MENSUAL") if tasa_mensual is None else (lambda _: tasa_mensual)
+    total = 0
+    for i in range(0, len(ids_prestamo), tamano_lote):
+        lote = ids_prestamo[i:i + tamano_lote]
+        result = await db.execute(
+            select(
+                Prestamo.id_prestamo,
+                Prestamo.monto_prestamo,
+                Prestamo.deuda_actual,
+                Prestamo.interes_acumulada,
+                Prestamo.fecha_inicio,
+                Prestamo.fecha_vencimiento,
+            )
+            .where(Prestamo.id_prestamo.in_(lote))
+            .where(~exists().where(Cuota.id_prestamo == Prestamo.id_prestamo))
+            .order_by(Prestamo.id_prestamo)
+            # Se escriben valores absolutos: un pago o el devengo no pueden colarse en medio
+            .with_for_update()
+        )
+        filas = result.all()
+        if not filas:
+            continue
+
+        tablas_lote = planes(
+            [f.monto_prestamo for f in filas],
+            [tasa_en(f.fecha_inicio) for f in filas],
+            [meses_entre(f.fecha_inicio, f.fecha_vencimiento) for f in filas],
+            [f.fecha_inicio for f in filas],
+        )
+        cuotas = [
+            {"id_prestamo": f.id_prestamo, "numero": c.numero, "fecha_venc": c.fecha_venc, "monto": c.monto, "pagada": 0}
+            for f, plan in zip(filas, tablas_lote)
+            for c in plan
+        ]
+        await db.execute(insert(Cuota), cuotas)
+
+        ahora = datetime.now()
+        intereses = [sum((c.interes for c in plan), Decimal("0.00")) for plan in tablas_lote]
+        await db.execute(update(Prestamo), [
+            {
+                "id_prestamo": f.id_prestamo,
+                "deuda_actual": f.deuda_actual + interes,
+                "interes_acumulada": f.interes_acumulada + interes,
+                "updated_at": ahora,
+            }
+            for f, interes in zip(filas, intereses)
+        ])
+        movimientos = [
+            {"id_prestamo": f.id_prestamo, "tipo": "INTERES", "monto": interes,
+             "nota": f"Interés de la tabla de amortización ({len(plan)} cuotas)"}
+            for f, plan, interes in zip(filas, tablas_lote, intereses)
+            if interes > 0
+        ]
+        if movimientos:
+            await db.execute(insert(PrestamoMovimiento), movimientos)
+        await actualizar_prestamos(db, [f.id_prestamo for f in filas])
+        total += len(cuotas)
+
+    await db.commit()
+    return total
@@ -2,9 +2,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.db.models.user import User
 from app.schemas.auth import UserRegister
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.utils.hashing import hash_password_async, verify_password_async
 
 
 class AuthService:
@@ -14,7 +12,7 @@ class AuthService:
         if exists.scalar_one_or_none():
             raise ValueError("El correo ya está en uso")
 
-        hashed_password = pwd_context.hash(data.password)
+        hashed_password = await hash_password_async(data.password)
         new_user = User(
             Nombre=data.username,
             Correo=data.email,
@@ -29,6 +27,6 @@ class AuthService:
     async def authenticate_user(email: str, password: str, db: AsyncSession):
         result = await db.execute(select(User).where(User.Correo == email))
         user = result.scalar_one_or_none()
-        if not user or not pwd_context.verify(password, user.Contrasena_hash):
+        if not user or not await verify_password_async(password, user.Contrasena_hash):
             return None
         return user
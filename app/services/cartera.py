@@ -0,0 +1,195 @@
+"""Resumen de antigüedad de la cartera (aging) mantenido por diferencias.
+
+`Cartera_Prestamo` guarda el aporte vigente de cada préstamo (tipo de
+artículo, estado, tramo y saldo). Cuando un préstamo cambia (pago, cuotas,
+estado) se recalcula solo ese préstamo y a `Resumen_Cartera` se le aplica
+la diferencia: a lo sumo dos renglones por préstamo. `avanzar_dia` mueve
+de tramo los préstamos que cruzan un límite por el paso del tiempo y
+`reconstruir` recalcula todo para conciliar.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import and_, case, delete, exists, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.db.models.articulo import Articulo
+from app.db.models.cartera_prestamo import CarteraPrestamo
+from app.db.models.cuota import Cuota
+from app.db.models.prestamo import Prestamo
+from app.db.models.resumen_cartera import ResumenCartera
+from app.utils.insercion import insertar_o_sumar
+
+# (tramo, primer día de atraso del tramo)
+TRAMOS = (("al_dia", 0), ("1_30", 1), ("31_60", 31), ("61_90", 61), ("90_mas", 91))
+CERO = Decimal("0.00")
+
+
+def tramo_para(dias_atraso: int) -> str:
+    actual = TRAMOS[0][0]
+    for nombre, desde in TRAMOS:
+        if dias_atraso >= desde:
+            actual = nombre
+    return actual
+
+
+def _consulta_estado(ids: list[int] | None = None, desde_id: int = 0, limite: int | None = None):
+    # Un préstamo sin tabla de cuotas vence de una sola vez en su Fecha_Vencimiento
+    cualquiera = aliased(Cuota)
+    sin_cuotas = and_(
+        ~exists().where(cualquiera.id_prestamo == Prestamo.id_prestamo),
+        Prestamo.deuda_actual > 0,
+    )
+    query = (
+        select(
+            Prestamo.id_prestamo,
+            Articulo.id_tipo,
+            Prestamo.id_estado,
+            Prestamo.deuda_actual,
+            func.coalesce(
+                func.min(Cuota.fecha_venc),
+                case((sin_cuotas, Prestamo.fecha_vencimiento)),
+            ).label("primer_venc"),
+        )
+        .join(Articulo, Prestamo.id_articulo == Articulo.id_articulo)
+        .outerjoin(Cuota, and_(Cuota.id_prestamo == Prestamo.id_prestamo, Cuota.pagada == 0))
+        .group_by(
+            Prestamo.id_prestamo, Articulo.id_tipo, Prestamo.id_estado, Prestamo.deuda_actual,
+            Prestamo.fecha_vencimiento,
+        )
+        .order_by(Prestamo.id_prestamo)
+    )
+    if ids is not None:
+        query = query.where(Prestamo.id_prestamo.in_(ids))
+    else:
+        query = query.where(Prestamo.id_prestamo > desde_id).limit(limite)
+    return query
+
+
+def _aporte(fila, hoy: date) -> dict:
+    dias = (hoy - fila.primer_venc).days if fila.primer_venc else 0
+    return {
+        "id_prestamo": fila.id_prestamo,
+        "id_tipo": fila.id_tipo,
+        "id_estado": fila.id_estado,
+        "tramo": tramo_para(dias),
+        "saldo": fila.deuda_actual,
+        "primer_venc_pendiente": fila.primer_venc,
+    }
+
+
+async def _aplicar_deltas(db: AsyncSession, deltas: dict[tuple, list]) -> None:
+    # Orden fijo de llaves: dos préstamos que tocan los mismos renglones no se bloquean en cruz
+    for (id_tipo, id_estado, tramo), (n, saldo) in sorted(deltas.items()):
+        if n == 0 and saldo == 0:
+            continue
+        await db.execute(insertar_o_sumar(
+            db.bind.dialect,
+            ResumenCartera,
+            {"id_tipo": id_tipo, "id_estado": id_estado, "tramo": tramo, "prestamos": n, "saldo": saldo},
+            ["prestamos", "saldo"],
+        ))
+
+
+async def actualizar_prestamos(db: AsyncSession, ids: list[int], hoy: date | None = None) -> None:
+    """Recalcula el aporte de estos préstamos y ajusta solo los tramos afectados.
+
+    No hace commit: corre dentro de la transacción de quien lo llama.
+    """
+    if not ids:
+        return
+    hoy = hoy or date.today()
+
+    # Bloquea las fotos previas para que dos actualizaciones del mismo préstamo no se pisen
+    result = await db.execute(
+        select(CarteraPrestamo).where(CarteraPrestamo.id_prestamo.in_(ids)).with_for_update()
+    )
+    previos = {p.id_prestamo: p for p in result.scalars().all()}
+    result = await db.execute(_consulta_estado(ids=ids))
+    nuevos = {f.id_prestamo: _aporte(f, hoy) for f in result.all()}
+
+    deltas: dict[tuple, list] = defaultdict(lambda: [0, CERO])
+    for p in previos.values():
+        d = deltas[(p.id_tipo, p.id_estado, p.tramo)]
+        d[0] -= 1
+        d[1] -= p.saldo
+    for a in nuevos.values():
+        d = deltas[(a["id_tipo"], a["id_estado"], a["tramo"])]
+        d[0] += 1
+        d[1] += a["saldo"]
+    await _aplicar_deltas(db, deltas)
+
+    cambiados = [a for i, a in nuevos.items() if i in previos]
+    agregados = [a for i, a in nuevos.items() if i not in previos]
+    eliminados = [i for i in previos if i not in nuevos]
+    if cambiados:
+        await db.execute(update(CarteraPrestamo), cambiados)
+    if agregados:
+        await db.execute(insert(CarteraPrestamo), agregados)
+    if eliminados:
+        await db.execute(delete(CarteraPrestamo).where(CarteraPrestamo.id_prestamo.in_(eliminados)))
+
+
+async def avanzar_dia(db: AsyncSession, hoy: date | None = None, tamano_lote: int = 5000) -> int:
+    """Reevalúa solo los préstamos cuyo atraso cruzó un límite de tramo."""
+    hoy = hoy or date.today()
+    condiciones = []
+    for i, (_, desde) in enumerate(TRAMOS[1:], start=1):
+        anteriores = [nombre for nombre, _ in TRAMOS[:i]]
+        condiciones.append(and_(
+            CarteraPrestamo.tramo.in_(anteriores),
+            CarteraPrestamo.primer_venc_pendiente <= hoy - timedelta(days=desde),
+        ))
+
+    result = await db.execute(select(CarteraPrestamo.id_prestamo).where(or_(*condiciones)))
+    ids = list(result.scalars().all())
+    for i in range(0, len(ids), tamano_lote):
+        await actualizar_prestamos(db, ids[i:i + tamano_lote], hoy)
+        await db.commit()
+    return len(ids)
+
+
+async def reconstruir(db: AsyncSession, hoy: date | None = None, tamano_lote: int = 5000) -> int:
+    """Recalcula todo desde Prestamo y Cuota (conciliación)."""
+    hoy = hoy or date.today()
+    await db.execute(delete(CarteraPrestamo))
+    await db.execute(delete(ResumenCartera))
+
+    totales: dict[tuple, list] = defaultdict(lambda: [0, CERO])
+    ultimo_id, total = 0, 0
+    while True:
+        result = await db.execute(_consulta_estado(desde_id=ultimo_id, limite=tamano_lote))
+        filas = result.all()
+        if not filas:
+            break
+        ultimo_id = filas[-1].id_prestamo
+        aportes = [_aporte(f, hoy) for f in filas]
+        await db.execute(insert(CarteraPrestamo), aportes)
+        for a in aportes:
+            t = totales[(a["id_tipo"], a["id_estado"], a["tramo"])]
+            t[0] += 1
+            t[1] += a["saldo"]
+        total += len(aportes)
+
+    if totales:
+        await db.execute(insert(ResumenCartera), [
+            {"id_tipo": k[0], "id_estado": k[1], "tramo": k[2], "prestamos": n, "saldo": s}
+            for k, (n, s) in totales.items()
+        ])
+    await db.commit()
+    return total
+
+
+async def consultar(db: AsyncSession, id_tipo: int | None = None, id_estado: int | None = None) -> list[dict]:
+    query = select(ResumenCartera).where(ResumenCartera.prestamos != 0)
+    if id_tipo is not None:
+        query = query.where(ResumenCartera.id_tipo == id_tipo)
+    if id_estado is not None:
+        query = query.where(ResumenCartera.id_estado == id_estado)
+    result = await db.execute(query)
+    return [
+        {"id_tipo": r.id_tipo, "id_estado": r.id_estado, "tramo": r.tramo, "prestamos": r.prestamos, "saldo": r.saldo}
+        for r in result.scalars().all()
+    ]
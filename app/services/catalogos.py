@@ -0,0 +1,122 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Mapping
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.cat_tipo_articulo import CatTipoArticulo
+from app.db.models.estado_articulo import EstadoArticulo
+from app.db.models.estado_inventario import EstadoInventario
+from app.db.models.estado_pago import EstadoPago
+from app.db.models.estado_prestamo import EstadoPrestamo
+from app.db.models.estado_solicitud import EstadoSolicitud
+
+
+class CatalogoIncompleto(Exception):
+    pass
+
+
+def _normalizar(nombre: str) -> str:
+    return nombre.strip().lower()
+
+
+@dataclass(frozen=True)
+class Catalogo:
+    tabla: str
+    por_nombre: Mapping[str, int]
+    por_id: Mapping[int, str]
+
+    def id(self, nombre: str) -> int:
+        try:
+            return self.por_nombre[_normalizar(nombre)]
+        except KeyError:
+            raise CatalogoIncompleto(f"'{nombre}' no existe en {self.tabla}") from None
+
+    def nombre(self, id_: int) -> str:
+        return self.por_id.get(id_, "")
+
+    def __contains__(self, nombre: str) -> bool:
+        return _normalizar(nombre) in self.por_nombre
+
+
+@dataclass(frozen=True)
+class Catalogos:
+    estado_solicitud: Catalogo
+    estado_articulo: Catalogo
+    estado_prestamo: Catalogo
+    estado_pago: Catalogo
+    estado_inventario: Catalogo
+    tipo_articulo: Catalogo
+    cargado_en: datetime
+    version: str  # huella del contenido: igual en todos los procesos con los mismos datos
+
+
+# catálogo -> (columna id, columna nombre)
+_FUENTES = {
+    "estado_solicitud": (EstadoSolicitud.Id_Estado_Solicitud, EstadoSolicitud.Nombre),
+    "estado_articulo": (EstadoArticulo.id_estado_articulo, EstadoArticulo.nombre),
+    "estado_prestamo": (EstadoPrestamo.id_estado_prestamo, EstadoPrestamo.nombre),
+    "estado_pago": (EstadoPago.id_estado_pago, EstadoPago.nombre),
+    "estado_inventario": (EstadoInventario.id_estado_inventario, EstadoInventario.nombre),
+    "tipo_articulo": (CatTipoArticulo.id_tipo, CatTipoArticulo.nombre),
+}
+
+# Valores de los que depende el código; si faltan, la app no arranca
+REQUERIDOS: dict[str, tuple[str, ...]] = {
+    "estado_solicitud": ("pendiente",),
+    "estado_prestamo": (settings.ESTADO_PRESTAMO_PAGADO,),
+    "estado_pago": (settings.ESTADO_PAGO_APLICADO, settings.ESTADO_PAGO_PENDIENTE),
+}
+
+
+class RegistroCatalogos:
+    """Catálogos Estado_* y Cat_Tipo_Articulo cargados una vez en memoria.
+
+    Cada carga produce un `Catalogos` inmutable que reemplaza al anterior de
+    una sola vez; los lectores nunca ven un estado a medias.
+    """
+
+    def __init__(self):
+        self._actual: Catalogos | None = None
+
+    async def cargar(self, db: AsyncSession) -> Catalogos:
+        catalogos = {}
+        for nombre, (col_id, col_nombre) in _FUENTES.items():
+            result = await db.execute(select(col_id, col_nombre))
+            filas = result.all()
+            catalogos[nombre] = Catalogo(
+                tabla=col_id.class_.__tablename__,
+                por_nombre=MappingProxyType({_normalizar(n): i for i, n in filas}),
+                por_id=MappingProxyType({i: n for i, n in filas}),
+            )
+
+        faltantes = [
+            f"{catalogos[c].tabla}.{v}"
+            for c, valores in REQUERIDOS.items()
+            for v in valores
+            if v not in catalogos[c]
+        ]
+        if faltantes:
+            raise CatalogoIncompleto(f"Faltan valores de catálogo requeridos: {', '.join(faltantes)}")
+
+        huella = hashlib.sha1(
+            repr(sorted((c, sorted(cat.por_id.items())) for c, cat in catalogos.items())).encode()
+        ).hexdigest()[:16]
+        self._actual = Catalogos(**catalogos, cargado_en=datetime.now(), version=huella)
+        return self._actual
+
+    def actual(self) -> Catalogos:
+        if self._actual is None:
+            raise RuntimeError("Catálogos no cargados; se cargan al iniciar la aplicación")
+        return self._actual
+
+
+registro_catalogos = RegistroCatalogos()
+
+
+def catalogos() -> Catalogos:
+    return registro_catalogos.actual()
@@ -0,0 +1,304 @@
+import asyncio
+import logging
+import re
+import time as reloj
+import unicodedata
+from functools import lru_cache
+from dataclasses import dataclass, field
+from datetime import datetime, time
+from decimal import Decimal
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.db.models.cobertura_zona import CoberturaZona
+
+logger = logging.getLogger(__name__)
+
+# Un nivel vacío en Cobertura_Zona cubre todo lo que cuelga del nivel anterior
+COMODIN = "*"
+
+_PREFIJOS = re.compile(r"^(departamento|depto|municipio|mun|zona|z|colonia|col|barrio|bo|residencial|res)\b\.?\s*")
+_NO_ALFANUM = re.compile(r"[^a-z0-9]+")
+
+# Lunes = 0, como datetime.weekday()
+_NOMBRES_DIAS = ("lunes", "martes", "miercoles", "jueves", "viernes", "sabado", "domingo")
+# Una letra por día (X = miércoles) para la forma compacta 'LMXJV'
+_LETRAS = {"l": 0, "m": 1, "x": 2, "j": 3, "v": 4, "s": 5, "d": 6}
+_TODOS_LOS_DIAS = frozenset(range(7))
+
+
+def _sin_acentos(texto: str) -> str:
+    texto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in texto if not unicodedata.combining(c)).lower().strip()
+
+
+@lru_cache(maxsize=8192)
+def normalizar(texto: str | None) -> str:
+    """'Zona 10' y 'zona  10.' -> '10'; 'Mixco' y 'MIXCÓ' -> 'mixco'."""
+    if not texto:
+        return ""
+    texto = _PREFIJOS.sub("", _sin_acentos(texto))
+    return _NO_ALFANUM.sub(" ", texto).strip()
+
+
+class DiasInvalidos(ValueError):
+    pass
+
+
+def _dia(token: str) -> int | None:
+    """'lunes', 'sabados', 'mie', 'vi', 'l', '1' -> día; None si no es un solo día."""
+    if token in _LETRAS:
+        return _LETRAS[token]
+    if token.isdigit():
+        return int(token) - 1 if 1 <= int(token) <= 7 else None
+    if len(token) >= 2:
+        singular = token[:-1] if token.endswith("s") and token[:-1] in _NOMBRES_DIAS else token
+        # Los nombres difieren desde la segunda letra: cualquier prefijo de 2+ letras es único
+        for n, nombre in enumerate(_NOMBRES_DIAS):
+            if nombre.startswith(singular):
+                return n
+    return None
+
+
+def parsear_dias(crudo: str | None) -> frozenset[int]:
+    """Acepta 'L-V', 'Lunes a Viernes', 'lun,mie,vie', 'Sábados', 'LMXJV' o '1-5'. Vacío = todos.
+
+    Lanza DiasInvalidos si algún fragmento no es un día, un rango o la forma compacta.
+    """
+    texto = _sin_acentos(crudo or "")
+    if not texto:
+        return _TODOS_LOS_DIAS
+    texto = re.sub(r"\s+(?:a|al|hasta)\s+", "-", texto)
+    texto = re.sub(r"\s*-\s*", "-", texto)
+    dias: set[int] = set()
+    for parte in re.split(r"[,;/\s]+", texto):
+        if not parte or parte in ("y", "e"):
+            continue
+        if "-" in parte:
+            ini, _, fin = parte.partition("-")
+            ini, fin = _dia(ini), _dia(fin)
+            if ini is None or fin is None:
+                raise DiasInvalidos(f"Rango de días inválido: {parte!r}")
+            dias.update(range(ini, fin + 1) if ini <= fin else [*range(ini, 7), *range(0, fin + 1)])
+        elif (dia := _dia(parte)) is not None:
+            dias.add(dia)
+        elif all(c in _LETRAS for c in parte):
+            dias.update(_LETRAS[c] for c in parte)  # 'lmxjv'
+        else:
+            raise DiasInvalidos(f"Día inválido: {parte!r}")
+    return frozenset(dias) or _TODOS_LOS_DIAS
+
+
+@dataclass(frozen=True, slots=True)
+class ReglaZona:
+    id_zona: int
+    permite_recoleccion: bool
+    limite_valor: Decimal | None
+    horario_inicio: time | None
+    horario_fin: time | None
+    dias: frozenset[int]
+    riesgo: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class Verificacion:
+    permitido: bool
+    motivo: str | None = None
+    id_zona: int | None = None
+    riesgo: str | None = None
+
+
+@dataclass
+class _Nodo:
+    regla: ReglaZona | None = None
+    hijos: dict[str, "_Nodo"] = field(default_factory=dict)
+
+
+def _en_horario(regla: ReglaZona, hora: time) -> bool:
+    inicio, fin = regla.horario_inicio, regla.horario_fin
+    if inicio is None or fin is None:
+        return True
+    if inicio <= fin:
+        return inicio <= hora <= fin
+    return hora >= inicio or hora <= fin  # horario que cruza la medianoche
+
+
+def evaluar(regla: ReglaZona | None, valor: Decimal | None, momento: datetime) -> Verificacion:
+    if regla is None:
+        return Verificacion(False, "Dirección fuera de las zonas de cobertura")
+    base = {"id_zona": regla.id_zona, "riesgo": regla.riesgo}
+    if not regla.permite_recoleccion:
+        return Verificacion(False, "La zona no permite recolección", **base)
+    if valor is not None and regla.limite_valor is not None and valor > regla.limite_valor:
+        return Verificacion(False, f"El valor excede el límite de la zona ({regla.limite_valor})", **base)
+    if momento.weekday() not in regla.dias:
+        return Verificacion(False, "Día no hábil para recolección en la zona", **base)
+    if not _en_horario(regla, momento.time()):
+        return Verificacion(False, "Fuera del horario de recolección de la zona", **base)
+    return Verificacion(True, **base)
+
+
+class IndiceCobertura:
+    """Árbol departamento -> municipio -> zona -> colonia con nombres normalizados.
+
+    Cada consulta baja por el árbol (o por el comodín si el nivel no se
+    especifica en la tabla) y se queda con la regla más específica. La carga
+    es completa e inmutable; se reemplaza al cambiar Cobertura_Zona o al
+    vencer `recarga_segundos` (cambios hechos por otros procesos).
+    """
+
+    def __init__(self, recarga_segundos: float):
+        self.recarga_segundos = recarga_segundos
+        self._generacion = 0
+        self._raiz: _Nodo | None = None
+        self._cargado = (-1, 0.0)  # (generación, instante de carga)
+        self._zonas = 0
+        self._lock = asyncio.Lock()
+
+    def _vigente(self) -> bool:
+        generacion, instante = self._cargado
+        return (
+            self._raiz is not None
+            and generacion == self._generacion
+            and reloj.monotonic() - instante < self.recarga_segundos
+        )
+
+    async def _cargar(self, db: AsyncSession) -> None:
+        generacion = self._generacion
+        result = await db.execute(select(CoberturaZona).where(CoberturaZona.activo.is_(True)))
+        raiz, zonas = _Nodo(), 0
+        for z in result.scalars().all():
+            nodo = raiz
+            for nivel in (z.departamento, z.municipio, z.zona, z.colonia_barrio):
+                nodo = nodo.hijos.setdefault(normalizar(nivel) or COMODIN, _Nodo())
+            # Filas duplicadas: gana la de menor Id_Zona
+            if nodo.regla is None or z.id_zona < nodo.regla.id_zona:
+                try:
+                    dias = parsear_dias(z.dias_habiles)
+                except DiasInvalidos as e:
+                    # Sin adivinar: la zona no recibe recolecciones hasta corregir Dias_habiles
+                    logger.error("Cobertura_Zona %s: %s; la zona queda sin días hábiles", z.id_zona, e)
+                    dias = frozenset()
+                nodo.regla = ReglaZona(
+                    id_zona=z.id_zona,
+                    permite_recoleccion=bool(z.permite_recoleccion),
+                    limite_valor=z.limite_valor,
+                    horario_inicio=z.horario_inicio,
+                    horario_fin=z.horario_fin,
+                    dias=dias,
+                    riesgo=z.riesgo,
+                )
+                zonas += 1
+        self._raiz, self._zonas = raiz, zonas
+        self._cargado = (generacion, reloj.monotonic())
+
+    async def asegurar(self, db: AsyncSession) -> None:
+        if self._vigente():
+            return
+        async with self._lock:
+            if not self._vigente():
+                await self._cargar(db)
+
+    @property
+    def configurado(self) -> bool:
+        """Sin zonas cargadas no se restringe la recolección."""
+        return self._zonas > 0
+
+    def regla_para(
+        self,
+        departamento: str | None,
+        municipio: str | None = None,
+        zona: str | None = None,
+        colonia: str | None = None,
+    ) -> ReglaZona | None:
+        nodo, mejor = self._raiz, None
+        for nivel in (departamento, municipio, zona, colonia):
+            if nodo is None:
+                break
+            clave = normalizar(nivel)
+            nodo = (nodo.hijos.get(clave) if clave else None) or nodo.hijos.get(COMODIN)
+            if nodo is not None and nodo.regla is not None:
+                mejor = nodo.regla
+        return mejor
+
+    def regla_para_texto(self, direccion: str) -> ReglaZona | None:
+        """Ubica una dirección libre buscando sus segmentos (por comas) en el árbol."""
+        segmentos = [s for s in (normalizar(s) for s in re.split(r"[,\n]+", direccion)) if s]
+        nodo, mejor = self._raiz, None
+        while nodo is not None and nodo.hijos:
+            siguiente = next((nodo.hijos[s] for s in segmentos if s in nodo.hijos), None)
+            nodo = siguiente or nodo.hijos.get(COMODIN)
+            if nodo is not None and nodo.regla is not None:
+                mejor = nodo.regla
+        return mejor
+
+    def verificar(
+        self,
+        departamento: str | None,
+        municipio: str | None = None,
+        zona: str | None = None,
+        colonia: str | None = None,
+        valor: Decimal | None = None,
+        momento: datetime | None = None,
+    ) -> Verificacion:
+        regla = self.regla_para(departamento, municipio, zona, colonia)
+        return evaluar(regla, valor, momento or datetime.now())
+
+    def verificar_texto(
+        self,
+        direccion: str,
+        valor: Decimal | None = None,
+        momento: datetime | None = None,
+    ) -> Verificacion:
+        return evaluar(self.regla_para_texto(direccion), valor, momento or datetime.now())
+
+    def verificar_entrega(
+        self,
+        direccion: str | None,
+        departamento: str | None = None,
+        municipio: str | None = None,
+        zona: str | None = None,
+        colonia: str | None = None,
+        valor: Decimal | None = None,
+        momento: datetime | None = None,
+    ) -> Verificacion:
+        """Usa los campos estructurados si vienen; si no, ubica el texto libre."""
+        if any((departamento, municipio, zona, colonia)):
+            return self.verificar(departamento, municipio, zona, colonia, valor, momento)
+        return self.verificar_texto(direccion or "", valor, momento)
+
+    def invalidar(self) -> None:
+        self._generacion += 1
+
+    def estadisticas(self) -> dict:
+        return {"generacion": self._generacion, "zonas": self._zonas, "vigente": self._vigente()}
+
+
+indice_cobertura = IndiceCobertura(recarga_segundos=settings.COBERTURA_RECARGA_SEGUNDOS)
+
+
+# Marca en el flush y recarga tras el commit: invalidar antes dejaría que una
+# verificación concurrente reconstruya el índice con las zonas aún sin confirmar
+_PENDIENTE = "cobertura_a_invalidar"
+
+
+def _marcar(mapper, connection, target) -> None:
+    object_session(target).info[_PENDIENTE] = True
+
+
+for _evento in ("after_insert", "after_update", "after_delete"):
+    event.listen(CoberturaZona, _evento, _marcar)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_al_confirmar(session: Session) -> None:
+    if session.info.pop(_PENDIENTE, False):
+        indice_cobertura.invalidar()
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_al_revertir(session: Session) -> None:
+    session.info.pop(_PENDIENTE, None)
@@ -0,0 +1,162 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+
+from sqlalchemy import and_, delete, exists, func, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.pools import pool_cpu
+from app.db.models.cuota import Cuota
+from app.db.models.estado_prestamo import EstadoPrestamo
+from app.db.models.prestamo import Prestamo
+from app.db.models.recepcion_articulo import RecepcionArticulo
+from app.db.models.roles import Rol
+from app.db.models.ruta_cobranza import RutaCobranza
+from app.db.models.user import User
+from app.db.models.usuario_rol import UsuarioRol
+from app.db.models.visitas_cobranza import VisitasCobranza
+from app.services import rutas
+
+RESULTADO_PLANIFICADA = "PLANIFICADA"
+
+
+@dataclass
+class PlanCobranza:
+    fecha: date
+    paradas: int = 0
+    sin_ubicacion: list[int] = field(default_factory=list)
+    rutas: list[dict] = field(default_factory=list)
+    segundos: float = 0.0
+
+
+async def _ids_cobradores(db: AsyncSession) -> list[int]:
+    result = await db.execute(
+        select(UsuarioRol.id_usuario)
+        .join(Rol, Rol.id_rol == UsuarioRol.id_rol)
+        .join(User, User.ID_Usuario == UsuarioRol.id_usuario)
+        .where(func.lower(Rol.nombre) == settings.ROL_COBRADOR.lower())
+        .where(Rol.activo.is_(True), User.Estado_Activo.is_(True))
+        .order_by(UsuarioRol.id_usuario)
+    )
+    return list(result.scalars().all())
+
+
+async def _paradas_vencidas(db: AsyncSession, fecha: date) -> tuple[list[rutas.Parada], list[int]]:
+    # Préstamos vigentes con al menos una cuota vencida sin pagar, o sin tabla de
+    # cuotas y ya pasada su Fecha_Vencimiento
+    nombres = [e.strip().lower() for e in settings.ESTADOS_PRESTAMO_DEVENGO.split(",") if e.strip()]
+    result = await db.execute(
+        select(Prestamo.id_prestamo, Prestamo.id_articulo)
+        .join(EstadoPrestamo, EstadoPrestamo.id_estado_prestamo == Prestamo.id_estado)
+        .where(func.lower(EstadoPrestamo.nombre).in_(nombres))
+        .where(or_(
+            Prestamo.id_prestamo.in_(
+                select(Cuota.id_prestamo).where(Cuota.pagada == 0, Cuota.fecha_venc < fecha)
+            ),
+            and_(
+                ~exists().where(Cuota.id_prestamo == Prestamo.id_prestamo),
+                Prestamo.fecha_vencimiento < fecha,
+                Prestamo.deuda_actual > 0,
+            ),
+        ))
+        .order_by(Prestamo.id_prestamo)
+    )
+    prestamos = result.all()
+    if not prestamos:
+        return [], []
+
+    # Ubicación: última visita con GPS del préstamo; si no hay, la recepción del artículo
+    ids = [p.id_prestamo for p in prestamos]
+    result = await db.execute(
+        select(VisitasCobranza.id_prestamo, VisitasCobranza.gps)
+        .where(VisitasCobranza.id_prestamo.in_(ids), VisitasCobranza.gps.is_not(None))
+        .order_by(VisitasCobranza.id_visita)
+    )
+    gps_visita = {id_prestamo: gps for id_prestamo, gps in result.all()}
+    result = await db.execute(
+        select(RecepcionArticulo.id_articulo, RecepcionArticulo.gps)
+        .where(RecepcionArticulo.id_articulo.in_([p.id_articulo for p in prestamos]))
+        .where(RecepcionArticulo.gps.is_not(None))
+        .order_by(RecepcionArticulo.id_recepcion)
+    )
+    gps_recepcion = {id_articulo: gps for id_articulo, gps in result.all()}
+
+    paradas, sin_ubicacion = [], []
+    for p in prestamos:
+        coords = rutas.parsear_gps(gps_visita.get(p.id_prestamo)) or rutas.parsear_gps(gps_recepcion.get(p.id_articulo))
+        if coords is None:
+            sin_ubicacion.append(p.id_prestamo)
+        else:
+            paradas.append((p.id_prestamo, coords[0], coords[1]))
+    return paradas, sin_ubicacion
+
+
+async def _rutas_del_dia(db: AsyncSession, fecha: date, cobradores: list[int]) -> dict[int, int]:
+    result = await db.execute(
+        select(RutaCobranza.id_usuario_cobrador, RutaCobranza.id_ruta)
+        .where(RutaCobranza.fecha_asignacion == fecha, RutaCobranza.id_usuario_cobrador.in_(cobradores))
+    )
+    existentes = {c: r for c, r in result.all()}
+    for cobrador in cobradores:
+        if cobrador not in existentes:
+            ruta = RutaCobranza(id_usuario_cobrador=cobrador, fecha_asignacion=fecha)
+            db.add(ruta)
+            await db.flush()
+            existentes[cobrador] = ruta.id_ruta
+    return existentes
+
+
+async def planificar_cobranza(
+    db: AsyncSession,
+    fecha: date,
+    cobradores: list[int] | None = None,
+) -> PlanCobranza:
+    """Arma las rutas del día y reemplaza las visitas planificadas que hubiera."""
+    inicio = datetime.now()
+    plan = PlanCobranza(fecha=fecha)
+    cobradores = cobradores or await _ids_cobradores(db)
+    if not cobradores:
+        raise ValueError(f"No hay usuarios activos con rol '{settings.ROL_COBRADOR}'")
+
+    paradas, plan.sin_ubicacion = await _paradas_vencidas(db, fecha)
+    plan.paradas = len(paradas)
+
+    # Agrupación y 2-opt son CPU puro: van al pool de procesos
+    recorridos = await pool_cpu.ejecutar(
+        rutas.planificar, paradas, len(cobradores), settings.RUTAS_CELDA_GRADOS, settings.RUTAS_LIMITE_SEGUNDOS
+    )
+
+    ids_ruta = await _rutas_del_dia(db, fecha, cobradores)
+    await db.execute(
+        delete(VisitasCobranza)
+        .where(VisitasCobranza.id_ruta.in_(list(ids_ruta.values())))
+        .where(VisitasCobranza.resultado == RESULTADO_PLANIFICADA)
+    )
+
+    fecha_visita = datetime.combine(fecha, time(8, 0))
+    visitas = []
+    for cobrador, recorrido in zip(cobradores, recorridos):
+        id_ruta = ids_ruta[cobrador]
+        visitas.extend(
+            {
+                "id_ruta": id_ruta,
+                "id_prestamo": parada[0],
+                "resultado": RESULTADO_PLANIFICADA,
+                "comentario": f"Parada {orden}",
+                "gps": f"{parada[1]:.6f},{parada[2]:.6f}",
+                "fecha_visita": fecha_visita,
+            }
+            for orden, parada in enumerate(recorrido, start=1)
+        )
+        plan.rutas.append({
+            "id_ruta": id_ruta,
+            "id_cobrador": cobrador,
+            "paradas": len(recorrido),
+            "km_estimados": round(rutas.longitud_km(recorrido), 2),
+        })
+    if visitas:
+        await db.execute(insert(VisitasCobranza), visitas)
+    await db.commit()
+
+    plan.segundos = (datetime.now() - inicio).total_seconds()
+    return plan
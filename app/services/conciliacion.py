@@ -0,0 +1,275 @@
+"""Conciliación de extractos bancarios contra `Pago.ref_bancaria`.
+
+El CSV se lee por bloques fuera del event loop y nunca entero en memoria:
+se leen bytes del archivo tal como llega (también el SpooledTemporaryFile de
+un UploadFile) y se decodifican de forma incremental.
+Antes se carga un índice `ref_bancaria -> pagos` con los pagos pendientes y
+validados del periodo (± `CONCILIACION_TOLERANCIA_DIAS`), así cada línea se
+resuelve con una búsqueda en un dict, en una sola pasada. Los pendientes que
+cuadran se aplican al préstamo con `pagos.aplicar_pendiente` (cuotas, mora,
+interés y capital; un pago por transacción) y quedan en `ESTADO_PAGO_APLICADO`.
+
+Cada línea queda en una categoría:
+
+- conciliado: referencia, monto y fecha cuadran con un pago pendiente;
+- ya_validado: cuadra con un pago ya validado (p. ej. registrado por caja);
+- monto_distinto / fecha_distinta: la referencia existe pero no cuadra;
+- duplicada: la referencia ya se concilió con otra línea del extracto;
+- huerfana: ninguna referencia coincide;
+- no_aplicado: cuadró con un pendiente pero el pago no se pudo aplicar
+  (p. ej. supera la deuda actual); el pago sigue pendiente.
+
+Además se informan los pagos pendientes del periodo sin línea en el extracto.
+"""
+import codecs
+import csv
+import itertools
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.pools import pool_archivos
+from app.db.models.pago import Pago
+from app.services.catalogos import catalogos
+from app.services.pagos import aplicar_pendiente
+
+CENTAVO = Decimal("0.01")
+BLOQUE_LINEAS = 5000
+BLOQUE_BYTES = 64 * 1024
+FORMATOS_FECHA = ("%Y-%m-%d", "%d/%m/%Y")
+CATEGORIAS = (
+    "conciliado", "ya_validado", "monto_distinto", "fecha_distinta", "duplicada", "huerfana", "no_aplicado", "error",
+)
+
+
+class ExtractoInvalido(Exception):
+    pass
+
+
+@dataclass(slots=True)
+class _PagoIndexado:
+    id_pago: int
+    monto: Decimal
+    fecha: date
+    pendiente: bool
+    conciliado: bool = False
+
+
+@dataclass
+class ReporteConciliacion:
+    desde: date
+    hasta: date
+    dry_run: bool
+    lineas: int = 0
+    ignoradas: int = 0  # montos <= 0 (débitos, comisiones)
+    pagos_indexados: int = 0
+    actualizados: int = 0
+    conteos: dict[str, int] = field(default_factory=lambda: dict.fromkeys(CATEGORIAS, 0))
+    sin_extracto: int = 0
+    # Hasta CONCILIACION_MAX_DETALLE ejemplos por categoría
+    detalle: dict[str, list[dict]] = field(default_factory=dict)
+    segundos: float = 0.0
+
+    def anotar(self, categoria: str, **datos) -> None:
+        self.conteos[categoria] = self.conteos.get(categoria, 0) + 1
+        ejemplos = self.detalle.setdefault(categoria, [])
+        if len(ejemplos) < settings.CONCILIACION_MAX_DETALLE:
+            ejemplos.append(datos)
+
+    def __str__(self) -> str:
+        modo = " (dry-run, sin escribir)" if self.dry_run else ""
+        conteos = ", ".join(f"{c} {n}" for c, n in self.conteos.items())
+        return (
+            f"Conciliación {self.desde.isoformat()}..{self.hasta.isoformat()}{modo}: "
+            f"{self.lineas} líneas ({self.ignoradas} ignoradas), {self.pagos_indexados} pagos indexados, "
+            f"{conteos}, {self.actualizados} pagos aplicados, {self.sin_extracto} pendientes sin extracto, "
+            f"{self.segundos:.2f} s"
+        )
+
+
+def _fecha(valor: str) -> date:
+    valor = valor.strip()
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(valor, formato).date()
+        except ValueError:
+            pass
+    raise ValueError(f"fecha inválida: {valor!r}")
+
+
+def _monto(valor: str) -> Decimal:
+    limpio = valor.strip().replace(" ", "")
+    # "1234,56" es decimal con coma; "1,234.56" usa la coma de miles
+    limpio = limpio.replace(",", ".") if "," in limpio and "." not in limpio else limpio.replace(",", "")
+    try:
+        return Decimal(limpio).quantize(CENTAVO)
+    except InvalidOperation:
+        raise ValueError(f"monto inválido: {valor!r}") from None
+
+
+class LectorExtracto:
+    """CSV con encabezado; las columnas salen de CONCILIACION_COLUMNAS (fecha, referencia, monto)."""
+
+    def __init__(self, archivo: BinaryIO, delimitador: str = ","):
+        self._archivo = archivo
+        self._filas = csv.reader(self._lineas(), delimiter=delimitador)
+        self._numero = 1
+        encabezado = [c.strip().lower() for c in next(self._filas, [])]
+        columnas = [c.strip().lower() for c in settings.CONCILIACION_COLUMNAS.split(",")]
+        faltantes = [c for c in columnas if c not in encabezado]
+        if faltantes:
+            raise ExtractoInvalido(f"Faltan columnas en el encabezado: {', '.join(faltantes)}")
+        self._posiciones = [encabezado.index(c) for c in columnas]
+
+    def _lineas(self) -> Iterator[str]:
+        # Sin TextIOWrapper: exige readable()/readinto(), que el archivo de un upload no siempre tiene
+        decodificador = codecs.getincrementaldecoder("utf-8-sig")()
+        resto = ""
+        while True:
+            datos = self._archivo.read(BLOQUE_BYTES)
+            texto = resto + decodificador.decode(datos, final=not datos)
+            if not datos:
+                if texto:
+                    yield texto
+                return
+            # Solo se corta en "\n": "\r\n" y los saltos dentro de comillas los resuelve csv
+            *lineas, resto = texto.split("\n")
+            for linea in lineas:
+                yield linea + "\n"
+
+    def bloque(self, n: int = BLOQUE_LINEAS) -> list[tuple[int, str | None, Decimal | None, date | None, str | None]]:
+        """Siguientes `n` líneas como (número, referencia, monto, fecha, error)."""
+        salida = []
+        for fila in itertools.islice(self._filas, n):
+            self._numero += 1
+            if not any(c.strip() for c in fila):
+                continue
+            i_fecha, i_ref, i_monto = self._posiciones
+            try:
+                if len(fila) <= max(self._posiciones):
+                    raise ValueError("faltan columnas")
+                ref = fila[i_ref].strip()
+                if not ref:
+                    raise ValueError("referencia vacía")
+                salida.append((self._numero, ref, _monto(fila[i_monto]), _fecha(fila[i_fecha]), None))
+            except ValueError as e:
+                salida.append((self._numero, None, None, None, str(e)))
+        return salida
+
+
+async def _indexar(
+    db: AsyncSession, desde: date, hasta: date, id_pendiente: int, id_validado: int
+) -> dict[str, list[_PagoIndexado]]:
+    result = await db.stream(
+        select(Pago.id_pago, Pago.ref_bancaria, Pago.monto, Pago.fecha_pago, Pago.id_estado)
+        .where(
+            Pago.ref_bancaria.is_not(None),
+            Pago.fecha_pago >= datetime.combine(desde, datetime.min.time()),
+            Pago.fecha_pago < datetime.combine(hasta + timedelta(days=1), datetime.min.time()),
+            Pago.id_estado.in_((id_pendiente, id_validado)),
+        )
+        .execution_options(yield_per=10000)
+    )
+    indice: dict[str, list[_PagoIndexado]] = defaultdict(list)
+    async for id_pago, ref, monto, fecha_pago, id_estado in result:
+        indice[ref].append(_PagoIndexado(id_pago, monto, fecha_pago.date(), id_estado == id_pendiente))
+    return indice
+
+
+def _clasificar(
+    candidatos: list[_PagoIndexado] | None, monto: Decimal, fecha: date, tolerancia: int
+) -> tuple[str, _PagoIndexado | None]:
+    if not candidatos:
+        return "huerfana", None
+    libres = [p for p in candidatos if not p.conciliado]
+    if not libres:
+        return "duplicada", candidatos[0]
+    mismo_monto = [p for p in libres if p.monto == monto]
+    for p in mismo_monto:
+        if abs((p.fecha - fecha).days) <= tolerancia:
+            return ("conciliado" if p.pendiente else "ya_validado"), p
+    if mismo_monto:
+        return "fecha_distinta", mismo_monto[0]
+    return "monto_distinto", libres[0]
+
+
+async def _aplicar(db: AsyncSession, ids: list[int], reporte: ReporteConciliacion) -> None:
+    for id_pago in ids:
+        try:
+            # None: ya no estaba pendiente (lo aplicó o rechazó alguien más); se respeta
+            if await aplicar_pendiente(db, id_pago) is not None:
+                reporte.actualizados += 1
+        except (LookupError, ValueError) as e:
+            reporte.anotar("no_aplicado", id_pago=id_pago, error=str(e))
+
+
+async def conciliar(
+    db: AsyncSession,
+    archivo: BinaryIO,
+    desde: date,
+    hasta: date | None = None,
+    dry_run: bool = False,
+    delimitador: str = ",",
+) -> ReporteConciliacion:
+    """Concilia el extracto contra los pagos de `desde`..`hasta` (hace commit por lote)."""
+    hasta = hasta or desde
+    tolerancia = settings.CONCILIACION_TOLERANCIA_DIAS
+    tamano_lote = settings.CONCILIACION_TAMANO_LOTE
+    estados = catalogos().estado_pago
+    id_pendiente = estados.id(settings.ESTADO_PAGO_PENDIENTE)
+    id_validado = estados.id(settings.ESTADO_PAGO_APLICADO)
+
+    reporte = ReporteConciliacion(desde=desde, hasta=hasta, dry_run=dry_run)
+    inicio = time.perf_counter()
+
+    lector = await pool_archivos.ejecutar(LectorExtracto, archivo, delimitador)
+    indice = await _indexar(
+        db, desde - timedelta(days=tolerancia), hasta + timedelta(days=tolerancia), id_pendiente, id_validado
+    )
+    reporte.pagos_indexados = sum(len(v) for v in indice.values())
+
+    lote: list[int] = []
+    while True:
+        lineas = await pool_archivos.ejecutar(lector.bloque)
+        if not lineas:
+            break
+        for numero, ref, monto, fecha, error in lineas:
+            reporte.lineas += 1
+            if error is not None:
+                reporte.anotar("error", linea=numero, error=error)
+                continue
+            if monto <= 0:
+                reporte.ignoradas += 1
+                continue
+            categoria, pago = _clasificar(indice.get(ref), monto, fecha, tolerancia)
+            datos = {"linea": numero, "referencia": ref, "monto": monto, "fecha": fecha}
+            if pago is not None:
+                datos.update(id_pago=pago.id_pago, monto_pago=pago.monto, fecha_pago=pago.fecha)
+            reporte.anotar(categoria, **datos)
+            if categoria in ("conciliado", "ya_validado"):
+                pago.conciliado = True
+                if categoria == "conciliado":
+                    lote.append(pago.id_pago)
+        if len(lote) >= tamano_lote and not dry_run:
+            await _aplicar(db, lote, reporte)
+            lote = []
+    if lote and not dry_run:
+        await _aplicar(db, lote, reporte)
+
+    for ref, pagos in indice.items():
+        for p in pagos:
+            if p.pendiente and not p.conciliado and desde <= p.fecha <= hasta:
+                reporte.sin_extracto += 1
+                ejemplos = reporte.detalle.setdefault("sin_extracto", [])
+                if len(ejemplos) < settings.CONCILIACION_MAX_DETALLE:
+                    ejemplos.append({"id_pago": p.id_pago, "referencia": ref, "monto_pago": p.monto, "fecha_pago": p.fecha})
+
+    reporte.segundos = time.perf_counter() - inicio
+    return reporte
@@ -0,0 +1,175 @@
+"""Parámetros de negocio de Configuraciones_Generales, tipados y con vigencia.
+
+`Clave` es única, así que varias ventanas de un mismo parámetro se guardan
+con sufijo: `TASA_MORA_DIARIA`, `TASA_MORA_DIARIA@2027`, ... Todas resuelven
+al parámetro `TASA_MORA_DIARIA`; en un instante dado aplica la ventana con
+`Vigente_desde` más reciente cuyo `Vigente_hasta` (exclusivo) no haya pasado.
+Sin ninguna ventana vigente se usa el valor de `settings`.
+
+La tabla se carga completa en una instantánea inmutable; las consultas son
+un dict + bisect, sin E/S, y se pueden llamar en bucles de millones.
+"""
+import asyncio
+import logging
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Callable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.models.configuraciones_generales import ConfiguracionesGenerales
+
+logger = logging.getLogger(__name__)
+
+_SIN_INICIO = datetime.min
+
+# Tipo de cada parámetro conocido; el resto se entrega como texto
+PARAMETROS: dict[str, Callable[[str], Any]] = {
+    "TASA_INTERES_DIARIA": Decimal,
+    "TASA_MORA_DIARIA": Decimal,
+    "TASA_INTERES_MENSUAL": Decimal,
+    "CURVA_REBAJA_INVENTARIO": str,
+    "CRON_TAMANO_LOTE": int,
+}
+
+
+def parametro_de(clave: str) -> str:
+    return clave.split("@", 1)[0].strip()
+
+
+def _como_instante(momento: date | datetime | None) -> datetime:
+    if momento is None:
+        return datetime.now()
+    if isinstance(momento, datetime):
+        return momento.replace(tzinfo=None)
+    return datetime.combine(momento, time())
+
+
+@dataclass(frozen=True, slots=True)
+class _Ventana:
+    desde: datetime
+    hasta: datetime | None
+    valor: Any
+    clave: str
+
+
+@dataclass(frozen=True)
+class _Instantanea:
+    # parámetro -> (desdes ordenados, ventanas en el mismo orden)
+    ventanas: dict[str, tuple[list[datetime], list[_Ventana]]]
+    cargado_en: datetime
+
+
+def _resolver(entrada: tuple[list[datetime], list[_Ventana]] | None, momento: datetime):
+    if entrada is None:
+        return None
+    desdes, ventanas = entrada
+    i = bisect_right(desdes, momento) - 1
+    # Normalmente la primera ya aplica; se retrocede solo si venció
+    while i >= 0:
+        v = ventanas[i]
+        if v.hasta is None or momento < v.hasta:
+            return v
+        i -= 1
+    return None
+
+
+class Configuracion:
+    def __init__(self, intervalo_segundos: float):
+        self.intervalo_segundos = intervalo_segundos
+        self._actual = _Instantanea({}, datetime.min)
+        self._tarea: asyncio.Task | None = None
+
+    async def cargar(self, db: AsyncSession) -> None:
+        result = await db.execute(
+            select(
+                ConfiguracionesGenerales.clave,
+                ConfiguracionesGenerales.valor,
+                ConfiguracionesGenerales.vigente_desde,
+                ConfiguracionesGenerales.vigente_hasta,
+            )
+        )
+        por_parametro: dict[str, list[_Ventana]] = {}
+        for clave, crudo, desde, hasta in result.all():
+            parametro = parametro_de(clave)
+            try:
+                valor = PARAMETROS.get(parametro, str)(crudo)
+            except (ValueError, ArithmeticError) as exc:
+                # Una fila mal escrita no tumba el resto; queda la ventana anterior o el default
+                logger.warning("Configuración %s ignorada: %s", clave, exc)
+                continue
+            por_parametro.setdefault(parametro, []).append(_Ventana(desde or _SIN_INICIO, hasta, valor, clave))
+
+        ventanas = {}
+        for parametro, lista in por_parametro.items():
+            lista.sort(key=lambda v: v.desde)
+            ventanas[parametro] = ([v.desde for v in lista], lista)
+        self._actual = _Instantanea(ventanas, datetime.now())
+
+    def valor(self, parametro: str, momento: date | datetime | None = None, defecto: Any = None) -> Any:
+        """Valor vigente en `momento` (ahora si se omite), o el de settings / `defecto`."""
+        ventana = _resolver(self._actual.ventanas.get(parametro), _como_instante(momento))
+        if ventana is not None:
+            return ventana.valor
+        return getattr(settings, parametro, defecto)
+
+    def resolvedor(self, parametro: str) -> Callable[[date | datetime], Any]:
+        """Función momento -> valor atada a la instantánea actual, para bucles de lotes."""
+        entrada = self._actual.ventanas.get(parametro)
+        respaldo = getattr(settings, parametro, None)
+        if entrada is None:
+            return lambda momento: respaldo
+
+        def resolver(momento: date | datetime) -> Any:
+            ventana = _resolver(entrada, _como_instante(momento))
+            return respaldo if ventana is None else ventana.valor
+        return resolver
+
+    def vigentes(self, momento: date | datetime | None = None) -> dict[str, Any]:
+        instante = _como_instante(momento)
+        resultado = {}
+        for parametro, entrada in self._actual.ventanas.items():
+            ventana = _resolver(entrada, instante)
+            if ventana is not None:
+                resultado[parametro] = ventana.valor
+        return resultado
+
+    async def _bucle_recarga(self, sesiones: async_sessionmaker) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo_segundos)
+            try:
+                async with sesiones() as db:
+                    await self.cargar(db)
+            except Exception as exc:
+                # Se conserva la instantánea anterior
+                logger.warning("No se pudo recargar Configuraciones_Generales: %s", exc)
+
+    async def iniciar(self, sesiones: async_sessionmaker) -> None:
+        async with sesiones() as db:
+            await self.cargar(db)
+        if self._tarea is None:
+            self._tarea = asyncio.create_task(self._bucle_recarga(sesiones))
+
+    async def detener(self) -> None:
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+    def estadisticas(self) -> dict:
+        actual = self._actual
+        return {
+            "cargado_en": actual.cargado_en,
+            "parametros": len(actual.ventanas),
+            "ventanas": sum(len(v[1]) for v in actual.ventanas.values()),
+        }
+
+
+configuracion = Configuracion(intervalo_segundos=settings.CONFIG_RECARGA_SEGUNDOS)
@@ -0,0 +1,236 @@
+import asyncio
+import hashlib
+import json
+from decimal import Decimal
+from functools import lru_cache
+from pathlib import Path
+from string import Template
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.pools import pool_cpu
+from app.db.models.articulo import Articulo
+from app.db.models.cat_tipo_articulo import CatTipoArticulo
+from app.db.models.contrato import Contrato
+from app.db.models.cuota import Cuota
+from app.db.models.prestamo import Prestamo
+from app.db.models.solicitud import Solicitud
+from app.db.models.user import User
+from app.utils import pdf
+from app.utils.almacen import Guardado, almacen
+from app.utils.cache import CacheTTL
+
+COLECCION = "contratos"
+PLANTILLA = Path(__file__).resolve().parent.parent / "templates" / "contrato_prestamo.txt"
+
+# clave de render (datos + versión de plantilla) -> PDF ya generado en este proceso
+_renders = CacheTTL(max_entradas=settings.CONTRATO_CACHE_MAX_ENTRADAS, ttl=settings.CONTRATO_CACHE_TTL_SEGUNDOS)
+
+
+class ContratoNoDisponible(Exception):
+    """El PDF emitido no está en este nodo y no se puede reconstruir idéntico."""
+
+
+@lru_cache(maxsize=1)
+def plantilla() -> tuple[Template, str]:
+    """Plantilla compilada y su hash; se lee una vez por proceso."""
+    texto = PLANTILLA.read_text(encoding="utf-8")
+    return Template(texto), hashlib.sha256(texto.encode()).hexdigest()[:16]
+
+
+def _dinero(valor) -> str:
+    return f"{Decimal(valor):,.2f}"
+
+
+def _tabla_cuotas(cuotas: list[dict]) -> str:
+    if not cuotas:
+        return "    Pago único al vencimiento."
+    filas = [f"    {'No.':>4}  {'Vence':<10}  {'Monto':>14}", f"    {'-' * 32}"]
+    filas += [f"    {c['numero']:>4}  {c['fecha_venc']:<10}  {_dinero(c['monto']):>14}" for c in cuotas]
+    return "\n".join(filas)
+
+
+def lineas_contrato(datos: dict) -> list[pdf.Linea]:
+    texto, _ = plantilla()
+    campos = {**datos, "tabla_cuotas": _tabla_cuotas(datos["cuotas"])}
+    lineas: list[pdf.Linea] = []
+    for crudo in texto.safe_substitute(campos).splitlines():
+        if crudo.startswith("## "):
+            lineas.extend(pdf.ajustar("negrita", crudo[3:], 11))
+        elif crudo.startswith("# "):
+            lineas.extend(pdf.ajustar("negrita", crudo[2:], 14))
+        elif crudo.startswith("    "):
+            lineas.extend(pdf.ajustar("mono", crudo[4:], 9))
+        else:
+            lineas.extend(pdf.ajustar("normal", crudo, 10))
+    return lineas
+
+
+def renderizar(datos: dict) -> Guardado:
+    """Arma el PDF y lo escribe en el almacén mientras calcula su hash. Corre en el pool de procesos."""
+    bloques = pdf.generar(lineas_contrato(datos), titulo=f"Contrato {datos['numero']}")
+    return almacen.guardar_bloques(bloques, COLECCION, ".pdf")
+
+
+def _serializar(datos: dict) -> str:
+    return json.dumps(datos, sort_keys=True, default=str)
+
+
+def clave_render(datos: dict) -> str:
+    _, version = plantilla()
+    return hashlib.sha256(f"{version}:{_serializar(datos)}".encode()).hexdigest()
+
+
+async def datos_contratos(db: AsyncSession, ids_prestamo: list[int]) -> dict[int, dict]:
+    result = await db.execute(
+        select(
+            Prestamo.id_prestamo,
+            Prestamo.monto_prestamo,
+            Prestamo.fecha_inicio,
+            Prestamo.fecha_vencimiento,
+            Articulo.descripcion,
+            Articulo.valor_aprobado,
+            Articulo.valor_estimado,
+            CatTipoArticulo.nombre.label("tipo"),
+            User.Nombre,
+            User.Correo,
+            User.Telefono,
+            User.Direccion,
+        )
+        .join(Articulo, Articulo.id_articulo == Prestamo.id_articulo)
+        .join(CatTipoArticulo, CatTipoArticulo.id_tipo == Articulo.id_tipo)
+        .join(Solicitud, Solicitud.id_solicitud == Articulo.id_solicitud)
+        .join(User, User.ID_Usuario == Solicitud.id_usuario)
+        .where(Prestamo.id_prestamo.in_(ids_prestamo))
+    )
+    datos = {
+        f.id_prestamo: {
+            "numero": f"{f.id_prestamo:08d}",
+            "cliente": f.Nombre,
+            "correo": f.Correo,
+            "telefono": f.Telefono or "-",
+            "direccion": f.Direccion or "-",
+            "monto": _dinero(f.monto_prestamo),
+            "fecha_inicio": f.fecha_inicio.isoformat(),
+            "fecha_vencimiento": f.fecha_vencimiento.isoformat(),
+            "tipo_articulo": f.tipo,
+            "articulo": f.descripcion,
+            "valor_avaluo": _dinero(f.valor_aprobado if f.valor_aprobado is not None else f.valor_estimado),
+            "cuotas": [],
+        }
+        for f in result.all()
+    }
+    if datos:
+        result = await db.execute(
+            select(Cuota.id_prestamo, Cuota.numero, Cuota.fecha_venc, Cuota.monto)
+            .where(Cuota.id_prestamo.in_(list(datos)))
+            .order_by(Cuota.id_prestamo, Cuota.numero)
+        )
+        for c in result.all():
+            datos[c.id_prestamo]["cuotas"].append(
+                {"numero": c.numero, "fecha_venc": c.fecha_venc.isoformat(), "monto": str(c.monto)}
+            )
+    return datos
+
+
+async def cliente_de(db: AsyncSession, id_prestamo: int) -> int | None:
+    result = await db.execute(
+        select(Solicitud.id_usuario)
+        .join(Articulo, Articulo.id_solicitud == Solicitud.id_solicitud)
+        .join(Prestamo, Prestamo.id_articulo == Articulo.id_articulo)
+        .where(Prestamo.id_prestamo == id_prestamo)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _pdf_para(datos: dict) -> Guardado:
+    clave = clave_render(datos)
+    guardado = _renders.obtener(clave, valida=lambda g: almacen.existe(g.relativa))
+    if guardado is None:
+        guardado = await pool_cpu.ejecutar(renderizar, datos)
+        _renders.guardar(clave, guardado)
+    return guardado
+
+
+async def _ultimos_contratos(db: AsyncSession, ids_prestamo: list[int]) -> dict[int, Contrato]:
+    ultimos = (
+        select(func.max(Contrato.id_contrato))
+        .where(Contrato.id_prestamo.in_(ids_prestamo))
+        .group_by(Contrato.id_prestamo)
+    )
+    result = await db.execute(select(Contrato).where(Contrato.id_contrato.in_(ultimos)))
+    return {c.id_prestamo: c for c in result.scalars().all()}
+
+
+async def emitir(db: AsyncSession, ids_prestamo: list[int]) -> dict[int, dict]:
+    """Genera el PDF vigente de cada préstamo; solo crea Contrato si el documento cambió.
+
+    No hace commit: corre dentro de la transacción de quien lo llama.
+    """
+    datos = await datos_contratos(db, ids_prestamo)
+    ids = list(datos)
+    guardados = await asyncio.gather(*(_pdf_para(datos[i]) for i in ids))
+    anteriores = await _ultimos_contratos(db, ids)
+
+    emitidos, nuevos = {}, []
+    for id_prestamo, g in zip(ids, guardados):
+        anterior = anteriores.get(id_prestamo)
+        nuevo = anterior is None or anterior.hash_doc != g.sha256
+        if nuevo:
+            nuevos.append({
+                "id_prestamo": id_prestamo,
+                "url_pdf": almacen.url(g.relativa),
+                "hash_doc": g.sha256,
+                "datos": _serializar(datos[id_prestamo]),
+            })
+        emitidos[id_prestamo] = {
+            "url_pdf": almacen.url(g.relativa),
+            "hash_doc": g.sha256,
+            "bytes": g.tamano,
+            "nuevo": nuevo,
+        }
+    if nuevos:
+        await db.execute(insert(Contrato), nuevos)
+    return emitidos
+
+
+async def reemitir(db: AsyncSession, ids_prestamo: list[int], tamano_lote: int = 200) -> dict:
+    """Reemisión masiva por lotes, un commit por lote."""
+    resumen = {"prestamos": 0, "nuevos": 0, "sin_cambios": 0}
+    for i in range(0, len(ids_prestamo), tamano_lote):
+        emitidos = await emitir(db, ids_prestamo[i:i + tamano_lote])
+        await db.commit()
+        resumen["prestamos"] += len(emitidos)
+        nuevos = sum(1 for e in emitidos.values() if e["nuevo"])
+        resumen["nuevos"] += nuevos
+        resumen["sin_cambios"] += len(emitidos) - nuevos
+    return resumen
+
+
+async def archivo_contrato(db: AsyncSession, id_prestamo: int) -> tuple[Path, str] | None:
+    """Ruta local y hash del contrato vigente. Solo lee: nunca emite ni inserta.
+
+    Si el PDF no está en este nodo se regenera con los datos guardados en el
+    `Contrato` (no con los actuales del préstamo o del cliente) y solo se sirve
+    si su hash coincide con `hash_doc`; si no, ContratoNoDisponible.
+    """
+    contrato = (await _ultimos_contratos(db, [id_prestamo])).get(id_prestamo)
+    if contrato is None:
+        return None
+    if not contrato.hash_doc:
+        raise ContratoNoDisponible(f"El contrato {contrato.id_contrato} no tiene hash")
+    relativa = almacen.relativa(COLECCION, contrato.hash_doc, ".pdf")
+    if almacen.existe(relativa):
+        return almacen.ruta(relativa), contrato.hash_doc
+
+    if contrato.datos is None:
+        raise ContratoNoDisponible(f"El contrato {contrato.id_contrato} no guarda sus datos de emisión")
+    guardado = await pool_cpu.ejecutar(renderizar, json.loads(contrato.datos))
+    if guardado.sha256 != contrato.hash_doc:
+        # Otra versión de la plantilla o del generador: no es el documento emitido
+        if guardado.nuevo:
+            almacen.eliminar(guardado.relativa)
+        raise ContratoNoDisponible(f"El contrato {contrato.id_contrato} no se puede reconstruir idéntico")
+    return almacen.ruta(relativa), contrato.hash_doc
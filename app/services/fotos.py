@@ -0,0 +1,127 @@
+import asyncio
+import os
+from dataclasses import dataclass
+
+from fastapi import UploadFile
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.pools import pool_archivos, pool_cpu
+from app.db.models.articulo_foto import ArticuloFoto
+from app.utils.almacen import Guardado, almacen
+
+COLECCION = "fotos"
+EXTENSIONES = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp"}
+
+
+class FotoInvalida(Exception):
+    pass
+
+
+@dataclass
+class FotoSubida:
+    id_foto: int | None
+    orden: int | None
+    sha256: str
+    url: str
+    url_original: str
+    url_miniatura: str
+    duplicada: bool
+
+
+def _variante(sha256: str, lado: int) -> str:
+    return almacen.relativa(COLECCION, sha256, f"_{lado}.jpg")
+
+
+def procesar_imagen(origen: str, destinos: dict[int, str]) -> None:
+    """Genera las versiones reducidas (lado máximo -> ruta). Corre en el pool de procesos."""
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    pendientes = {lado: ruta for lado, ruta in destinos.items() if not os.path.isfile(ruta)}
+    if not pendientes:
+        return  # foto repetida: las variantes ya existen
+    try:
+        with Image.open(origen) as img:
+            # En JPEG decodifica directo a escala reducida: menos CPU y memoria
+            img.draft("RGB", (max(pendientes), max(pendientes)))
+            actual = ImageOps.exif_transpose(img).convert("RGB")
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise FotoInvalida("Uno de los archivos no es una imagen válida") from None
+
+    # De mayor a menor, cada variante sale de la anterior
+    for lado in sorted(pendientes, reverse=True):
+        actual = actual.copy()
+        actual.thumbnail((lado, lado))
+        temporal = f"{pendientes[lado]}.{os.getpid()}.tmp"
+        actual.save(temporal, "JPEG", quality=85, optimize=True, progressive=True)
+        os.replace(temporal, pendientes[lado])
+
+
+async def _guardar(archivo: UploadFile) -> Guardado:
+    sufijo = EXTENSIONES.get((archivo.content_type or "").lower())
+    if sufijo is None:
+        raise FotoInvalida(f"{archivo.filename}: tipo no permitido ({', '.join(EXTENSIONES)})")
+    # Copia por bloques desde el spool del multipart, con hash, fuera del event loop
+    return await pool_archivos.ejecutar(
+        almacen.guardar_stream, archivo.file, COLECCION, sufijo, settings.FOTO_MAX_BYTES
+    )
+
+
+async def subir_fotos(db: AsyncSession, id_articulo: int, archivos: list[UploadFile]) -> list[FotoSubida]:
+    lados = (settings.FOTO_LADO_GRANDE, settings.FOTO_LADO_MINIATURA)
+    # Si algo falla no se borra nada: aunque esta subida haya creado el archivo, otra
+    # subida concurrente del mismo contenido puede haberlo deduplicado y ya referenciarlo.
+    # Lo que quede sin Articulo_Foto lo borra app.tasks.cron_fotos pasada la gracia.
+    guardados: list[Guardado] = []
+    for archivo in archivos:
+        guardados.append(await _guardar(archivo))
+
+    resultados = await asyncio.gather(
+        *(
+            pool_cpu.ejecutar(
+                procesar_imagen,
+                str(almacen.ruta(g.relativa)),
+                {lado: str(almacen.ruta(_variante(g.sha256, lado))) for lado in lados},
+            )
+            for g in guardados
+        ),
+        return_exceptions=True,
+    )
+    for resultado in resultados:
+        if isinstance(resultado, BaseException):
+            raise resultado
+
+    result = await db.execute(
+        select(ArticuloFoto.url, ArticuloFoto.id_foto).where(ArticuloFoto.id_articulo == id_articulo)
+    )
+    existentes = dict(result.all())
+    result = await db.execute(
+        select(func.coalesce(func.max(ArticuloFoto.orden), 0)).where(ArticuloFoto.id_articulo == id_articulo)
+    )
+    orden = result.scalar_one()
+
+    subidas, nuevas = [], {}
+    for g in guardados:
+        url = almacen.url(_variante(g.sha256, settings.FOTO_LADO_GRANDE))
+        subida = FotoSubida(
+            id_foto=None,
+            orden=None,
+            sha256=g.sha256,
+            url=url,
+            url_original=almacen.url(g.relativa),
+            url_miniatura=almacen.url(_variante(g.sha256, settings.FOTO_LADO_MINIATURA)),
+            duplicada=url in existentes or url in nuevas,
+        )
+        if not subida.duplicada:
+            orden += 1
+            subida.orden = orden
+            nuevas[url] = ArticuloFoto(id_articulo=id_articulo, url=url, orden=orden)
+        subidas.append(subida)
+
+    db.add_all(nuevas.values())
+    await db.flush()
+    ids = {**existentes, **{url: foto.id_foto for url, foto in nuevas.items()}}
+    for subida in subidas:
+        subida.id_foto = ids[subida.url]
+    return subidas
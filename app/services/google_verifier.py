@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import re
+import time
+
+import requests
+from google.auth import jwt as google_jwt
+
+from app.core.config import settings
+from app.core.metricas import registro
+
+logger = logging.getLogger(__name__)
+
+google_verificacion = registro.histograma(
+    "google_verificacion_segundos", "Verificación de ID tokens de Google (incluye descargar certificados)", ("resultado",)
+)
+google_descargas = registro.contador("google_certs_descargas_total", "Descargas de certificados de Google", ("resultado",))
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class CertificadosNoDisponibles(Exception):
+    pass
+
+
+def _max_age(cache_control: str, defecto: int) -> int:
+    m = _MAX_AGE.search(cache_control or "")
+    return int(m.group(1)) if m else defecto
+
+
+class VerificadorGoogle:
+    """Verifica ID tokens de Google localmente con los certificados en memoria.
+
+    Los certificados se descargan una vez, se respetan el max-age de su
+    Cache-Control y una tarea de fondo los renueva antes de que expiren.
+    La descarga corre en un hilo para no bloquear el event loop. Si Google
+    no responde, los certificados vencidos se siguen usando durante
+    `gracia` segundos más (con un solo intento de descarga cada
+    `espera_reintento`), en lugar de responder 503 a todos los logins.
+    """
+
+    def __init__(
+        self,
+        url_certs: str,
+        audiencia: str,
+        ttl_defecto: int = 300,
+        margen_refresco: float = 0.8,
+        gracia: int = 0,
+        espera_reintento: float = 30.0,
+    ):
+        self.url_certs = url_certs
+        self.audiencia = audiencia
+        self.ttl_defecto = ttl_defecto
+        self.margen_refresco = margen_refresco
+        self.gracia = gracia
+        self.espera_reintento = espera_reintento
+        self._certs: dict[str, str] = {}
+        self._obtenidos_en = 0.0
+        self._ttl = 0
+        self._fallo_en: float | None = None
+        self._lock = asyncio.Lock()
+        self._tarea: asyncio.Task | None = None
+
+    def _vigentes(self) -> bool:
+        return bool(self._certs) and time.monotonic() < self._obtenidos_en + self._ttl
+
+    def _en_gracia(self) -> bool:
+        return bool(self._certs) and time.monotonic() < self._obtenidos_en + self._ttl + self.gracia
+
+    def _reintento_reciente(self) -> bool:
+        return self._fallo_en is not None and time.monotonic() - self._fallo_en < self.espera_reintento
+
+    def _descargar(self) -> tuple[dict[str, str], int]:
+        resp = requests.get(self.url_certs, timeout=5)
+        resp.raise_for_status()
+        return resp.json(), _max_age(resp.headers.get("Cache-Control", ""), self.ttl_defecto)
+
+    async def refrescar(self, forzar: bool = False) -> None:
+        async with self._lock:
+            # Otra corrutina pudo haberlos renovado mientras esperábamos el lock
+            if not forzar and self._vigentes():
+                return
+            try:
+                certs, ttl = await asyncio.to_thread(self._descargar)
+            except Exception as exc:
+                google_descargas.inc("error")
+                self._fallo_en = time.monotonic()
+                raise CertificadosNoDisponibles(str(exc)) from exc
+            google_descargas.inc("ok")
+            self._certs, self._ttl, self._obtenidos_en = certs, ttl, time.monotonic()
+            self._fallo_en = None
+
+    async def _refrescar_o_tolerar(self, forzar: bool = False) -> None:
+        # Con certificados dentro de la gracia un fallo de descarga no corta los logins
+        if self._en_gracia() and self._reintento_reciente():
+            return
+        try:
+            await self.refrescar(forzar)
+        except CertificadosNoDisponibles as exc:
+            if not self._en_gracia():
+                raise
+            logger.warning("Usando certificados de Google vencidos (dentro de la gracia): %s", exc)
+
+    async def _certs_para(self, kid: str | None) -> dict[str, str]:
+        if not self._vigentes():
+            await self._refrescar_o_tolerar()
+        if kid and kid not in self._certs and time.monotonic() - self._obtenidos_en > 30:
+            # Google rotó las llaves antes del max-age: una sola recarga
+            await self._refrescar_o_tolerar(forzar=True)
+        if kid:
+            return {kid: self._certs[kid]} if kid in self._certs else {}
+        return self._certs
+
+    async def verificar(self, token: str) -> dict:
+        inicio = time.perf_counter()
+        resultado = "error"
+        try:
+            kid = google_jwt.decode_header(token).get("kid")
+            certs = await self._certs_para(kid)
+            if not certs:
+                raise ValueError("Llave de firma desconocida")
+            datos = google_jwt.decode(token, certs=certs, audience=self.audiencia, clock_skew_in_seconds=10)
+            resultado = "ok"
+            return datos
+        finally:
+            google_verificacion.observar(time.perf_counter() - inicio, resultado)
+
+    async def _bucle_refresco(self) -> None:
+        while True:
+            espera = max(self._ttl * self.margen_refresco - (time.monotonic() - self._obtenidos_en), 1)
+            await asyncio.sleep(espera)
+            try:
+                await self.refrescar(forzar=True)
+            except CertificadosNoDisponibles as exc:
+                # Se conservan los certificados anteriores y se reintenta pronto
+                logger.warning("No se pudieron renovar los certificados de Google: %s", exc)
+                await asyncio.sleep(30)
+
+    async def iniciar(self) -> None:
+        try:
+            await self.refrescar()
+        except CertificadosNoDisponibles as exc:
+            logger.warning("Certificados de Google no disponibles al arrancar: %s", exc)
+        if self._tarea is None:
+            self._tarea = asyncio.create_task(self._bucle_refresco())
+
+    async def detener(self) -> None:
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+
+verificador_google = VerificadorGoogle(
+    settings.GOOGLE_CERTS_URL, settings.GOOGLE_CLIENT_ID, gracia=settings.GOOGLE_CERTS_GRACIA_SEGUNDOS
+)
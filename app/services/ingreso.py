@@ -0,0 +1,128 @@
+"""Ingreso masivo de solicitudes con sus artículos y fotos.
+
+Todo el lote se valida antes de escribir (catálogos en memoria, usuarios en
+una sola consulta, cobertura en el índice) y luego se inserta con INSERTs
+multi-fila por tabla dentro de una transacción: sin flush ni refresh por fila.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.articulo import Articulo
+from app.db.models.articulo_foto import ArticuloFoto
+from app.db.models.solicitud import Solicitud
+from app.db.models.user import User
+from app.services import versiones
+from app.services.catalogos import catalogos
+from app.services.cobertura import indice_cobertura
+from app.utils.insercion import insertar_con_ids
+
+METODOS_ENTREGA = {"domicilio", "oficina"}
+
+
+@dataclass
+class ArticuloIngreso:
+    id_tipo: int
+    descripcion: str
+    valor_estimado: Decimal = Decimal("0.00")
+    condicion: str | None = None
+    fotos: list[str] = field(default_factory=list)
+
+
+@dataclass
+class SolicitudIngreso:
+    id_usuario: int
+    metodo_entrega: str
+    direccion_entrega: str | None = None
+    ubicacion: dict = field(default_factory=dict)
+    articulos: list[ArticuloIngreso] = field(default_factory=list)
+
+
+async def validar_lote(db: AsyncSession, solicitudes: list[SolicitudIngreso]) -> list[dict]:
+    """Devuelve todos los errores del lote (vacío si se puede insertar)."""
+    errores = []
+    tipos = catalogos().tipo_articulo.por_id
+
+    ids_usuario = {s.id_usuario for s in solicitudes}
+    result = await db.execute(
+        select(User.ID_Usuario).where(User.ID_Usuario.in_(ids_usuario), User.Estado_Activo.is_(True))
+    )
+    usuarios = set(result.scalars().all())
+
+    momento = datetime.now()
+    if any(s.metodo_entrega.lower() == "domicilio" for s in solicitudes):
+        await indice_cobertura.asegurar(db)
+
+    for i, s in enumerate(solicitudes):
+        metodo = s.metodo_entrega.lower()
+        if s.id_usuario not in usuarios:
+            errores.append({"indice": i, "detalle": f"Usuario {s.id_usuario} inexistente o inactivo"})
+        if metodo not in METODOS_ENTREGA:
+            errores.append({"indice": i, "detalle": "Método de entrega inválido (domicilio | oficina)"})
+        elif metodo == "domicilio":
+            if not s.direccion_entrega:
+                errores.append({"indice": i, "detalle": "Debe proporcionar una dirección si el método es domicilio"})
+            elif indice_cobertura.configurado:
+                valor = sum((a.valor_estimado for a in s.articulos), Decimal("0.00"))
+                verificacion = indice_cobertura.verificar_entrega(
+                    s.direccion_entrega, **s.ubicacion, valor=valor, momento=momento
+                )
+                if not verificacion.permitido:
+                    errores.append({"indice": i, "detalle": verificacion.motivo})
+        for j, a in enumerate(s.articulos):
+            if a.id_tipo not in tipos:
+                errores.append({"indice": i, "articulo": j, "detalle": f"Tipo de artículo desconocido: {a.id_tipo}"})
+    return errores
+
+
+async def insertar_lote(db: AsyncSession, solicitudes: list[SolicitudIngreso]) -> list[dict]:
+    """Inserta un lote ya validado. No hace commit."""
+    id_pendiente = catalogos().estado_solicitud.id("pendiente")
+    id_articulo_inicial = catalogos().estado_articulo.id(settings.ESTADO_ARTICULO_INICIAL)
+
+    ids_solicitud = await insertar_con_ids(db, Solicitud, [
+        {
+            "id_usuario": s.id_usuario,
+            "id_estado": id_pendiente,
+            "metodo_entrega": s.metodo_entrega.lower(),
+            "direccion_entrega": s.direccion_entrega,
+        }
+        for s in solicitudes
+    ])
+
+    filas_articulo = [
+        {
+            "id_solicitud": id_solicitud,
+            "id_tipo": a.id_tipo,
+            "id_estado": id_articulo_inicial,
+            "descripcion": a.descripcion,
+            "valor_estimado": a.valor_estimado,
+            "condicion": a.condicion,
+        }
+        for id_solicitud, s in zip(ids_solicitud, solicitudes)
+        for a in s.articulos
+    ]
+    ids_articulo = iter(await insertar_con_ids(db, Articulo, filas_articulo))
+
+    salida, fotos = [], []
+    for id_solicitud, s in zip(ids_solicitud, solicitudes):
+        articulos = []
+        for a in s.articulos:
+            id_articulo = next(ids_articulo)
+            articulos.append(id_articulo)
+            fotos.extend(
+                {"id_articulo": id_articulo, "url": url, "orden": orden}
+                for orden, url in enumerate(a.fotos, start=1)
+            )
+        salida.append({"id_solicitud": id_solicitud, "ids_articulo": articulos})
+
+    # Las fotos no necesitan ids de vuelta: executemany simple
+    if fotos:
+        await db.execute(insert(ArticuloFoto), fotos)
+    # El INSERT masivo no dispara eventos de mapper
+    await versiones.tocar(db, versiones.SOLICITUDES, {s.id_usuario for s in solicitudes})
+    return salida
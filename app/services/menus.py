@@ -0,0 +1,147 @@
+import asyncio
+from dataclasses import dataclass
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.db.models.menu import Menu
+from app.db.models.modulo import Modulo
+from app.db.models.rol_menu import RolMenu
+from app.utils.cache import CacheTTL
+
+
+@dataclass(frozen=True)
+class _DatosMenu:
+    generacion: int
+    menus: list[dict]                # ordenados por (orden, id), sin "hijos"
+    padres: dict[int, int | None]    # id_menu -> id_padre
+    por_rol: dict[int, frozenset[int]]
+
+
+class ArbolesMenu:
+    """Árbol de navegación por combinación de roles, precalculado y cacheado.
+
+    Las tablas Menu/Modulo/Rol_Menu se leen una sola vez por generación; cada
+    combinación de roles se arma en una pasada y queda en cache hasta que
+    alguna de esas tablas cambie.
+    """
+
+    def __init__(self, ttl: float, max_entradas: int):
+        self._generacion = 0
+        self._datos: _DatosMenu | None = None
+        self._lock = asyncio.Lock()
+        self._arboles = CacheTTL(max_entradas=max_entradas, ttl=ttl)
+
+    async def _cargar(self, db: AsyncSession) -> _DatosMenu:
+        generacion = self._generacion
+        result = await db.execute(
+            select(
+                Menu.id_menu, Menu.id_padre, Menu.etiqueta, Menu.icono, Menu.orden,
+                Modulo.nombre.label("modulo"), Modulo.ruta,
+            )
+            .join(Modulo, Menu.id_modulo == Modulo.id_modulo)
+            .where(Modulo.activo.is_(True))
+            .order_by(Menu.orden, Menu.id_menu)
+        )
+        menus, padres = [], {}
+        for m in result.all():
+            padres[m.id_menu] = m.id_padre
+            menus.append({
+                "id": m.id_menu,
+                "etiqueta": m.etiqueta,
+                "icono": m.icono,
+                "modulo": m.modulo,
+                "ruta": m.ruta,
+                "orden": m.orden,
+            })
+
+        result = await db.execute(select(RolMenu.id_rol, RolMenu.id_menu))
+        por_rol: dict[int, set[int]] = {}
+        for id_rol, id_menu in result.all():
+            por_rol.setdefault(id_rol, set()).add(id_menu)
+
+        return _DatosMenu(generacion, menus, padres, {r: frozenset(m) for r, m in por_rol.items()})
+
+    async def _datos_vigentes(self, db: AsyncSession) -> _DatosMenu:
+        datos = self._datos
+        if datos is not None and datos.generacion == self._generacion:
+            return datos
+        async with self._lock:
+            if self._datos is None or self._datos.generacion != self._generacion:
+                self._datos = await self._cargar(db)
+            return self._datos
+
+    @staticmethod
+    def _construir(datos: _DatosMenu, roles: tuple[int, ...]) -> list[dict]:
+        visibles: set[int] = set()
+        for id_rol in roles:
+            visibles |= datos.por_rol.get(id_rol, frozenset())
+
+        # Un hijo visible arrastra a sus ancestros para poder colgarlo del árbol
+        for id_menu in list(visibles):
+            padre = datos.padres.get(id_menu)
+            while padre is not None and padre not in visibles and padre in datos.padres:
+                visibles.add(padre)
+                padre = datos.padres[padre]
+
+        # Una pasada sobre las filas ya ordenadas
+        nodos = {m["id"]: {**m, "hijos": []} for m in datos.menus if m["id"] in visibles}
+        raices = []
+        for m in datos.menus:
+            nodo = nodos.get(m["id"])
+            if nodo is None:
+                continue
+            padre = nodos.get(datos.padres[m["id"]])
+            (padre["hijos"] if padre is not None else raices).append(nodo)
+        return raices
+
+    async def arbol_para(self, db: AsyncSession, roles: frozenset[int]) -> list[dict]:
+        clave = tuple(sorted(roles))
+        entrada = self._arboles.obtener(clave, valida=lambda e: e[0] == self._generacion)
+        if entrada is not None:
+            return entrada[1]
+
+        datos = await self._datos_vigentes(db)
+        arbol = self._construir(datos, clave)
+        self._arboles.guardar(clave, (datos.generacion, arbol))
+        return arbol
+
+    @property
+    def generacion(self) -> int:
+        return self._generacion
+
+    def invalidar(self) -> None:
+        self._generacion += 1
+        self._arboles.limpiar()
+
+    def estadisticas(self) -> dict:
+        return {"generacion": self._generacion, "arboles": self._arboles.estadisticas()}
+
+
+arboles_menu = ArbolesMenu(ttl=settings.MENU_CACHE_TTL_SEGUNDOS, max_entradas=settings.MENU_CACHE_MAX_ENTRADAS)
+
+
+# Igual que en permisos: se invalida solo cuando el cambio ya es visible
+_PENDIENTE = "menus_a_invalidar"
+
+
+def _marcar(mapper, connection, target) -> None:
+    object_session(target).info[_PENDIENTE] = True
+
+
+for _modelo in (Menu, Modulo, RolMenu):
+    for _evento in ("after_insert", "after_update", "after_delete"):
+        event.listen(_modelo, _evento, _marcar)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_al_confirmar(session: Session) -> None:
+    if session.info.pop(_PENDIENTE, False):
+        arboles_menu.invalidar()
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_al_revertir(session: Session) -> None:
+    session.info.pop(_PENDIENTE, None)
@@ -0,0 +1,296 @@
+"""Aplicación de pagos a préstamos: cuotas, mora, interés y capital.
+
+Cada pago es una transacción corta con bloqueos en orden fijo: primero la
+fila del `Prestamo` (FOR UPDATE por llave primaria) y después sus cuotas
+pendientes por número. Dos pagos del mismo préstamo se serializan; pagos de
+préstamos distintos no comparten filas y no se esperan entre sí.
+
+El monto cubre las cuotas pendientes de la más antigua a la más nueva
+(`Cuota.abonado` guarda los abonos parciales) y se reparte sobre la deuda en
+orden mora, interés, capital, con un `PrestamoMovimiento` por componente.
+
+Idempotencia: un reintento con la misma clave devuelve el pago ya
+registrado en vez de aplicarlo otra vez. Sin clave explícita hace de clave la
+`ref_bancaria`; con clave explícita solo cuenta la clave. El índice único de
+`Pago.Clave_Idempotencia` cubre la carrera entre dos reintentos simultáneos.
+Un pago pendiente (reportado, o conciliado con el extracto bancario) todavía no
+está aplicado: `aplicar_pendiente`, o un `registrar_pago` con su referencia,
+lo aplica con el mismo motor.
+
+El aging de la cartera se actualiza después del commit, en otra transacción:
+`Resumen_Cartera` tiene pocas filas compartidas por todos los préstamos y no
+debe quedar bloqueado mientras se tiene el préstamo.
+"""
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.cuota import Cuota
+from app.db.models.pago import Pago
+from app.db.models.prestamo import Prestamo
+from app.db.models.prestamo_movimiento import PrestamoMovimiento
+from app.services import cartera
+from app.services.catalogos import catalogos
+
+logger = logging.getLogger(__name__)
+
+CERO = Decimal("0.00")
+PAGO_MORA = "PAGO_MORA"
+PAGO_INTERES = "PAGO_INTERES"
+PAGO_CAPITAL = "PAGO_CAPITAL"
+_COMPONENTES = {PAGO_MORA: "mora", PAGO_INTERES: "interes", PAGO_CAPITAL: "capital"}
+
+
+class PagoConflicto(Exception):
+    """La clave o la referencia ya se usó para un pago distinto."""
+
+
+@dataclass
+class PagoIn:
+    id_prestamo: int
+    monto: Decimal
+    id_validador: int
+    fecha_pago: datetime | None = None
+    medio_pago: str | None = None
+    ref_bancaria: str | None = None
+    tipo_pago: str | None = None
+    clave_idempotencia: str | None = None
+
+    @property
+    def clave(self) -> str | None:
+        if self.clave_idempotencia:
+            return self.clave_idempotencia
+        return f"ref:{self.ref_bancaria}" if self.ref_bancaria else None
+
+
+@dataclass
+class ResultadoPago:
+    id_pago: int
+    id_prestamo: int
+    monto: Decimal
+    deuda_actual: Decimal
+    # True si era un reintento: no se aplicó nada nuevo
+    duplicado: bool = False
+    aplicado: dict[str, Decimal] = field(default_factory=dict)
+    # Solo en la primera aplicación
+    cuotas_pagadas: list[int] = field(default_factory=list)
+
+
+def _nota(id_pago: int) -> str:
+    return f"Pago #{id_pago}"
+
+
+async def _existente(db: AsyncSession, pago: PagoIn) -> Pago | None:
+    if pago.clave_idempotencia:
+        # Clave explícita: otro pago con la misma referencia bancaria es otro pago
+        condiciones = [Pago.clave_idempotencia == pago.clave_idempotencia]
+    elif pago.ref_bancaria:
+        # La referencia también encuentra pagos registrados sin clave (caja, conciliación)
+        condiciones = [Pago.clave_idempotencia == pago.clave, Pago.ref_bancaria == pago.ref_bancaria]
+    else:
+        return None
+    for condicion in condiciones:
+        result = await db.execute(select(Pago).where(condicion).limit(1))
+        previo = result.scalar_one_or_none()
+        if previo is not None:
+            return previo
+    return None
+
+
+async def _repetido(db: AsyncSession, previo: Pago, pago: PagoIn) -> ResultadoPago:
+    if previo.id_prestamo != pago.id_prestamo or previo.monto != pago.monto:
+        raise PagoConflicto(
+            f"La clave o referencia ya corresponde al pago {previo.id_pago} "
+            f"(préstamo {previo.id_prestamo}, monto {previo.monto})"
+        )
+    result = await db.execute(
+        select(PrestamoMovimiento.tipo, PrestamoMovimiento.monto).where(
+            PrestamoMovimiento.id_prestamo == previo.id_prestamo,
+            PrestamoMovimiento.nota == _nota(previo.id_pago),
+        )
+    )
+    aplicado = dict.fromkeys(_COMPONENTES.values(), CERO)
+    aplicado.update((_COMPONENTES[t], m) for t, m in result.all() if t in _COMPONENTES)
+    deuda = await db.scalar(select(Prestamo.deuda_actual).where(Prestamo.id_prestamo == previo.id_prestamo))
+    return ResultadoPago(previo.id_pago, previo.id_prestamo, previo.monto, deuda, duplicado=True, aplicado=aplicado)
+
+
+def repartir(monto: Decimal, mora: Decimal, interes: Decimal) -> tuple[Decimal, Decimal, Decimal]:
+    """(a mora, a interés, a capital) en ese orden de prelación."""
+    a_mora = min(monto, max(mora, CERO))
+    a_interes = min(monto - a_mora, max(interes, CERO))
+    return a_mora, a_interes, monto - a_mora - a_interes
+
+
+def abonar_cuotas(cuotas: list[Cuota], monto: Decimal, saldar: bool = False) -> list[int]:
+    """Cubre las cuotas de la más antigua a la más nueva; devuelve los números que quedan pagadas.
+
+    Con `saldar` (deuda en cero) se cierran todas las pendientes.
+    """
+    pagadas = []
+    resto = monto
+    for cuota in cuotas:
+        if resto <= 0 and not saldar:
+            break
+        aplica = min(resto, cuota.monto - cuota.abonado)
+        cuota.abonado += aplica
+        resto -= aplica
+        if saldar or cuota.abonado >= cuota.monto:
+            cuota.pagada = 1
+            pagadas.append(cuota.numero)
+    return pagadas
+
+
+async def _aplicar_y_confirmar(db: AsyncSession, prestamo: Prestamo, pago: Pago) -> ResultadoPago:
+    """Aplica `pago` (ya en la sesión) al préstamo bloqueado, lo deja validado y hace commit."""
+    estados = catalogos()
+    deuda = prestamo.deuda_actual
+    if pago.monto <= 0 or pago.monto > deuda:
+        await db.rollback()
+        raise ValueError(f"El monto debe ser mayor que 0 y no superar la deuda actual ({deuda})")
+
+    result = await db.execute(
+        select(Cuota)
+        .where(Cuota.id_prestamo == prestamo.id_prestamo, Cuota.pagada == 0)
+        .order_by(Cuota.numero)
+        .with_for_update()
+    )
+    cuotas = list(result.scalars().all())
+
+    a_mora, a_interes, a_capital = repartir(pago.monto, prestamo.mora_acumulada, prestamo.interes_acumulada)
+    prestamo.deuda_actual -= pago.monto
+    prestamo.mora_acumulada -= a_mora
+    prestamo.interes_acumulada -= a_interes
+    prestamo.updated_at = datetime.now()
+    saldado = prestamo.deuda_actual <= 0
+    if saldado:
+        prestamo.id_estado = estados.estado_prestamo.id(settings.ESTADO_PRESTAMO_PAGADO)
+    pagadas = abonar_cuotas(cuotas, pago.monto, saldar=saldado)
+    pago.id_estado = estados.estado_pago.id(settings.ESTADO_PAGO_APLICADO)
+
+    aplicado = {"mora": a_mora, "interes": a_interes, "capital": a_capital}
+    db.add_all([
+        PrestamoMovimiento(id_prestamo=prestamo.id_prestamo, tipo=tipo, monto=aplicado[nombre], nota=_nota(pago.id_pago))
+        for tipo, nombre in _COMPONENTES.items()
+        if aplicado[nombre] > 0
+    ])
+    await db.commit()
+
+    resultado = ResultadoPago(
+        pago.id_pago, prestamo.id_prestamo, pago.monto, prestamo.deuda_actual,
+        aplicado=aplicado, cuotas_pagadas=pagadas,
+    )
+
+    # Fuera de la transacción del pago. Si falla, el aporte de este préstamo queda
+    # desfasado hasta que vuelva a cambiar (se recalcula completo) o hasta `reconstruir`
+    try:
+        await cartera.actualizar_prestamos(db, [prestamo.id_prestamo])
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        logger.exception("No se pudo actualizar la cartera tras el pago %s", pago.id_pago)
+    return resultado
+
+
+async def _bloquear_prestamo(db: AsyncSession, id_prestamo: int) -> Prestamo:
+    prestamo = await db.scalar(
+        select(Prestamo)
+        .where(Prestamo.id_prestamo == id_prestamo)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    if prestamo is None:
+        await db.rollback()
+        raise LookupError(f"Préstamo {id_prestamo} no encontrado")
+    return prestamo
+
+
+async def registrar_pago(db: AsyncSession, pago: PagoIn) -> ResultadoPago:
+    """Registra y aplica un pago en su propia transacción (hace commit).
+
+    Si la clave o la referencia corresponden a un pago pendiente del mismo
+    préstamo y monto (reportado por el cliente y aún sin aplicar), se aplica
+    ese pago en lugar de registrar otro.
+
+    Lanza LookupError si el préstamo no existe, ValueError si el monto no es
+    aplicable y PagoConflicto si la clave ya se usó para otro pago.
+    """
+    # La lectura de idempotencia tiene que ver lo confirmado mientras se esperaba el
+    # bloqueo: se empieza una transacción limpia y se bloquea antes de leer nada.
+    if db.in_transaction():
+        await db.commit()
+
+    id_pendiente = catalogos().estado_pago.id(settings.ESTADO_PAGO_PENDIENTE)
+    prestamo = await _bloquear_prestamo(db, pago.id_prestamo)
+
+    previo = await _existente(db, pago)
+    if previo is not None:
+        if (previo.id_estado == id_pendiente and previo.id_prestamo == pago.id_prestamo
+                and previo.monto == pago.monto):
+            return await _aplicar_y_confirmar(db, prestamo, previo)
+        try:
+            return await _repetido(db, previo, pago)
+        finally:
+            await db.rollback()
+
+    deuda = prestamo.deuda_actual
+    if pago.monto <= 0 or pago.monto > deuda:
+        await db.rollback()
+        raise ValueError(f"El monto debe ser mayor que 0 y no superar la deuda actual ({deuda})")
+
+    nuevo = Pago(
+        id_prestamo=prestamo.id_prestamo,
+        id_estado=id_pendiente,
+        id_validador=pago.id_validador,
+        fecha_pago=pago.fecha_pago or datetime.now(),
+        monto=pago.monto,
+        tipo_pago=pago.tipo_pago,
+        medio_pago=pago.medio_pago,
+        ref_bancaria=pago.ref_bancaria,
+        clave_idempotencia=pago.clave,
+    )
+    db.add(nuevo)
+    try:
+        await db.flush()
+    except IntegrityError:
+        # Otro reintento con la misma clave (en otro préstamo) ganó la carrera
+        await db.rollback()
+        previo = await _existente(db, pago)
+        if previo is None:
+            raise
+        try:
+            return await _repetido(db, previo, pago)
+        finally:
+            await db.rollback()
+
+    return await _aplicar_y_confirmar(db, prestamo, nuevo)
+
+
+async def aplicar_pendiente(db: AsyncSession, id_pago: int) -> ResultadoPago | None:
+    """Aplica al préstamo un pago que quedó pendiente (p. ej. al conciliarlo con el extracto).
+
+    Misma transacción y bloqueos que `registrar_pago`. Devuelve None si el pago
+    ya no está pendiente; lanza LookupError y ValueError como `registrar_pago`.
+    """
+    if db.in_transaction():
+        await db.commit()
+
+    id_prestamo = await db.scalar(select(Pago.id_prestamo).where(Pago.id_pago == id_pago))
+    if id_prestamo is None:
+        await db.rollback()
+        raise LookupError(f"Pago {id_pago} no encontrado")
+    prestamo = await _bloquear_prestamo(db, id_prestamo)
+    # Leído con el préstamo bloqueado: otra aplicación del mismo pago ya habría terminado
+    pago = await db.scalar(
+        select(Pago).where(Pago.id_pago == id_pago).with_for_update().execution_options(populate_existing=True)
+    )
+    if pago.id_estado != catalogos().estado_pago.id(settings.ESTADO_PAGO_PENDIENTE):
+        await db.rollback()
+        return None
+    return await _aplicar_y_confirmar(db, prestamo, pago)
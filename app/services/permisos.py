@@ -0,0 +1,176 @@
+import asyncio
+from dataclasses import dataclass, field
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.db.models.permiso import Permiso
+from app.db.models.rol_permiso import RolPermiso
+from app.db.models.roles import Rol
+from app.db.models.usuario_permiso import UsuarioPermiso
+from app.db.models.usuario_rol import UsuarioRol
+from app.utils.cache import CacheTTL
+
+
+@dataclass(frozen=True)
+class IndicePermisos:
+    generacion: int
+    bits: dict[str, int]          # Permiso.codigo -> máscara de un bit
+    por_id: dict[int, int]        # Permiso.id_permiso -> máscara de un bit
+    roles: dict[int, int]         # Rol.id_rol -> máscara de permisos otorgados
+    nombres_rol: dict[int, str]   # Rol.id_rol -> nombre en minúsculas
+
+
+@dataclass(frozen=True)
+class PermisosUsuario:
+    generacion: int
+    mascara: int
+    roles: frozenset[int]
+    nombres_roles: frozenset[str]
+    # Bits del índice con que se compiló `mascara`; `tiene` los usa aunque el índice ya haya cambiado
+    bits: dict[str, int] = field(default_factory=dict, repr=False, compare=False)
+
+
+class ResolverPermisos:
+    """Compila los permisos efectivos de cada usuario en un entero-bitset.
+
+    Permisos de sus roles activos, más los ALLOW y menos los DENY de
+    Usuario_Permiso. Cualquier cambio en Permiso, Rol o Rol_Permiso sube la
+    generación y descarta todo lo compilado.
+    """
+
+    def __init__(self, ttl: float, max_entradas: int):
+        self._generacion = 0
+        self._indice: IndicePermisos | None = None
+        self._lock = asyncio.Lock()
+        self._usuarios = CacheTTL(max_entradas=max_entradas, ttl=ttl)
+
+    async def _cargar_indice(self, db: AsyncSession) -> IndicePermisos:
+        generacion = self._generacion
+        result = await db.execute(
+            select(Permiso.id_permiso, Permiso.codigo).where(Permiso.activo.is_(True)).order_by(Permiso.id_permiso)
+        )
+        bits, por_id = {}, {}
+        for posicion, (id_permiso, codigo) in enumerate(result.all()):
+            bits[codigo] = por_id[id_permiso] = 1 << posicion
+
+        result = await db.execute(select(Rol.id_rol, Rol.nombre).where(Rol.activo.is_(True)))
+        nombres_rol = {id_rol: nombre.lower() for id_rol, nombre in result.all()}
+
+        result = await db.execute(
+            select(RolPermiso.id_rol, RolPermiso.id_permiso).where(RolPermiso.otorgado.is_(True))
+        )
+        roles = dict.fromkeys(nombres_rol, 0)
+        for id_rol, id_permiso in result.all():
+            if id_rol in roles and id_permiso in por_id:
+                roles[id_rol] |= por_id[id_permiso]
+
+        return IndicePermisos(generacion, bits, por_id, roles, nombres_rol)
+
+    async def indice(self, db: AsyncSession) -> IndicePermisos:
+        indice = self._indice
+        if indice is not None and indice.generacion == self._generacion:
+            return indice
+        async with self._lock:
+            if self._indice is None or self._indice.generacion != self._generacion:
+                self._indice = await self._cargar_indice(db)
+            return self._indice
+
+    async def permisos_de(self, db: AsyncSession, user_id: int) -> PermisosUsuario:
+        permisos = self._usuarios.obtener(user_id, valida=lambda p: p.generacion == self._generacion)
+        if permisos is not None:
+            return permisos
+
+        indice = await self.indice(db)
+        result = await db.execute(select(UsuarioRol.id_rol).where(UsuarioRol.id_usuario == user_id))
+        roles = frozenset(r for r in result.scalars().all() if r in indice.roles)
+
+        mascara = 0
+        for id_rol in roles:
+            mascara |= indice.roles[id_rol]
+
+        result = await db.execute(
+            select(UsuarioPermiso.id_permiso, UsuarioPermiso.decision).where(UsuarioPermiso.id_usuario == user_id)
+        )
+        permitir, denegar = 0, 0
+        for id_permiso, decision in result.all():
+            bit = indice.por_id.get(id_permiso, 0)
+            if decision.upper() == "ALLOW":
+                permitir |= bit
+            elif decision.upper() == "DENY":
+                denegar |= bit
+        mascara = (mascara | permitir) & ~denegar
+
+        permisos = PermisosUsuario(
+            generacion=indice.generacion,
+            mascara=mascara,
+            roles=roles,
+            nombres_roles=frozenset(indice.nombres_rol[r] for r in roles),
+            bits=indice.bits,
+        )
+        self._usuarios.guardar(user_id, permisos)
+        return permisos
+
+    def tiene(self, permisos: PermisosUsuario, codigo: str) -> bool:
+        # Contra el índice de `permisos_de`: una invalidación entre ambas llamadas no
+        # convierte la petición en un 403; la siguiente petición ya recompila
+        return bool(permisos.mascara & permisos.bits.get(codigo, 0))
+
+    def invalidar(self) -> None:
+        self._generacion += 1
+        self._usuarios.limpiar()
+
+    def invalidar_usuario(self, user_id: int) -> None:
+        self._usuarios.invalidar(user_id)
+
+    def estadisticas(self) -> dict:
+        indice = self._indice
+        return {
+            "generacion": self._generacion,
+            "permisos": len(indice.bits) if indice else 0,
+            "usuarios": self._usuarios.estadisticas(),
+        }
+
+
+resolver_permisos = ResolverPermisos(
+    ttl=settings.PERMISOS_CACHE_TTL_SEGUNDOS,
+    max_entradas=settings.PERMISOS_CACHE_MAX_ENTRADAS,
+)
+
+
+# Invalidación automática ante cambios hechos por el ORM en este proceso.
+# Invalidar en el flush deja que otra petición recompile con las filas viejas
+# antes del commit; se anotan en Session.info y se aplican en after_commit.
+# None en el conjunto significa "todos".
+_PENDIENTES = "permisos_a_invalidar"
+
+
+def _marcar_todo(mapper, connection, target) -> None:
+    object_session(target).info.setdefault(_PENDIENTES, set()).add(None)
+
+
+def _marcar_usuario(mapper, connection, target) -> None:
+    object_session(target).info.setdefault(_PENDIENTES, set()).add(target.id_usuario)
+
+
+for _modelo, _fn in ((Permiso, _marcar_todo), (Rol, _marcar_todo), (RolPermiso, _marcar_todo),
+                     (UsuarioRol, _marcar_usuario), (UsuarioPermiso, _marcar_usuario)):
+    for _evento in ("after_insert", "after_update", "after_delete"):
+        event.listen(_modelo, _evento, _fn)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_al_confirmar(session: Session) -> None:
+    pendientes = session.info.pop(_PENDIENTES, set())
+    if None in pendientes:
+        resolver_permisos.invalidar()
+        return
+    for user_id in pendientes:
+        resolver_permisos.invalidar_usuario(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_al_revertir(session: Session) -> None:
+    session.info.pop(_PENDIENTES, None)
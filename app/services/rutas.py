@@ -0,0 +1,156 @@
+"""Armado de rutas de cobranza: agrupación espacial y orden de visitas.
+
+Todo es Python puro sobre tuplas (id, lat, lon) para poder correr en un
+proceso del pool de CPU:
+
+- una grilla espacial (celdas de `celda_grados`) indexa las paradas;
+- las celdas se recorren en serpentina y la secuencia se corta en tantos
+  tramos contiguos como cobradores, con cantidades que difieren en 1 como
+  máximo (reparto parejo y zonas compactas);
+- cada ruta se ordena con vecino más cercano (buscando en anillos de la
+  grilla) y luego se mejora con 2-opt hasta agotar mejoras o el tiempo.
+"""
+import math
+import time
+from collections import defaultdict
+
+Parada = tuple[int, float, float]  # (id_prestamo, lat, lon)
+
+_RADIO_TIERRA_KM = 6371.0
+
+
+def parsear_gps(gps: str | None) -> tuple[float, float] | None:
+    if not gps:
+        return None
+    try:
+        lat, lon = (float(p) for p in gps.replace(";", ",").split(",")[:2])
+    except ValueError:
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+def distancia_km(a: Parada, b: Parada) -> float:
+    # Equirectangular: suficiente a escala de ciudad y mucho más barata que haversine
+    x = math.radians(b[2] - a[2]) * math.cos(math.radians((a[1] + b[1]) / 2))
+    y = math.radians(b[1] - a[1])
+    return _RADIO_TIERRA_KM * math.hypot(x, y)
+
+
+class Grilla:
+    def __init__(self, paradas: list[Parada], celda_grados: float):
+        self.celda = celda_grados
+        self.celdas: dict[tuple[int, int], list[Parada]] = defaultdict(list)
+        for p in paradas:
+            self.celdas[self.clave(p)].append(p)
+
+    def clave(self, p: Parada) -> tuple[int, int]:
+        return int(math.floor(p[1] / self.celda)), int(math.floor(p[2] / self.celda))
+
+    def quitar(self, p: Parada) -> None:
+        clave = self.clave(p)
+        self.celdas[clave].remove(p)
+        if not self.celdas[clave]:
+            del self.celdas[clave]
+
+    def mas_cercana(self, p: Parada) -> Parada | None:
+        if not self.celdas:
+            return None
+        fila, col = self.clave(p)
+        mejor, mejor_d = None, math.inf
+        radio, encontrado_en = 0, None
+        while True:
+            if radio > 64:
+                # Puntos muy dispersos: recorrer anillos ya no compensa
+                return min((q for qs in self.celdas.values() for q in qs), key=lambda q: distancia_km(p, q))
+            for f in range(fila - radio, fila + radio + 1):
+                for c in range(col - radio, col + radio + 1):
+                    if max(abs(f - fila), abs(c - col)) != radio:
+                        continue  # solo el borde del anillo
+                    for q in self.celdas.get((f, c), ()):
+                        d = distancia_km(p, q)
+                        if d < mejor_d:
+                            mejor, mejor_d = q, d
+            if mejor is not None and encontrado_en is None:
+                encontrado_en = radio
+            # Lo hallado en el anillo r todavía puede mejorarse en el r+1, no más allá
+            if encontrado_en is not None and radio > encontrado_en:
+                return mejor
+            radio += 1
+
+
+def agrupar(paradas: list[Parada], grupos: int, celda_grados: float) -> list[list[Parada]]:
+    if grupos <= 0 or not paradas:
+        return []
+    grilla = Grilla(paradas, celda_grados)
+    # Serpentina: filas alternan sentido, así celdas consecutivas son vecinas
+    orden = sorted(grilla.celdas, key=lambda k: (k[0], k[1] if k[0] % 2 == 0 else -k[1]))
+    secuencia = [p for clave in orden for p in sorted(grilla.celdas[clave], key=lambda q: (q[2], q[1]))]
+
+    base, extra = divmod(len(secuencia), grupos)
+    resultado, inicio = [], 0
+    for i in range(grupos):
+        fin = inicio + base + (1 if i < extra else 0)
+        resultado.append(secuencia[inicio:fin])
+        inicio = fin
+    return resultado
+
+
+def vecino_mas_cercano(paradas: list[Parada], celda_grados: float) -> list[Parada]:
+    if len(paradas) < 3:
+        return list(paradas)
+    # Arranca por el extremo sur-oeste para no empezar en el centro del grupo
+    actual = min(paradas, key=lambda p: (p[1], p[2]))
+    grilla = Grilla(paradas, celda_grados)
+    grilla.quitar(actual)
+    ruta = [actual]
+    while True:
+        siguiente = grilla.mas_cercana(actual)
+        if siguiente is None:
+            break
+        grilla.quitar(siguiente)
+        ruta.append(siguiente)
+        actual = siguiente
+    return ruta
+
+
+def dos_opt(ruta: list[Parada], limite_segundos: float = 1.0) -> list[Parada]:
+    """2-opt sobre un recorrido abierto (no regresa al inicio)."""
+    n = len(ruta)
+    if n < 4:
+        return ruta
+    ruta = list(ruta)
+    fin = time.perf_counter() + limite_segundos
+    mejoro = True
+    while mejoro and time.perf_counter() < fin:
+        mejoro = False
+        for i in range(n - 2):
+            a, b = ruta[i], ruta[i + 1]
+            d_ab = distancia_km(a, b)
+            for j in range(i + 2, n):
+                c = ruta[j]
+                if j + 1 < n:
+                    d = ruta[j + 1]
+                    delta = distancia_km(a, c) + distancia_km(b, d) - d_ab - distancia_km(c, d)
+                else:
+                    delta = distancia_km(a, c) - d_ab
+                if delta < -1e-9:
+                    ruta[i + 1:j + 1] = reversed(ruta[i + 1:j + 1])
+                    b = ruta[i + 1]
+                    d_ab = distancia_km(a, b)
+                    mejoro = True
+            if time.perf_counter() >= fin:
+                break
+    return ruta
+
+
+def longitud_km(ruta: list[Parada]) -> float:
+    return sum(distancia_km(ruta[i], ruta[i + 1]) for i in range(len(ruta) - 1))
+
+
+def planificar(paradas: list[Parada], cobradores: int, celda_grados: float, limite_segundos: float) -> list[list[Parada]]:
+    """Agrupa y ordena; pensado para ejecutarse en el pool de procesos."""
+    grupos = agrupar(paradas, cobradores, celda_grados)
+    por_ruta = limite_segundos / max(len(grupos), 1)
+    return [dos_opt(vecino_mas_cercano(g, celda_grados), por_ruta) for g in grupos]
@@ -0,0 +1,189 @@
+"""Estado de salud muestreado en segundo plano para las sondas de readiness.
+
+Una tarea mide cada `SALUD_INTERVALO_SEGUNDOS` la latencia de `SELECT 1` y la
+saturación del pool de cada engine; las sondas solo leen la última muestra,
+sin tocar la BD ni el pool. El servicio deja de estar listo:
+
+- tras `SALUD_FALLOS_MAX` muestras malas seguidas (error, timeout o latencia
+  sobre `SALUD_LATENCIA_MAX_MS`): un momento lento aislado no lo tumba;
+- cuando la saturación del pool llega a `SALUD_SATURACION_MAX`, para que el
+  balanceador desvíe tráfico antes de agotarlo; vuelve al bajar de
+  `SALUD_SATURACION_REANUDAR` (histéresis, evita oscilar);
+- si la última muestra es demasiado vieja (el muestreador se trabó) o la app
+  se está apagando.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.metricas import registro
+from app.db.instrumentacion import saturacion
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MuestraEngine:
+    ok: bool
+    latencia_ms: float | None
+    saturacion: float
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class EstadoSalud:
+    listo: bool
+    motivo: str | None
+    muestreado_en: float  # time.monotonic()
+    engines: dict[str, MuestraEngine] = field(default_factory=dict)
+
+    def como_dict(self) -> dict:
+        return {
+            "listo": self.listo,
+            "motivo": self.motivo,
+            "antiguedad_s": round(time.monotonic() - self.muestreado_en, 2) if self.muestreado_en else None,
+            "engines": {
+                nombre: {
+                    "ok": m.ok,
+                    "latencia_ms": m.latencia_ms,
+                    "saturacion": round(m.saturacion, 3),
+                    "error": m.error,
+                }
+                for nombre, m in self.engines.items()
+            },
+        }
+
+
+async def _select_1(engine: AsyncEngine) -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+_SIN_MUESTRA = EstadoSalud(listo=False, motivo="sin muestras todavía", muestreado_en=0.0)
+
+
+class MonitorSalud:
+    def __init__(
+        self,
+        intervalo: float,
+        timeout: float,
+        fallos_max: int,
+        latencia_max_ms: float,
+        saturacion_max: float,
+        saturacion_reanudar: float,
+    ):
+        self.intervalo = intervalo
+        self.timeout = timeout
+        self.fallos_max = fallos_max
+        self.latencia_max_ms = latencia_max_ms
+        self.saturacion_max = saturacion_max
+        self.saturacion_reanudar = saturacion_reanudar
+        self._engines: dict[str, AsyncEngine] = {}
+        self._estado = _SIN_MUESTRA
+        self._fallos: dict[str, int] = {}
+        self._saturado: dict[str, bool] = {}
+        self._apagando = False
+        self._tarea: asyncio.Task | None = None
+
+    @property
+    def estado(self) -> EstadoSalud:
+        estado = self._estado
+        if self._apagando:
+            return EstadoSalud(False, "apagando", estado.muestreado_en, estado.engines)
+        if estado.muestreado_en and time.monotonic() - estado.muestreado_en > 3 * self.intervalo + self.timeout:
+            return EstadoSalud(False, "muestra vencida", estado.muestreado_en, estado.engines)
+        return estado
+
+    async def _medir(self, engine: AsyncEngine) -> MuestraEngine:
+        sat = saturacion(engine)
+        inicio = time.perf_counter()
+        try:
+            await asyncio.wait_for(_select_1(engine), self.timeout)
+        except asyncio.TimeoutError:
+            return MuestraEngine(False, None, sat, f"sin respuesta en {self.timeout:g} s")
+        except Exception as exc:
+            return MuestraEngine(False, None, sat, type(exc).__name__)
+        latencia = round((time.perf_counter() - inicio) * 1000, 1)
+        if latencia > self.latencia_max_ms:
+            return MuestraEngine(False, latencia, sat, f"latencia sobre {self.latencia_max_ms:g} ms")
+        return MuestraEngine(True, latencia, sat)
+
+    async def muestrear(self) -> EstadoSalud:
+        nombres = list(self._engines)
+        muestras = dict(zip(nombres, await asyncio.gather(*(self._medir(e) for e in self._engines.values()))))
+        motivo = None
+        for nombre, m in muestras.items():
+            self._fallos[nombre] = 0 if m.ok else self._fallos.get(nombre, 0) + 1
+            umbral = self.saturacion_reanudar if self._saturado.get(nombre) else self.saturacion_max
+            self._saturado[nombre] = m.saturacion >= umbral
+            if motivo is None and self._fallos[nombre] >= self.fallos_max:
+                motivo = f"{nombre}: {m.error}"
+            elif motivo is None and self._saturado[nombre]:
+                motivo = f"{nombre}: pool saturado ({m.saturacion:.0%})"
+
+        anterior = self._estado
+        self._estado = EstadoSalud(motivo is None, motivo, time.monotonic(), muestras)
+        if anterior.listo and not self._estado.listo:
+            logger.warning("Readiness: no listo (%s)", motivo)
+        elif self._estado.listo and not anterior.listo:
+            logger.info("Readiness: listo")
+        return self._estado
+
+    async def _bucle(self) -> None:
+        while True:
+            try:
+                await self.muestrear()
+            except Exception:
+                logger.exception("Falló el muestreo de salud")
+            await asyncio.sleep(self.intervalo)
+
+    async def iniciar(self, engines: dict[str, AsyncEngine]) -> None:
+        self._engines = engines
+        self._apagando = False
+        # Primera muestra antes de aceptar tráfico
+        await self.muestrear()
+        if self._tarea is None:
+            self._tarea = asyncio.create_task(self._bucle())
+
+    def apagar(self) -> None:
+        """Deja de reportarse listo (drenado) sin detener el muestreo."""
+        self._apagando = True
+
+    async def detener(self) -> None:
+        self.apagar()
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+
+monitor_salud = MonitorSalud(
+    intervalo=settings.SALUD_INTERVALO_SEGUNDOS,
+    timeout=settings.SALUD_TIMEOUT_SEGUNDOS,
+    fallos_max=settings.SALUD_FALLOS_MAX,
+    latencia_max_ms=settings.SALUD_LATENCIA_MAX_MS,
+    saturacion_max=settings.SALUD_SATURACION_MAX,
+    saturacion_reanudar=settings.SALUD_SATURACION_REANUDAR,
+)
+
+
+registro.medidor(
+    "salud_listo", "1 si la última muestra deja el servicio listo", leer=lambda: [((), float(monitor_salud.estado.listo))]
+)
+registro.medidor(
+    "salud_db_latencia_ms",
+    "Latencia de SELECT 1 en la última muestra (-1 = falló)",
+    ("engine",),
+    leer=lambda: [
+        ((nombre,), m.latencia_ms if m.latencia_ms is not None else -1.0)
+        for nombre, m in monitor_salud.estado.engines.items()
+    ],
+)
@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.db.models.user import User
+from app.utils.cache import CacheTTL
+
+
+@dataclass(frozen=True)
+class UsuarioActual:
+    """Datos del usuario autenticado que necesitan los endpoints.
+
+    Conserva los nombres de atributo de `User` para que los routers no
+    cambien, pero no está ligado a ninguna sesión de SQLAlchemy.
+    """
+
+    ID_Usuario: int
+    Nombre: str
+    Correo: str
+    Verificado: bool
+    Estado_Activo: bool
+    Token_version: int
+    Updated_At: datetime | None = None
+
+    @classmethod
+    def desde_modelo(cls, user: User) -> "UsuarioActual":
+        return cls(
+            ID_Usuario=user.ID_Usuario,
+            Nombre=user.Nombre,
+            Correo=user.Correo,
+            Verificado=bool(user.Verificado),
+            Estado_Activo=bool(user.Estado_Activo),
+            Token_version=user.Token_version or 0,
+            Updated_At=user.Updated_At,
+        )
+
+
+# Clave: ID_Usuario. La entrada solo sirve si su Token_version coincide con el del JWT.
+cache_usuarios = CacheTTL(max_entradas=settings.USER_CACHE_MAX_ENTRADAS, ttl=settings.USER_CACHE_TTL_SEGUNDOS)
+
+
+def obtener_usuario_cacheado(user_id: int, token_version: int | None) -> UsuarioActual | None:
+    # Versión distinta: puede ser un token nuevo tras un cambio de versión
+    return cache_usuarios.obtener(
+        user_id,
+        valida=lambda u: token_version is None or u.Token_version == token_version,
+    )
+
+
+def guardar_usuario(usuario: UsuarioActual) -> None:
+    cache_usuarios.guardar(usuario.ID_Usuario, usuario)
+
+
+def invalidar_usuario(user_id: int) -> None:
+    cache_usuarios.invalidar(user_id)
+
+
+# Session.info: ids de usuario a invalidar cuando la transacción haga commit
+_PENDIENTES = "usuarios_a_invalidar"
+
+
+@event.listens_for(User, "after_update")
+def _marcar_al_actualizar(mapper, connection, target: User) -> None:
+    # Cambios hechos por el ORM en este proceso; el TTL cubre los demás
+    estado = inspect(target)
+    if (
+        estado.attrs.Token_version.history.has_changes()
+        or estado.attrs.Estado_Activo.history.has_changes()
+        or estado.attrs.Nombre.history.has_changes()
+        or estado.attrs.Correo.history.has_changes()
+    ):
+        # Invalidar aquí, antes del commit, deja que otra petición vuelva a
+        # cachear la fila vieja; se invalida en after_commit
+        object_session(target).info.setdefault(_PENDIENTES, set()).add(target.ID_Usuario)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_al_confirmar(session: Session) -> None:
+    for user_id in session.info.pop(_PENDIENTES, ()):
+        invalidar_usuario(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_al_revertir(session: Session) -> None:
+    session.info.pop(_PENDIENTES, None)
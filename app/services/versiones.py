@@ -0,0 +1,55 @@
+"""Contadores de versión por recurso para validar caches HTTP (ETag).
+
+Leer una versión es una consulta por llave primaria; cada escritura al
+recurso la incrementa en la misma transacción. Los cambios por el ORM se
+registran con eventos de mapper; las inserciones masivas (Core) llaman a
+`tocar` explícitamente.
+"""
+from sqlalchemy import Connection, Dialect, event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.menu import Menu
+from app.db.models.modulo import Modulo
+from app.db.models.rol_menu import RolMenu
+from app.db.models.solicitud import Solicitud
+from app.db.models.version_recurso import VersionRecurso
+from app.utils.insercion import insertar_o_sumar
+
+SOLICITUDES = "solicitudes"
+MENU = "menu"
+
+
+def _incrementar(dialecto: Dialect, recurso: str, clave: int):
+    # Un solo upsert: la primera escritura de dos transacciones a la vez no choca en la llave
+    return insertar_o_sumar(dialecto, VersionRecurso, {"recurso": recurso, "clave": clave, "version": 1}, ["version"])
+
+
+async def version(db: AsyncSession, recurso: str, clave: int = 0) -> int:
+    result = await db.execute(
+        select(VersionRecurso.version).where(VersionRecurso.recurso == recurso, VersionRecurso.clave == clave)
+    )
+    return result.scalar_one_or_none() or 0
+
+
+async def tocar(db: AsyncSession, recurso: str, claves: set[int] | frozenset[int] = frozenset({0})) -> None:
+    """Incrementa la versión; no hace commit."""
+    for clave in sorted(claves):
+        await db.execute(_incrementar(db.bind.dialect, recurso, clave))
+
+
+def _tocar_sync(connection: Connection, recurso: str, clave: int) -> None:
+    connection.execute(_incrementar(connection.dialect, recurso, clave))
+
+
+def _solicitud_cambiada(mapper, connection, target: Solicitud) -> None:
+    _tocar_sync(connection, SOLICITUDES, target.id_usuario)
+
+
+def _menu_cambiado(mapper, connection, target) -> None:
+    _tocar_sync(connection, MENU, 0)
+
+
+for _evento in ("after_insert", "after_update", "after_delete"):
+    event.listen(Solicitud, _evento, _solicitud_cambiada)
+    for _modelo in (Menu, Modulo, RolMenu):
+        event.listen(_modelo, _evento, _menu_cambiado)
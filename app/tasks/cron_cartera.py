@@ -0,0 +1,37 @@
+"""Mantenimiento diario del resumen de antigüedad de la cartera.
+
+Uso:
+    python -m app.tasks.cron_cartera [--fecha AAAA-MM-DD]        # mueve de tramo lo que cruzó un límite
+    python -m app.tasks.cron_cartera --reconstruir               # recalcula todo (conciliación)
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from app.db.database import SessionLocal
+from app.services import cartera
+
+
+async def ejecutar(hoy: date | None, reconstruir: bool) -> None:
+    inicio = time.perf_counter()
+    async with SessionLocal() as db:
+        if reconstruir:
+            total = await cartera.reconstruir(db, hoy)
+            accion = "reconstruidos"
+        else:
+            total = await cartera.avanzar_dia(db, hoy)
+            accion = "movidos de tramo"
+    print(f"{total} préstamos {accion} en {time.perf_counter() - inicio:.2f} s")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Resumen de antigüedad de la cartera")
+    parser.add_argument("--fecha", type=date.fromisoformat, default=None, help="Fecha de corte (AAAA-MM-DD)")
+    parser.add_argument("--reconstruir", action="store_true", help="Recalcula todo desde Prestamo y Cuota")
+    args = parser.parse_args(argv)
+    asyncio.run(ejecutar(args.fecha, args.reconstruir))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Planificación diaria de rutas de cobranza.
+
+Toma los préstamos vigentes con cuotas vencidas, los agrupa por zona entre
+los cobradores activos y reemplaza las visitas PLANIFICADAS del día.
+
+Uso:
+    python -m app.tasks.cron_cobranza [--fecha AAAA-MM-DD]
+"""
+import argparse
+import asyncio
+from datetime import date
+
+from app.core.pools import pool_cpu
+from app.db.database import SessionLocal
+from app.services.cobranza import planificar_cobranza
+
+
+async def _ejecutar(fecha: date) -> None:
+    try:
+        async with SessionLocal() as db:
+            plan = await planificar_cobranza(db, fecha)
+    finally:
+        pool_cpu.cerrar()
+    print(
+        f"Rutas al {plan.fecha.isoformat()}: {plan.paradas} paradas en {len(plan.rutas)} rutas, "
+        f"{len(plan.sin_ubicacion)} sin ubicación, {plan.segundos:.2f} s"
+    )
+    for ruta in plan.rutas:
+        print(f"  cobrador {ruta['id_cobrador']}: {ruta['paradas']} paradas, {ruta['km_estimados']} km")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Planificación de rutas de cobranza")
+    parser.add_argument("--fecha", type=date.fromisoformat, default=None, help="Fecha de las visitas (AAAA-MM-DD), por defecto hoy")
+    args = parser.parse_args(argv)
+
+    asyncio.run(_ejecutar(args.fecha or date.today()))
+
+
+if __name__ == "__main__":
+    main()
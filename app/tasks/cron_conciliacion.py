@@ -0,0 +1,47 @@
+"""Conciliación de un extracto bancario (CSV) contra los pagos registrados.
+
+Uso:
+    python -m app.tasks.cron_conciliacion extracto.csv --desde AAAA-MM-DD [--hasta AAAA-MM-DD] [--dry-run]
+"""
+import argparse
+import asyncio
+import json
+from datetime import date
+from pathlib import Path
+
+from app.core.pools import pool_archivos
+from app.db.database import SessionLocal, engine
+from app.services.catalogos import registro_catalogos
+from app.services.conciliacion import conciliar
+
+
+async def ejecutar(ruta: Path, desde: date, hasta: date | None, dry_run: bool, delimitador: str, detalle: Path | None) -> None:
+    try:
+        async with SessionLocal() as db:
+            await registro_catalogos.cargar(db)
+            with ruta.open("rb") as archivo:
+                reporte = await conciliar(db, archivo, desde, hasta, dry_run, delimitador)
+    finally:
+        pool_archivos.cerrar()
+        await engine.dispose()
+    print(reporte)
+    if detalle:
+        detalle.write_text(json.dumps(reporte.detalle, indent=2, ensure_ascii=False, default=str) + "\n", encoding="utf-8")
+        print(f"Detalle en {detalle}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Conciliación de extractos bancarios")
+    parser.add_argument("extracto", type=Path, help="CSV con encabezado (fecha, referencia, monto)")
+    parser.add_argument("--desde", type=date.fromisoformat, required=True, help="Inicio del periodo del extracto")
+    parser.add_argument("--hasta", type=date.fromisoformat, default=None, help="Fin del periodo (por defecto --desde)")
+    parser.add_argument("--delimitador", default=",")
+    parser.add_argument("--dry-run", action="store_true", help="Clasifica sin cambiar estados")
+    parser.add_argument("--detalle", type=Path, default=None, help="Archivo JSON con el detalle por categoría")
+    args = parser.parse_args(argv)
+
+    asyncio.run(ejecutar(args.extracto, args.desde, args.hasta, args.dry_run, args.delimitador, args.detalle))
+
+
+if __name__ == "__main__":
+    main()
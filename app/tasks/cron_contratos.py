@@ -0,0 +1,60 @@
+"""Reemisión masiva de contratos PDF.
+
+Vuelve a generar el contrato de cada préstamo (p. ej. tras cambiar la
+plantilla) y solo registra un `Contrato` nuevo cuando el documento cambió.
+
+Uso:
+    python -m app.tasks.cron_contratos [--ids 1,2,3] [--lote N]
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.pools import pool_cpu
+from app.db.database import SessionLocal
+from app.db.models.estado_prestamo import EstadoPrestamo
+from app.db.models.prestamo import Prestamo
+from app.services.contratos import reemitir
+
+
+async def _ids_vigentes(db) -> list[int]:
+    nombres = [e.strip().lower() for e in settings.ESTADOS_PRESTAMO_DEVENGO.split(",") if e.strip()]
+    result = await db.execute(
+        select(Prestamo.id_prestamo)
+        .join(EstadoPrestamo, EstadoPrestamo.id_estado_prestamo == Prestamo.id_estado)
+        .where(func.lower(EstadoPrestamo.nombre).in_(nombres))
+        .order_by(Prestamo.id_prestamo)
+    )
+    return list(result.scalars().all())
+
+
+async def _ejecutar(ids: list[int] | None, tamano_lote: int) -> None:
+    inicio = time.perf_counter()
+    try:
+        async with SessionLocal() as db:
+            ids = ids or await _ids_vigentes(db)
+            resumen = await reemitir(db, ids, tamano_lote)
+    finally:
+        pool_cpu.cerrar()
+    segundos = time.perf_counter() - inicio
+    print(
+        f"Contratos: {resumen['prestamos']} préstamos, {resumen['nuevos']} nuevos, "
+        f"{resumen['sin_cambios']} sin cambios, {segundos:.2f} s"
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Reemisión masiva de contratos")
+    parser.add_argument("--ids", type=lambda v: [int(i) for i in v.split(",") if i], default=None,
+                        help="Ids de préstamo separados por coma; por defecto todos los vigentes")
+    parser.add_argument("--lote", type=int, default=200, help="Préstamos por lote")
+    args = parser.parse_args(argv)
+
+    asyncio.run(_ejecutar(args.ids, args.lote))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Barrido de fotos huérfanas del almacén.
+
+`subir_fotos` no borra nada cuando una subida falla: el mismo contenido
+puede estar deduplicado por otra subida concurrente. Este barrido borra
+las fotos (original y variantes) cuyo sha256 no aparece en ninguna
+`Articulo_Foto` y que nadie ha usado en FOTOS_HUERFANAS_GRACIA_SEGUNDOS.
+Una subida que deduplica un archivo le actualiza la fecha de
+modificación, así que la gracia cubre las subidas que aún no hacen commit.
+
+Uso:
+    python -m app.tasks.cron_fotos [--gracia SEGUNDOS] [--dry-run]
+"""
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models.articulo_foto import ArticuloFoto
+from app.services.fotos import COLECCION
+from app.utils.almacen import almacen
+
+LARGO_SHA256 = 64
+TAMANO_CONSULTA = 500
+
+
+@dataclass
+class ResumenBarrido:
+    dry_run: bool
+    revisadas: int = 0
+    huerfanas: int = 0
+    archivos: int = 0
+    segundos: float = 0.0
+
+    def __str__(self) -> str:
+        modo = " (dry-run, nada borrado)" if self.dry_run else ""
+        return (
+            f"Fotos{modo}: {self.revisadas} revisadas, {self.huerfanas} huérfanas "
+            f"({self.archivos} archivos), {self.segundos:.2f} s"
+        )
+
+
+def _agrupar(coleccion: str) -> dict[str, tuple[list[str], float]]:
+    """sha256 -> (archivos de ese contenido, última modificación de cualquiera de ellos)."""
+    grupos: dict[str, tuple[list[str], float]] = {}
+    for relativa, modificado in almacen.recorrer(coleccion):
+        sha = relativa.rsplit("/", 1)[-1][:LARGO_SHA256]
+        archivos, ultimo = grupos.get(sha, ([], 0.0))
+        archivos.append(relativa)
+        grupos[sha] = (archivos, max(ultimo, modificado))
+    return grupos
+
+
+async def barrer_fotos(gracia_segundos: int | None = None, dry_run: bool = False) -> ResumenBarrido:
+    gracia = settings.FOTOS_HUERFANAS_GRACIA_SEGUNDOS if gracia_segundos is None else gracia_segundos
+    resumen = ResumenBarrido(dry_run=dry_run)
+    inicio = time.perf_counter()
+    corte = time.time() - gracia
+
+    grupos = _agrupar(COLECCION)
+    resumen.revisadas = len(grupos)
+    candidatos = {sha: archivos for sha, (archivos, ultimo) in grupos.items() if ultimo < corte}
+
+    # Cualquier variante referenciada (aunque FOTO_LADO_GRANDE haya cambiado) conserva el grupo
+    por_url = {almacen.url(r): sha for sha, archivos in candidatos.items() for r in archivos}
+    urls = list(por_url)
+    async with SessionLocal() as db:
+        for i in range(0, len(urls), TAMANO_CONSULTA):
+            result = await db.execute(
+                select(ArticuloFoto.url).where(ArticuloFoto.url.in_(urls[i:i + TAMANO_CONSULTA]))
+            )
+            for url in result.scalars().all():
+                candidatos.pop(por_url[url], None)
+
+    for archivos in candidatos.values():
+        # Se revisa otra vez justo antes de borrar: una subida pudo deduplicarlo mientras tanto
+        if any((almacen.modificado(r) or 0.0) >= corte for r in archivos):
+            continue
+        resumen.huerfanas += 1
+        resumen.archivos += len(archivos)
+        if not dry_run:
+            for relativa in archivos:
+                almacen.eliminar(relativa)
+
+    resumen.segundos = time.perf_counter() - inicio
+    return resumen
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Borra fotos sin Articulo_Foto")
+    parser.add_argument("--gracia", type=int, default=None, help="Segundos sin uso antes de borrar")
+    parser.add_argument("--dry-run", action="store_true", help="Solo cuenta, no borra")
+    args = parser.parse_args(argv)
+
+    print(asyncio.run(barrer_fotos(args.gracia, args.dry_run)))
+
+
+if __name__ == "__main__":
+    main()
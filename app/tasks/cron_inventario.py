@@ -0,0 +1,148 @@
+"""Actualización nocturna de antigüedad y precio del inventario en venta.
+
+Recalcula `dias_en_bodega` y aplica la curva de rebaja sobre `precio_base`
+con UPDATEs por rangos de Id_Inventario (nada se carga en Python). Los
+artículos que ya tienen una `Venta` no se tocan.
+
+La curva es JSON: {"default": [[dias, factor], ...], "<id_tipo>": [...]}.
+El factor aplicable es el del mayor umbral de días alcanzado.
+
+Uso:
+    python -m app.tasks.cron_inventario [--fecha AAAA-MM-DD] [--lote N] [--dry-run]
+"""
+import argparse
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from sqlalchemy import Integer, and_, case, cast, exists, func, literal, select, update
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models.articulo import Articulo
+from app.db.models.inventario_venta import InventarioVenta
+from app.db.models.venta import Venta
+from app.services.configuracion import configuracion
+
+
+@dataclass
+class ResumenRebaja:
+    fecha: date
+    dry_run: bool
+    filas: int = 0
+    lotes: int = 0
+    segundos: float = 0.0
+
+    @property
+    def filas_por_segundo(self) -> float:
+        return self.filas / self.segundos if self.segundos else 0.0
+
+    def __str__(self) -> str:
+        modo = " (dry-run, revertido)" if self.dry_run else ""
+        return (
+            f"Inventario al {self.fecha.isoformat()}{modo}: {self.filas} artículos en {self.lotes} lotes, "
+            f"{self.segundos:.2f} s ({self.filas_por_segundo:.0f} filas/s)"
+        )
+
+
+def cargar_curvas(crudo: str) -> dict[str, list[tuple[int, float]]]:
+    curvas = {
+        clave: sorted(((int(d), float(f)) for d, f in tramos), reverse=True)
+        for clave, tramos in json.loads(crudo).items()
+    }
+    curvas.setdefault("default", [])
+    return curvas
+
+
+def _factor(curvas: dict[str, list[tuple[int, float]]], hoy: date):
+    # Umbrales de días como fechas de corte: comparar Fecha_Ingreso usa el índice y es portable
+    condiciones = []
+    for clave, tramos in curvas.items():
+        if clave == "default":
+            continue
+        for dias, factor in tramos:
+            condiciones.append((
+                and_(Articulo.id_tipo == int(clave), InventarioVenta.fecha_ingreso <= hoy - timedelta(days=dias)),
+                factor,
+            ))
+    especificos = [int(c) for c in curvas if c != "default"]
+    for dias, factor in curvas["default"]:
+        condicion = InventarioVenta.fecha_ingreso <= hoy - timedelta(days=dias)
+        if especificos:
+            condicion = and_(Articulo.id_tipo.notin_(especificos), condicion)
+        condiciones.append((condicion, factor))
+    if not condiciones:
+        return literal(1.0)
+    return case(*condiciones, else_=literal(1.0))
+
+
+def _dias_desde(dialecto: str, hoy: date):
+    if dialecto == "sqlite":
+        return cast(func.julianday(hoy) - func.julianday(InventarioVenta.fecha_ingreso), Integer)
+    return func.datediff(hoy, InventarioVenta.fecha_ingreso)
+
+
+async def revalorizar_inventario(
+    hoy: date | None = None,
+    tamano_lote: int | None = None,
+    dry_run: bool = False,
+    curvas: dict[str, list[tuple[int, float]]] | None = None,
+) -> ResumenRebaja:
+    hoy = hoy or date.today()
+    tamano_lote = tamano_lote or settings.CRON_TAMANO_LOTE
+
+    resumen = ResumenRebaja(fecha=hoy, dry_run=dry_run)
+    inicio = time.perf_counter()
+
+    async with SessionLocal() as db:
+        if curvas is None:
+            await configuracion.cargar(db)
+            curvas = cargar_curvas(configuracion.valor("CURVA_REBAJA_INVENTARIO", hoy))
+
+        result = await db.execute(select(func.min(InventarioVenta.id_inventario), func.max(InventarioVenta.id_inventario)))
+        minimo, maximo = result.one()
+        if minimo is None:
+            resumen.segundos = time.perf_counter() - inicio
+            return resumen
+
+        sin_venta = ~exists().where(Venta.id_inventario == InventarioVenta.id_inventario)
+        valores = {
+            "dias_en_bodega": _dias_desde(db.bind.dialect.name, hoy),
+            "precio_actual": func.round(InventarioVenta.precio_base * _factor(curvas, hoy), 2),
+        }
+
+        for desde in range(minimo, maximo + 1, tamano_lote):
+            # UPDATE ... JOIN Articulo (tipo para la curva) por rango de llave primaria
+            result = await db.execute(
+                update(InventarioVenta)
+                .where(InventarioVenta.id_articulo == Articulo.id_articulo)
+                .where(InventarioVenta.id_inventario.between(desde, desde + tamano_lote - 1))
+                .where(sin_venta)
+                .values(**valores)
+                .execution_options(synchronize_session=False)
+            )
+            resumen.filas += result.rowcount
+            resumen.lotes += 1
+            if dry_run:
+                await db.rollback()
+            else:
+                await db.commit()
+
+    resumen.segundos = time.perf_counter() - inicio
+    return resumen
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Antigüedad y rebaja de precios del inventario")
+    parser.add_argument("--fecha", type=date.fromisoformat, default=None, help="Fecha de corte (AAAA-MM-DD), por defecto hoy")
+    parser.add_argument("--lote", type=int, default=None, help="Rango de Id_Inventario por UPDATE")
+    parser.add_argument("--dry-run", action="store_true", help="Ejecuta y revierte cada lote")
+    args = parser.parse_args(argv)
+
+    print(asyncio.run(revalorizar_inventario(args.fecha, args.lote, args.dry_run)))
+
+
+if __name__ == "__main__":
+    main()
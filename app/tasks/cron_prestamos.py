@@ -0,0 +1,263 @@
+"""Devengo nocturno de intereses y mora sobre la cartera de préstamos.
+
+Recorre los préstamos vigentes por lotes (paginación por llave sobre
+Id_PRESTAMO), calcula solo los días que faltan desde `ultimo_calculo_en`
+y escribe cada lote con un UPDATE masivo y un INSERT multi-fila de
+`PrestamoMovimiento`; la cartera de esos préstamos se actualiza en el mismo
+commit.
+
+Hay dos modelos de préstamo y nunca se mezclan:
+
+- Sin cuotas (empeño a un solo pago): el interés ordinario se devenga a
+  diario sobre el capital y la mora corre después de la fecha de vencimiento.
+- Con cuotas (tabla de amortización): el interés ordinario ya está dentro de
+  cada cuota y se cargó completo al préstamo al generarlas
+  (`amortizacion.generar_cuotas`), así que aquí no se devenga interés. Solo corre mora sobre la
+  parte no abonada de las cuotas vencidas, por los días posteriores al
+  vencimiento de cada una.
+
+Uso:
+    python -m app.tasks.cron_prestamos [--fecha AAAA-MM-DD] [--lote N] [--dry-run]
+"""
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models.cuota import Cuota
+from app.db.models.estado_prestamo import EstadoPrestamo
+from app.db.models.prestamo import Prestamo
+from app.db.models.prestamo_movimiento import PrestamoMovimiento
+from app.services import cartera
+from app.services.configuracion import configuracion
+
+CENTAVO = Decimal("0.01")
+CERO = Decimal("0.00")
+
+
+@dataclass
+class ResumenDevengo:
+    fecha: date
+    dry_run: bool
+    prestamos: int = 0
+    lotes: int = 0
+    movimientos: int = 0
+    interes_total: Decimal = CERO
+    mora_total: Decimal = CERO
+    segundos: float = 0.0
+
+    @property
+    def prestamos_por_segundo(self) -> float:
+        return self.prestamos / self.segundos if self.segundos else 0.0
+
+    def __str__(self) -> str:
+        modo = " (dry-run, sin escribir)" if self.dry_run else ""
+        return (
+            f"Devengo al {self.fecha.isoformat()}{modo}: "
+            f"{self.prestamos} préstamos en {self.lotes} lotes, "
+            f"{self.movimientos} movimientos, "
+            f"interés {self.interes_total}, mora {self.mora_total}, "
+            f"{self.segundos:.2f} s ({self.prestamos_por_segundo:.0f} préstamos/s)"
+        )
+
+
+def calcular_devengo(
+    capital: Decimal,
+    fecha_inicio: date,
+    fecha_vencimiento: date,
+    ultimo_calculo: date | None,
+    hasta: date,
+    tasa_interes: Decimal,
+    tasa_mora: Decimal,
+) -> tuple[int, Decimal, Decimal]:
+    """Devuelve (días, interés, mora) pendientes de devengar hasta `hasta`.
+
+    La mora solo corre por los días posteriores a la fecha de vencimiento.
+    """
+    desde = ultimo_calculo or fecha_inicio
+    dias = (hasta - desde).days
+    if dias <= 0 or capital <= 0:
+        return max(dias, 0), CERO, CERO
+
+    dias_mora = max((hasta - max(desde, fecha_vencimiento)).days, 0)
+    interes = (capital * tasa_interes * dias).quantize(CENTAVO, ROUND_HALF_UP)
+    mora = (capital * tasa_mora * dias_mora).quantize(CENTAVO, ROUND_HALF_UP)
+    return dias, interes, mora
+
+
+def calcular_mora_cuotas(
+    vencidas: list[tuple[date, Decimal]],
+    desde: date,
+    hasta: date,
+    tasa_mora: Decimal,
+) -> Decimal:
+    """Mora de `desde` a `hasta` sobre cuotas (vencimiento, saldo sin abonar).
+
+    Cada cuota solo genera mora por los días posteriores a su vencimiento.
+    """
+    total = CERO
+    for fecha_venc, pendiente in vencidas:
+        dias = (hasta - max(desde, fecha_venc)).days
+        if dias > 0 and pendiente > 0:
+            total += pendiente * tasa_mora * dias
+    return total.quantize(CENTAVO, ROUND_HALF_UP)
+
+
+async def _cuotas_del_lote(
+    db: AsyncSession, ids: list[int], hasta: date
+) -> tuple[set[int], dict[int, list[tuple[date, Decimal]]]]:
+    """(préstamos con cuotas, cuotas vencidas sin pagar por préstamo)."""
+    result = await db.execute(select(Cuota.id_prestamo).where(Cuota.id_prestamo.in_(ids)).distinct())
+    con_cuotas = set(result.scalars().all())
+    vencidas: dict[int, list[tuple[date, Decimal]]] = {}
+    if con_cuotas:
+        result = await db.execute(
+            select(Cuota.id_prestamo, Cuota.fecha_venc, Cuota.monto - Cuota.abonado)
+            .where(Cuota.id_prestamo.in_(con_cuotas), Cuota.pagada == 0, Cuota.fecha_venc < hasta)
+        )
+        for id_prestamo, fecha_venc, pendiente in result.all():
+            vencidas.setdefault(id_prestamo, []).append((fecha_venc, pendiente))
+    return con_cuotas, vencidas
+
+
+async def _ids_estados_devengo(db) -> list[int]:
+    nombres = [e.strip().lower() for e in settings.ESTADOS_PRESTAMO_DEVENGO.split(",") if e.strip()]
+    result = await db.execute(
+        select(EstadoPrestamo.id_estado_prestamo).where(func.lower(EstadoPrestamo.nombre).in_(nombres))
+    )
+    return list(result.scalars().all())
+
+
+async def devengar_cartera(
+    hasta: date | None = None,
+    tamano_lote: int | None = None,
+    dry_run: bool = False,
+) -> ResumenDevengo:
+    hasta = hasta or date.today()
+    tamano_lote = tamano_lote or settings.CRON_TAMANO_LOTE
+
+    resumen = ResumenDevengo(fecha=hasta, dry_run=dry_run)
+    inicio = time.perf_counter()
+
+    async with SessionLocal() as db:
+        # Tasas vigentes a la fecha de corte (Configuraciones_Generales o settings)
+        await configuracion.cargar(db)
+        tasa_interes = configuracion.valor("TASA_INTERES_DIARIA", hasta)
+        tasa_mora = configuracion.valor("TASA_MORA_DIARIA", hasta)
+
+        estados = await _ids_estados_devengo(db)
+        if not estados:
+            resumen.segundos = time.perf_counter() - inicio
+            return resumen
+
+        ultimo_id = 0
+        while True:
+            query = (
+                select(
+                    Prestamo.id_prestamo,
+                    Prestamo.deuda_actual,
+                    Prestamo.interes_acumulada,
+                    Prestamo.mora_acumulada,
+                    Prestamo.fecha_inicio,
+                    Prestamo.fecha_vencimiento,
+                    Prestamo.ultimo_calculo_en,
+                )
+                .where(Prestamo.id_prestamo > ultimo_id)
+                .where(Prestamo.id_estado.in_(estados))
+                .where(or_(Prestamo.ultimo_calculo_en.is_(None), Prestamo.ultimo_calculo_en < hasta))
+                .order_by(Prestamo.id_prestamo)
+                .limit(tamano_lote)
+            )
+            if not dry_run:
+                # El UPDATE escribe valores absolutos: un pago aplicado entre la lectura y el
+                # commit se perdería. Se bloquea el lote en orden de llave, el mismo que usan
+                # los pagos (préstamo y luego sus cuotas), así que no hay ciclos de espera.
+                query = query.with_for_update()
+            result = await db.execute(query)
+            filas = result.all()
+            if not filas:
+                break
+            ultimo_id = filas[-1].id_prestamo
+
+            ahora = datetime.now()
+            cambios = []
+            movimientos = []
+            con_cuotas, vencidas = await _cuotas_del_lote(db, [p.id_prestamo for p in filas], hasta)
+            for p in filas:
+                if p.id_prestamo in con_cuotas:
+                    # El interés ya está en las cuotas: solo mora sobre lo vencido
+                    desde = p.ultimo_calculo_en or p.fecha_inicio
+                    dias = (hasta - desde).days
+                    interes = CERO
+                    mora = calcular_mora_cuotas(vencidas.get(p.id_prestamo, []), desde, hasta, tasa_mora)
+                else:
+                    # El interés se calcula sobre el capital, sin capitalizar lo ya devengado
+                    capital = p.deuda_actual - p.interes_acumulada - p.mora_acumulada
+                    dias, interes, mora = calcular_devengo(
+                        capital, p.fecha_inicio, p.fecha_vencimiento, p.ultimo_calculo_en,
+                        hasta, tasa_interes, tasa_mora,
+                    )
+                if dias <= 0:
+                    continue
+
+                cambios.append({
+                    "id_prestamo": p.id_prestamo,
+                    "deuda_actual": p.deuda_actual + interes + mora,
+                    "interes_acumulada": p.interes_acumulada + interes,
+                    "mora_acumulada": p.mora_acumulada + mora,
+                    "ultimo_calculo_en": hasta,
+                    "updated_at": ahora,
+                })
+                nota = f"Devengo de {dias} día(s) al {hasta.isoformat()}"
+                if interes > 0:
+                    movimientos.append({"id_prestamo": p.id_prestamo, "tipo": "INTERES", "monto": interes, "nota": nota})
+                if mora > 0:
+                    movimientos.append({"id_prestamo": p.id_prestamo, "tipo": "MORA", "monto": mora, "nota": nota})
+                resumen.interes_total += interes
+                resumen.mora_total += mora
+
+            resumen.lotes += 1
+            resumen.prestamos += len(cambios)
+            resumen.movimientos += len(movimientos)
+
+            if dry_run:
+                continue
+            if not cambios:
+                await db.commit()  # libera los bloqueos del lote
+                continue
+
+            # UPDATE masivo por llave primaria + INSERT multi-fila, un commit por lote
+            await db.execute(update(Prestamo), cambios)
+            if movimientos:
+                await db.execute(insert(PrestamoMovimiento), movimientos)
+            # El saldo de la cartera cambia con la deuda: se ajusta en la misma transacción
+            await cartera.actualizar_prestamos(db, [c["id_prestamo"] for c in cambios], hasta)
+            await db.commit()
+
+        if dry_run:
+            await db.rollback()
+
+    resumen.segundos = time.perf_counter() - inicio
+    return resumen
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Devengo nocturno de intereses y mora")
+    parser.add_argument("--fecha", type=date.fromisoformat, default=None, help="Fecha de corte (AAAA-MM-DD), por defecto hoy")
+    parser.add_argument("--lote", type=int, default=None, help="Préstamos por lote")
+    parser.add_argument("--dry-run", action="store_true", help="Calcula sin escribir en la BD")
+    args = parser.parse_args(argv)
+
+    resumen = asyncio.run(devengar_cartera(args.fecha, args.lote, args.dry_run))
+    print(resumen)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+
+from app.core.config import settings
+
+TAMANO_BLOQUE = 64 * 1024
+
+
+class ArchivoDemasiadoGrande(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Guardado:
+    sha256: str
+    relativa: str
+    tamano: int
+    nuevo: bool
+
+
+class Almacen:
+    """Almacén en disco direccionado por contenido: `<coleccion>/ab/cd/<sha256><sufijo>`.
+
+    Los bloques se escriben a un temporal mientras se calcula el hash y al
+    final se mueven (os.replace, atómico) a su ruta definitiva; si el
+    contenido ya existía el temporal se descarta. Todo es síncrono: se
+    llama desde un pool, nunca desde el event loop.
+    """
+
+    def __init__(self, raiz: str, url_base: str):
+        self.raiz = Path(raiz)
+        self.url_base = url_base.rstrip("/")
+
+    def preparar(self) -> None:
+        (self.raiz / "tmp").mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def relativa(coleccion: str, sha256: str, sufijo: str = "") -> str:
+        return f"{coleccion}/{sha256[:2]}/{sha256[2:4]}/{sha256}{sufijo}"
+
+    def ruta(self, relativa: str) -> Path:
+        return self.raiz / relativa
+
+    def url(self, relativa: str) -> str:
+        return f"{self.url_base}/{relativa}"
+
+    def existe(self, relativa: str) -> bool:
+        return self.ruta(relativa).is_file()
+
+    def guardar_bloques(
+        self,
+        bloques: Iterable[bytes],
+        coleccion: str,
+        sufijo: str = "",
+        limite_bytes: int | None = None,
+    ) -> Guardado:
+        self.preparar()
+        sha = hashlib.sha256()
+        tamano = 0
+        fd, temporal = tempfile.mkstemp(dir=self.raiz / "tmp")
+        try:
+            with os.fdopen(fd, "wb") as destino:
+                for bloque in bloques:
+                    tamano += len(bloque)
+                    if limite_bytes is not None and tamano > limite_bytes:
+                        raise ArchivoDemasiadoGrande(f"El archivo excede {limite_bytes} bytes")
+                    sha.update(bloque)
+                    destino.write(bloque)
+
+            digest = sha.hexdigest()
+            relativa = self.relativa(coleccion, digest, sufijo)
+            final = self.ruta(relativa)
+            if final.is_file():
+                os.unlink(temporal)
+                # La fecha de modificación marca el último uso: el barrido de huérfanos la respeta
+                os.utime(final)
+                return Guardado(digest, relativa, tamano, nuevo=False)
+            final.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(temporal, final)
+            return Guardado(digest, relativa, tamano, nuevo=True)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.unlink(temporal)
+            raise
+
+    def guardar_stream(
+        self,
+        origen: BinaryIO,
+        coleccion: str,
+        sufijo: str = "",
+        limite_bytes: int | None = None,
+    ) -> Guardado:
+        bloques = iter(lambda: origen.read(TAMANO_BLOQUE), b"")
+        return self.guardar_bloques(bloques, coleccion, sufijo, limite_bytes)
+
+    def eliminar(self, relativa: str) -> None:
+        self.ruta(relativa).unlink(missing_ok=True)
+
+    def recorrer(self, coleccion: str) -> Iterator[tuple[str, float]]:
+        """(relativa, fecha de modificación) de cada archivo de la colección."""
+        base = self.raiz / coleccion
+        if not base.is_dir():
+            return
+        for ruta in base.rglob("*"):
+            try:
+                if ruta.is_file():
+                    yield ruta.relative_to(self.raiz).as_posix(), ruta.stat().st_mtime
+            except FileNotFoundError:
+                continue  # borrado mientras se recorría
+
+    def modificado(self, relativa: str) -> float | None:
+        try:
+            return self.ruta(relativa).stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+
+almacen = Almacen(settings.MEDIA_DIR, settings.MEDIA_URL)
@@ -1,4 +1,5 @@
 from app.db.models.auditoria import Auditoria
+from app.middlewares.audit_log import agregar_pendiente, escritor_auditoria, serializar_valores
 from datetime import datetime
 
 async def registrar_auditoria(
@@ -7,16 +8,22 @@ async def registrar_auditoria(
     accion: str,
     modulo: str,
     detalle: str,
-    valores_anteriores: dict = None,
-    valores_nuevos: dict = None,
+    valores_anteriores=None,
+    valores_nuevos=None,
 ):
-    auditoria = Auditoria(
+    # valores_*: dict o instancia ORM; solo se guardan columnas, como JSON
+    registro = dict(
         id_usuario=usuario_id,
         accion=accion,
         modulo=modulo,
         detalle=detalle,
         fecha_hora=datetime.now(),
-        old_values=str(valores_anteriores) if valores_anteriores else None,
-        new_values=str(valores_nuevos) if valores_nuevos else None,
+        old_values=serializar_valores(valores_anteriores),
+        new_values=serializar_valores(valores_nuevos),
     )
-    db.add(auditoria)
+
+    # Se escribe en lote tras el commit; sin cupo en la cola, dentro de la transacción
+    if await escritor_auditoria.reservar():
+        agregar_pendiente(db.sync_session, registro)
+    else:
+        db.add(Auditoria(**registro))
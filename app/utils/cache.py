@@ -0,0 +1,59 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class CacheTTL:
+    """Cache en memoria LRU con expiración por entrada y contadores de aciertos."""
+
+    def __init__(self, max_entradas: int = 1024, ttl: float = 60.0):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        self._datos: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def obtener(self, clave: Hashable, valida: Callable[[Any], bool] | None = None) -> Any | None:
+        """Devuelve el valor vigente; si `valida` lo rechaza cuenta como fallo."""
+        entrada = self._datos.get(clave)
+        if entrada is None:
+            self.fallos += 1
+            return None
+        expira, valor = entrada
+        if expira < time.monotonic():
+            del self._datos[clave]
+            self.fallos += 1
+            return None
+        if valida is not None and not valida(valor):
+            self.fallos += 1
+            return None
+        self._datos.move_to_end(clave)
+        self.aciertos += 1
+        return valor
+
+    def guardar(self, clave: Hashable, valor: Any) -> None:
+        self._datos[clave] = (time.monotonic() + self.ttl, valor)
+        self._datos.move_to_end(clave)
+        while len(self._datos) > self.max_entradas:
+            self._datos.popitem(last=False)
+            self.expulsiones += 1
+
+    def invalidar(self, clave: Hashable) -> None:
+        self._datos.pop(clave, None)
+
+    def limpiar(self) -> None:
+        self._datos.clear()
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+    def estadisticas(self) -> dict:
+        return {
+            "entradas": len(self._datos),
+            "max_entradas": self.max_entradas,
+            "ttl": self.ttl,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "expulsiones": self.expulsiones,
+        }
@@ -0,0 +1,30 @@
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.pools import PoolAcotado
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# bcrypt tarda ~200 ms por llamada: nunca debe correr en el event loop
+pool_hash = PoolAcotado(
+    "bcrypt",
+    tipo=settings.HASH_POOL_TIPO,
+    workers=settings.HASH_POOL_WORKERS,
+    max_concurrencia=settings.HASH_MAX_CONCURRENCIA,
+)
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    return pwd_context.verify(password, hashed)
+
+
+async def hash_password_async(password: str) -> str:
+    return await pool_hash.ejecutar(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await pool_hash.ejecutar(verify_password, password, hashed)
@@ -0,0 +1,80 @@
+from sqlalchemy import Dialect, inspect, insert, text
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+TAMANO_BLOQUE = 1000
+
+# engine -> paso entre ids de un INSERT multi-fila en MySQL (0 = no son predecibles)
+_pasos_autoinc: dict[int, int] = {}
+
+
+async def _paso_autoinc(db: AsyncSession) -> int:
+    clave = id(db.bind)
+    if clave not in _pasos_autoinc:
+        # Modos 0 y 1 reservan un bloque consecutivo por INSERT simple; el 2 puede intercalar
+        result = await db.execute(text("SELECT @@innodb_autoinc_lock_mode, @@auto_increment_increment"))
+        modo, incremento = result.one()
+        _pasos_autoinc[clave] = int(incremento) if int(modo) in (0, 1) else 0
+    return _pasos_autoinc[clave]
+
+
+async def insertar_con_ids(db: AsyncSession, modelo, filas: list[dict]) -> list[int]:
+    """INSERT multi-fila que devuelve las llaves generadas, en el orden de `filas`.
+
+    - Con RETURNING ordenado (SQLite, PostgreSQL, MariaDB): un INSERT por bloque.
+    - MySQL con innodb_autoinc_lock_mode 0/1: un INSERT multi-fila por bloque;
+      los ids son lastrowid + desplazamiento (auto_increment_increment).
+    - En otro caso, un INSERT por fila (correcto, pero sin agrupar).
+    """
+    if not filas:
+        return []
+    llave = inspect(modelo).primary_key[0]
+    dialecto = db.bind.dialect
+    ids: list[int] = []
+
+    if dialecto.insert_executemany_returning_sort_by_parameter_order:
+        for i in range(0, len(filas), TAMANO_BLOQUE):
+            result = await db.execute(
+                insert(modelo).returning(llave, sort_by_parameter_order=True),
+                filas[i:i + TAMANO_BLOQUE],
+            )
+            ids.extend(result.scalars().all())
+        return ids
+
+    paso = await _paso_autoinc(db) if dialecto.name == "mysql" else 0
+    if paso:
+        for i in range(0, len(filas), TAMANO_BLOQUE):
+            bloque = filas[i:i + TAMANO_BLOQUE]
+            result = await db.execute(insert(modelo).values(bloque))
+            # En un INSERT multi-fila MySQL informa el id de la primera fila
+            ids.extend(range(result.lastrowid, result.lastrowid + paso * len(bloque), paso))
+        return ids
+
+    for fila in filas:
+        result = await db.execute(insert(modelo).values(**fila))
+        ids.append(result.inserted_primary_key[0])
+    return ids
+
+
+def insertar_o_sumar(dialecto: Dialect, modelo, fila: dict, sumar: list[str]):
+    """INSERT de `fila` que, si la llave primaria ya existe, suma a esa fila las columnas `sumar`.
+
+    Es una sola sentencia (ON DUPLICATE KEY UPDATE en MySQL, ON CONFLICT en
+    SQLite y PostgreSQL): dos transacciones que crean la misma llave a la vez
+    no terminan en IntegrityError. Devuelve la sentencia sin ejecutarla.
+    """
+    columnas = inspect(modelo).columns
+    tabla = modelo.__table__
+    valores = {columnas[k]: v for k, v in fila.items()}
+    if dialecto.name == "mysql":
+        stmt = mysql.insert(tabla).values(valores)
+        return stmt.on_duplicate_key_update({
+            columnas[k].name: columnas[k] + stmt.inserted[columnas[k].key] for k in sumar
+        })
+    if dialecto.name in ("sqlite", "postgresql"):
+        stmt = (sqlite if dialecto.name == "sqlite" else postgresql).insert(tabla).values(valores)
+        return stmt.on_conflict_do_update(
+            index_elements=list(tabla.primary_key.columns),
+            set_={columnas[k].name: columnas[k] + stmt.excluded[columnas[k].key] for k in sumar},
+        )
+    raise NotImplementedError(f"insertar_o_sumar no soporta {dialecto.name}")
@@ -0,0 +1,117 @@
+"""PDF de texto mínimo (carta, fuentes base Helvetica/Courier, WinAnsi).
+
+Sin dependencias: se emite objeto por objeto como bloques de bytes, de modo
+que quien lo consume (p. ej. `Almacen.guardar_bloques`) puede escribir y
+calcular el hash mientras se genera. La salida es determinista: sin fechas
+ni identificadores aleatorios, el mismo contenido produce los mismos bytes.
+"""
+import textwrap
+import zlib
+from typing import Iterator
+
+ANCHO, ALTO = 612, 792
+MARGEN = 56
+
+# estilo -> (recurso, BaseFont, ancho medio de carácter en em)
+FUENTES = {
+    "normal": ("F1", "Helvetica", 0.5),
+    "negrita": ("F2", "Helvetica-Bold", 0.55),
+    "mono": ("F3", "Courier", 0.6),
+}
+
+Linea = tuple[str, str, float]  # (estilo, texto, tamaño en puntos)
+
+# Objetos fijos: catálogo (1), páginas (2), fuentes (3..); se arman una vez por proceso
+_OBJ_FUENTE = {
+    recurso: f"<< /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>".encode()
+    for recurso, base, _ in FUENTES.values()
+}
+_NUM_FUENTE = {recurso: 3 + i for i, recurso in enumerate(_OBJ_FUENTE)}
+_RECURSOS = (
+    "<< /Font << " + " ".join(f"/{r} {n} 0 R" for r, n in _NUM_FUENTE.items()) + " >> >>"
+).encode()
+_PRIMER_LIBRE = 3 + len(_OBJ_FUENTE)
+
+
+def _escapar(texto: str) -> bytes:
+    crudo = texto.encode("cp1252", errors="replace")
+    return crudo.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def ajustar(estilo: str, texto: str, tamano: float) -> list[Linea]:
+    """Parte una línea lógica en las que caben en el ancho útil."""
+    caracteres = int((ANCHO - 2 * MARGEN) / (tamano * FUENTES[estilo][2]))
+    if estilo == "mono" or len(texto) <= caracteres:
+        return [(estilo, texto, tamano)]
+    return [(estilo, t, tamano) for t in textwrap.wrap(texto, caracteres)] or [(estilo, "", tamano)]
+
+
+def paginar(lineas: list[Linea], interlineado: float = 1.35) -> list[list[tuple[Linea, float]]]:
+    """Asigna a cada línea su coordenada y, cortando páginas al llegar al margen."""
+    paginas: list[list[tuple[Linea, float]]] = [[]]
+    y = ALTO - MARGEN
+    for linea in lineas:
+        alto = linea[2] * interlineado
+        if y - alto < MARGEN and paginas[-1]:
+            paginas.append([])
+            y = ALTO - MARGEN
+        y -= alto
+        paginas[-1].append((linea, y))
+    return paginas
+
+
+def _contenido(pagina: list[tuple[Linea, float]], numero: int, total: int) -> bytes:
+    partes = []
+    for (estilo, texto, tamano), y in pagina:
+        if texto:
+            recurso = FUENTES[estilo][0]
+            partes.append(b"BT /%s %.1f Tf %d %.2f Td (%s) Tj ET" % (recurso.encode(), tamano, MARGEN, y, _escapar(texto)))
+    pie = f"Página {numero} de {total}"
+    partes.append(b"BT /F1 8.0 Tf %d %d Td (%s) Tj ET" % (ANCHO - MARGEN - 60, MARGEN // 2, _escapar(pie)))
+    return zlib.compress(b"\n".join(partes))
+
+
+def generar(lineas: list[Linea], titulo: str = "") -> Iterator[bytes]:
+    paginas = paginar(lineas)
+    n_paginas = len(paginas)
+    # Por página: objeto página + objeto contenido; al final el diccionario Info
+    num_paginas = [_PRIMER_LIBRE + 2 * i for i in range(n_paginas)]
+    num_info = _PRIMER_LIBRE + 2 * n_paginas
+
+    offsets: dict[int, int] = {}
+    posicion = 0
+
+    def objeto(numero: int, cuerpo: bytes) -> bytes:
+        nonlocal posicion
+        offsets[numero] = posicion
+        bloque = b"%d 0 obj\n%s\nendobj\n" % (numero, cuerpo)
+        posicion += len(bloque)
+        return bloque
+
+    cabecera = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+    posicion = len(cabecera)
+    yield cabecera
+    yield objeto(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+    hijos = b" ".join(b"%d 0 R" % n for n in num_paginas)
+    yield objeto(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (hijos, n_paginas))
+    for recurso, cuerpo in _OBJ_FUENTE.items():
+        yield objeto(_NUM_FUENTE[recurso], cuerpo)
+
+    for i, pagina in enumerate(paginas):
+        num = num_paginas[i]
+        yield objeto(
+            num,
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources %s /Contents %d 0 R >>"
+            % (ANCHO, ALTO, _RECURSOS, num + 1),
+        )
+        flujo = _contenido(pagina, i + 1, n_paginas)
+        yield objeto(num + 1, b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(flujo), flujo))
+
+    yield objeto(num_info, b"<< /Title (%s) /Producer (API Pignoraticios) >>" % _escapar(titulo))
+
+    inicio_xref = posicion
+    filas = [b"0000000000 65535 f "] + [b"%010d 00000 n " % offsets[n] for n in range(1, num_info + 1)]
+    yield b"xref\n0 %d\n%s\n" % (num_info + 1, b"\n".join(filas))
+    yield b"trailer\n<< /Size %d /Root 1 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        num_info + 1, num_info, inicio_xref
+    )
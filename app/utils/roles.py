@@ -1,27 +1,13 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
-from app.db.models.user import User
 
-async def usuario_tiene_rol(usuario: User, db: AsyncSession, rol_objetivo: str) -> bool:
-    query = text("""
-        SELECT r.Nombre
-        FROM Usuario_Rol ur
-        JOIN Roles r ON ur.ID_Rol = r.ID_Rol
-        WHERE ur.ID_Usuario = :usuario_id
-    """)
-    result = await db.execute(query, {"usuario_id": usuario.id_usuario})
-    roles = [row[0] for row in result.fetchall()]
-    return rol_objetivo.lower() in [r.lower() for r in roles]
+from app.services.permisos import resolver_permisos
 
 
-async def usuario_tiene_algun_rol(usuario: User, db: AsyncSession, roles_aceptados: list[str]) -> bool:
+async def usuario_tiene_rol(usuario, db: AsyncSession, rol_objetivo: str) -> bool:
+    permisos = await resolver_permisos.permisos_de(db, usuario.ID_Usuario)
+    return rol_objetivo.lower() in permisos.nombres_roles
 
-    query = text("""
-        SELECT r.Nombre
-        FROM Usuario_Rol ur
-        JOIN Roles r ON ur.ID_Rol = r.ID_Rol
-        WHERE ur.ID_Usuario = :usuario_id
-    """)
-    result = await db.execute(query, {"usuario_id": usuario.id_usuario})
-    roles_usuario = [row[0].lower() for row in result.fetchall()]
-    return any(r.lower() in roles_usuario for r in roles_aceptados)
+
+async def usuario_tiene_algun_rol(usuario, db: AsyncSession, roles_aceptados: list[str]) -> bool:
+    permisos = await resolver_permisos.permisos_de(db, usuario.ID_Usuario)
+    return any(r.lower() in permisos.nombres_roles for r in roles_aceptados)
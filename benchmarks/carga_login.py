@@ -0,0 +1,89 @@
+"""Latencia de /health y /solicitudes/solicitudes/mis mientras /auth/login está bajo carga.
+
+Sirve para comprobar que bcrypt no bloquea el event loop: con el hashing
+fuera del loop, el p99 de los sondeos debe mantenerse cerca del de reposo.
+
+Requiere un servidor en marcha y un usuario existente:
+    uvicorn app.main:app --workers 1
+    python -m benchmarks.carga_login --url http://127.0.0.1:8000 \\
+        --email demo@example.com --password secreto123 --concurrencia 32 --duracion 20
+
+Necesita httpx (ver requirements.txt).
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+def percentil(valores: list[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    k = max(0, min(len(ordenados) - 1, int(round(p / 100 * len(ordenados) + 0.5)) - 1))
+    return ordenados[k]
+
+
+def resumen(nombre: str, latencias: list[float], errores: int) -> str:
+    ms = [x * 1000 for x in latencias]
+    return (
+        f"{nombre:<20} n={len(ms):<6} err={errores:<4} "
+        f"p50={percentil(ms, 50):7.1f} ms  p95={percentil(ms, 95):7.1f} ms  p99={percentil(ms, 99):7.1f} ms"
+    )
+
+
+async def _bucle(client: httpx.AsyncClient, fin: float, peticion, latencias: list[float], errores: list[int], pausa: float = 0.0):
+    while time.perf_counter() < fin:
+        t0 = time.perf_counter()
+        try:
+            r = await peticion(client)
+            if r.status_code >= 400:
+                errores[0] += 1
+            else:
+                latencias.append(time.perf_counter() - t0)
+        except httpx.HTTPError:
+            errores[0] += 1
+        if pausa:
+            await asyncio.sleep(pausa)
+
+
+async def ejecutar(args) -> None:
+    credenciales = {"email": args.email, "password": args.password}
+    limites = httpx.Limits(max_connections=args.concurrencia + 8)
+    async with httpx.AsyncClient(base_url=args.url, timeout=30, limits=limites) as client:
+        r = await client.post("/auth/login", json=credenciales)
+        r.raise_for_status()
+        auth = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+        fin = time.perf_counter() + args.duracion
+        resultados = {n: ([], [0]) for n in ("login", "health", "solicitudes/mis")}
+
+        tareas = [
+            _bucle(client, fin, lambda c: c.post("/auth/login", json=credenciales), *resultados["login"])
+            for _ in range(args.concurrencia)
+        ]
+        tareas.append(_bucle(client, fin, lambda c: c.get("/health"), *resultados["health"], pausa=args.pausa))
+        tareas.append(
+            _bucle(client, fin, lambda c: c.get("/solicitudes/solicitudes/mis", headers=auth), *resultados["solicitudes/mis"], pausa=args.pausa)
+        )
+        await asyncio.gather(*tareas)
+
+    print(f"{args.concurrencia} logins concurrentes durante {args.duracion} s contra {args.url}")
+    for nombre, (latencias, errores) in resultados.items():
+        print(resumen(nombre, latencias, errores[0]))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrencia", type=int, default=32, help="Logins en paralelo")
+    parser.add_argument("--duracion", type=float, default=20.0, help="Segundos de carga")
+    parser.add_argument("--pausa", type=float, default=0.05, help="Pausa entre sondeos (s)")
+    asyncio.run(ejecutar(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
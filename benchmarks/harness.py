@@ -0,0 +1,186 @@
+"""Benchmark de los flujos principales contra la app real de FastAPI.
+
+Escenarios: health, login, /auth/me, crear solicitud y listar solicitudes.
+Cada uno corre `--duracion` segundos con `--concurrencia` clientes y reporta
+throughput y latencia p50/p95/p99. El resultado se guarda en JSON junto con
+el commit, para comparar entre commits:
+
+    python -m benchmarks.seeder --escala 0.01          # imprime un cliente de prueba
+    python -m benchmarks.harness --email cliente101@bench.example.com --password bench12345 \\
+        --salida benchmarks/resultados/$(git rev-parse --short HEAD).json
+    python -m benchmarks.harness ... --comparar benchmarks/resultados/<commit anterior>.json
+
+Sin --url la app corre en el mismo proceso (httpx.ASGITransport, con su
+lifespan) contra DB_URL; con --url se mide un servidor ya en marcha.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from benchmarks.carga_login import percentil
+
+ESCENARIOS = ("health", "login", "me", "solicitud_crear", "solicitud_listar")
+
+
+def _commit() -> str | None:
+    try:
+        salida = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        )
+        return salida.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+@asynccontextmanager
+async def _cliente(url: str | None, concurrencia: int):
+    limites = httpx.Limits(max_connections=concurrencia + 4)
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=30, limits=limites) as client:
+            yield client
+        return
+    from app.db.database import engine
+    from app.main import app
+
+    # ASGITransport no dispara el lifespan: se corre a mano (catálogos, pools, auditoría)
+    try:
+        async with app.router.lifespan_context(app):
+            transporte = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=30, limits=limites) as client:
+                yield client
+    finally:
+        await engine.dispose()
+
+
+def _peticiones(credenciales: dict, auth: dict) -> dict:
+    return {
+        "health": lambda c: c.get("/health"),
+        "login": lambda c: c.post("/auth/login", json=credenciales),
+        "me": lambda c: c.get("/auth/me", headers=auth),
+        "solicitud_crear": lambda c: c.post(
+            "/solicitudes/solicitudes", headers=auth, json={"metodo_entrega": "oficina"}
+        ),
+        "solicitud_listar": lambda c: c.get("/solicitudes/solicitudes/mis", headers=auth),
+    }
+
+
+async def _correr(client: httpx.AsyncClient, peticion, concurrencia: int, duracion: float) -> dict:
+    latencias: list[float] = []
+    errores = 0
+    fin = time.perf_counter() + duracion
+
+    async def trabajador():
+        nonlocal errores
+        while time.perf_counter() < fin:
+            t0 = time.perf_counter()
+            try:
+                r = await peticion(client)
+                if r.status_code >= 400:
+                    errores += 1
+                else:
+                    latencias.append(time.perf_counter() - t0)
+            except httpx.HTTPError:
+                errores += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    transcurrido = time.perf_counter() - inicio
+    ms = [x * 1000 for x in latencias]
+    return {
+        "peticiones": len(ms),
+        "errores": errores,
+        "rps": round(len(ms) / transcurrido, 1),
+        "media_ms": round(sum(ms) / len(ms), 2) if ms else 0.0,
+        "p50_ms": round(percentil(ms, 50), 2),
+        "p95_ms": round(percentil(ms, 95), 2),
+        "p99_ms": round(percentil(ms, 99), 2),
+    }
+
+
+async def ejecutar(args) -> dict:
+    credenciales = {"email": args.email, "password": args.password}
+    escenarios = args.escenario or list(ESCENARIOS)
+    resultados = {}
+    async with _cliente(args.url, args.concurrencia) as client:
+        r = await client.post("/auth/login", json=credenciales)
+        r.raise_for_status()
+        auth = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        peticiones = _peticiones(credenciales, auth)
+        for nombre in escenarios:
+            if args.calentamiento:
+                await _correr(client, peticiones[nombre], args.concurrencia, args.calentamiento)
+            resultados[nombre] = await _correr(client, peticiones[nombre], args.concurrencia, args.duracion)
+            print(_linea(nombre, resultados[nombre]), flush=True)
+
+    return {
+        "commit": _commit(),
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "objetivo": args.url or "en_proceso",
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "concurrencia": args.concurrencia,
+        "duracion_s": args.duracion,
+        "escenarios": resultados,
+    }
+
+
+def _linea(nombre: str, r: dict) -> str:
+    return (
+        f"{nombre:<18} n={r['peticiones']:<7} err={r['errores']:<5} {r['rps']:>8.1f} req/s  "
+        f"p50={r['p50_ms']:7.1f} ms  p95={r['p95_ms']:7.1f} ms  p99={r['p99_ms']:7.1f} ms"
+    )
+
+
+def comparar(actual: dict, base: dict, tolerancia: float) -> list[str]:
+    """Escenarios cuyo p95 empeoró o cuyo throughput cayó más de `tolerancia` (fracción)."""
+    regresiones = []
+    print(f"\nComparado con {base.get('commit')} ({base.get('fecha')}):")
+    for nombre, r in actual["escenarios"].items():
+        anterior = base.get("escenarios", {}).get(nombre)
+        if not anterior:
+            continue
+        d_p95 = (r["p95_ms"] - anterior["p95_ms"]) / anterior["p95_ms"] if anterior["p95_ms"] else 0.0
+        d_rps = (r["rps"] - anterior["rps"]) / anterior["rps"] if anterior["rps"] else 0.0
+        peor = d_p95 > tolerancia or d_rps < -tolerancia
+        if peor:
+            regresiones.append(nombre)
+        print(f"  {nombre:<18} p95 {d_p95:+7.1%}  rps {d_rps:+7.1%}{'  <-- regresión' if peor else ''}")
+    return regresiones
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="Servidor en marcha; sin él, la app corre en proceso")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--escenario", action="append", choices=ESCENARIOS, help="Repetible; por defecto todos")
+    parser.add_argument("--concurrencia", type=int, default=16)
+    parser.add_argument("--duracion", type=float, default=10.0, help="Segundos por escenario")
+    parser.add_argument("--calentamiento", type=float, default=2.0, help="Segundos sin medir antes de cada escenario")
+    parser.add_argument("--salida", type=Path, default=None, help="Archivo JSON de resultados")
+    parser.add_argument("--comparar", type=Path, default=None, help="JSON de un commit anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.10, help="Cambio relativo que cuenta como regresión")
+    args = parser.parse_args(argv)
+
+    resultado = asyncio.run(ejecutar(args))
+    if args.salida:
+        args.salida.parent.mkdir(parents=True, exist_ok=True)
+        args.salida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"Resultados en {args.salida}")
+    if args.comparar:
+        base = json.loads(args.comparar.read_text(encoding="utf-8"))
+        if comparar(resultado, base, args.tolerancia):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
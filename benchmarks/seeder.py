@@ -0,0 +1,745 @@
+"""Datos sintéticos a escala para pruebas de carga y de rendimiento.
+
+Llena todas las tablas de app/db/models con distribuciones parecidas a las
+reales: pocos clientes concentran muchas solicitudes, montos log-normales,
+plazos de 1 a 18 meses, préstamos más recientes que antiguos, cuotas
+pagadas o en mora según la fecha y el estado del préstamo.
+
+    python -m benchmarks.seeder --escala 0.01            # 10k préstamos, ~95k cuotas, 50k auditoría
+    python -m benchmarks.seeder --escala 1 --lote 10000  # 1M préstamos, ~10M cuotas, 5M auditoría
+    python -m benchmarks.seeder --escala 0.1 --conteo auditoria=0 --conteo usuarios=5000
+
+Usa DB_URL (igual que la app) y solo corre contra una base local salvo
+--permitir-remoto. Sobre una base vacía, --crear-esquema crea antes todas
+las tablas (app/db/esquema.py). Los ids se asignan a partir del máximo
+existente, así que puede correrse varias veces sobre la misma base. Todas
+las cuentas comparten --password; al final se imprime un cliente y un
+administrador para benchmarks/harness.py. Resumen_Cartera se reconstruye con el servicio real.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.database import SessionLocal, engine
+from app.db.esquema import crear_esquema
+from app.db.models.accion import Accion
+from app.db.models.articulo import Articulo
+from app.db.models.articulo_foto import ArticuloFoto
+from app.db.models.auditoria import Auditoria
+from app.db.models.cat_tipo_articulo import CatTipoArticulo
+from app.db.models.cobertura_zona import CoberturaZona
+from app.db.models.comprobante import Comprobante
+from app.db.models.configuraciones_generales import ConfiguracionesGenerales
+from app.db.models.contrato import Contrato
+from app.db.models.cuota import Cuota
+from app.db.models.estado_articulo import EstadoArticulo
+from app.db.models.estado_inventario import EstadoInventario
+from app.db.models.estado_pago import EstadoPago
+from app.db.models.estado_prestamo import EstadoPrestamo
+from app.db.models.estado_solicitud import EstadoSolicitud
+from app.db.models.inventario_venta import InventarioVenta
+from app.db.models.menu import Menu
+from app.db.models.modulo import Modulo
+from app.db.models.pago import Pago
+from app.db.models.permiso import Permiso
+from app.db.models.preferencias_usuario import PreferenciasUsuario
+from app.db.models.prestamo import Prestamo
+from app.db.models.prestamo_movimiento import PrestamoMovimiento
+from app.db.models.recepcion_articulo import RecepcionArticulo
+from app.db.models.regla_tipo_articulo import ReglaTipoArticulo
+from app.db.models.requerimiento_cliente import RequerimientoCliente
+from app.db.models.rol_menu import RolMenu
+from app.db.models.rol_permiso import RolPermiso
+from app.db.models.roles import Rol
+from app.db.models.ruta_cobranza import RutaCobranza
+from app.db.models.solicitud import Solicitud
+from app.db.models.user import User
+from app.db.models.usuario_permiso import UsuarioPermiso
+from app.db.models.usuario_rol import UsuarioRol
+from app.db.models.venta import Venta
+from app.db.models.visitas_cobranza import VisitasCobranza
+from app.services import cartera
+from app.services.amortizacion import cuota_fija, sumar_meses
+from app.utils.hashing import hash_password
+
+# Conteos con --escala 1; las cuotas, pagos, fotos, etc. se derivan de los préstamos
+BASE = {
+    "usuarios": 200_000,
+    "prestamos": 1_000_000,
+    "auditoria": 5_000_000,
+    "requerimientos": 50_000,
+    "zonas": 400,
+}
+PERSONAL = {"admin": 5, "evaluador": 40, settings.ROL_COBRADOR: 55}
+ROL_CLIENTE = "cliente"
+
+ESTADOS_SOLICITUD = ("pendiente", "en_revision", "aprobada", "rechazada")
+ESTADOS_ARTICULO = (settings.ESTADO_ARTICULO_INICIAL, "en_custodia", "devuelto", "rematado")
+ESTADOS_PRESTAMO = ("activo", "vencido", "pagado", "rematado")
+ESTADOS_PAGO = ("pendiente", "validado", "rechazado")
+ESTADOS_INVENTARIO = ("disponible", "vendido")
+# tipo -> (peso, monto mediano)
+TIPOS = {
+    "Joyería": (0.40, 1800),
+    "Electrónicos": (0.25, 2500),
+    "Electrodomésticos": (0.12, 1500),
+    "Herramientas": (0.10, 1200),
+    "Instrumentos musicales": (0.05, 3000),
+    "Vehículos": (0.08, 25000),
+}
+# plazo en meses -> peso (media ~9.5 cuotas por préstamo)
+PLAZOS = {1: 0.10, 3: 0.15, 6: 0.20, 12: 0.35, 18: 0.20}
+MEDIOS_PAGO = {"efectivo": 0.50, "transferencia": 0.35, "deposito": 0.15}
+PERMISOS = {
+    "articulo.subir_fotos": ("evaluador",),
+    "cartera.reconstruir": (),
+    "cartera.ver": ("evaluador", settings.ROL_COBRADOR),
+    "catalogo.recargar": (),
+    "cobranza.planificar": (settings.ROL_COBRADOR,),
+    "contrato.emitir": ("evaluador",),
+    "contrato.reemitir": (),
+    "contrato.ver": ("evaluador",),
+    "pago.conciliar": (),
+    "pago.registrar": ("evaluador", settings.ROL_COBRADOR),
+    "prestamo.aprobar": ("evaluador",),
+    "prestamo.generar_cuotas": ("evaluador",),
+    "solicitud.carga_lote": ("evaluador",),
+    "solicitud.exportar": (),
+}
+MODULOS_AUDITORIA = {"Solicitud": 0.30, "Articulo": 0.20, "Prestamo": 0.20, "Pago": 0.15, "Usuario": 0.10, "Cuota": 0.05}
+ACCIONES_AUDITORIA = {"INSERT": 0.5, "UPDATE": 0.4, "DELETE": 0.05, "LOGIN": 0.05}
+# Ciudad de Guatemala, aproximado
+LAT, LON = (14.55, 14.68), (-90.60, -90.45)
+
+
+def _elegir(rng: random.Random, pesos: dict):
+    return rng.choices(list(pesos), weights=list(pesos.values()))[0]
+
+
+def _dinero(valor: float) -> Decimal:
+    return Decimal(f"{valor:.2f}")
+
+
+def _es_local(url: str) -> bool:
+    u = make_url(url)
+    return u.get_backend_name() == "sqlite" or u.host in (None, "", "localhost", "127.0.0.1", "::1")
+
+
+class Sembrador:
+    def __init__(self, db: AsyncSession, rng: random.Random, conteos: dict, lote: int, password: str):
+        self.db = db
+        self.rng = rng
+        self.conteos = conteos
+        self.lote = lote
+        self.password = password
+        self.hoy = date.today()
+        self.insertadas: Counter = Counter()
+        self.siguiente: dict[str, int] = {}
+        self.ids: dict[str, dict[str, int]] = {}
+        self.personal: dict[str, list[int]] = {}
+        self.clientes: tuple[int, int] = (0, 0)
+        self.vencidos: list[int] = []
+
+    # -- utilidades --
+
+    async def _insertar(self, modelo, filas: list[dict]) -> None:
+        if filas:
+            await self.db.execute(insert(modelo), filas)
+            self.insertadas[modelo.__tablename__] += len(filas)
+
+    async def _reservar(self, columna, cantidad: int) -> int:
+        """Primer id de un bloque de `cantidad` ids nuevos para la tabla de `columna`."""
+        tabla = columna.class_.__tablename__
+        if tabla not in self.siguiente:
+            maximo = (await self.db.execute(select(func.coalesce(func.max(columna), 0)))).scalar_one()
+            self.siguiente[tabla] = maximo + 1
+        inicio = self.siguiente[tabla]
+        self.siguiente[tabla] += cantidad
+        return inicio
+
+    async def _por_nombre(self, columna_id, columna_nombre, nombres, extra=None) -> dict[str, int]:
+        """Crea las filas de catálogo que falten (por nombre) y devuelve nombre -> id."""
+        result = await self.db.execute(select(columna_nombre, columna_id).where(columna_nombre.in_(nombres)))
+        existentes = dict(result.all())
+        faltantes = [n for n in nombres if n not in existentes]
+        if faltantes:
+            modelo = columna_id.class_
+            await self._insertar(
+                modelo, [{columna_nombre.key: n, **(extra(n) if extra else {})} for n in faltantes]
+            )
+            result = await self.db.execute(select(columna_nombre, columna_id).where(columna_nombre.in_(nombres)))
+            existentes = dict(result.all())
+        return existentes
+
+    def _cliente(self) -> int:
+        # Pocos clientes concentran muchas solicitudes
+        inicio, n = self.clientes
+        return inicio + int(n * self.rng.random() ** 2.5)
+
+    def _momento(self, dia: date) -> datetime:
+        return datetime.combine(dia, datetime.min.time()) + timedelta(seconds=self.rng.randint(8 * 3600, 19 * 3600))
+
+    def _gps(self) -> str:
+        return f"{self.rng.uniform(*LAT):.6f},{self.rng.uniform(*LON):.6f}"
+
+    def _progreso(self, tabla: str, hechas: int, total: int, inicio: float) -> None:
+        ritmo = hechas / max(time.perf_counter() - inicio, 1e-9)
+        print(f"  {tabla}: {hechas:,}/{total:,} ({ritmo:,.0f}/s)", flush=True)
+
+    # -- catálogos, acceso y configuración --
+
+    async def catalogos(self) -> None:
+        estados_prestamo = ESTADOS_PRESTAMO + tuple(
+            e.strip().lower() for e in settings.ESTADOS_PRESTAMO_DEVENGO.split(",")
+            if e.strip() and e.strip().lower() not in ESTADOS_PRESTAMO
+        )
+        self.ids["solicitud"] = await self._por_nombre(
+            EstadoSolicitud.Id_Estado_Solicitud, EstadoSolicitud.Nombre, ESTADOS_SOLICITUD
+        )
+        self.ids["articulo"] = await self._por_nombre(
+            EstadoArticulo.id_estado_articulo, EstadoArticulo.nombre, ESTADOS_ARTICULO
+        )
+        self.ids["prestamo"] = await self._por_nombre(
+            EstadoPrestamo.id_estado_prestamo, EstadoPrestamo.nombre, estados_prestamo
+        )
+        self.ids["pago"] = await self._por_nombre(EstadoPago.id_estado_pago, EstadoPago.nombre, ESTADOS_PAGO)
+        self.ids["inventario"] = await self._por_nombre(
+            EstadoInventario.id_estado_inventario, EstadoInventario.nombre, ESTADOS_INVENTARIO
+        )
+        self.ids["tipo"] = await self._por_nombre(CatTipoArticulo.id_tipo, CatTipoArticulo.nombre, tuple(TIPOS))
+
+        result = await self.db.execute(select(ReglaTipoArticulo.id_tipo))
+        con_regla = set(result.scalars().all())
+        await self._insertar(ReglaTipoArticulo, [
+            {
+                "id_tipo": id_tipo,
+                "admite_comprar": nombre != "Vehículos",
+                "admite_recoleccion": nombre not in ("Vehículos", "Joyería"),
+                "valor_max_domicilio": Decimal("15000.00"),
+                "requiere_dos_personas": nombre in ("Electrodomésticos", "Vehículos"),
+                "requiere_serie": nombre in ("Electrónicos", "Vehículos"),
+                "requiere_prueba": nombre in ("Electrónicos", "Instrumentos musicales"),
+            }
+            for nombre, id_tipo in self.ids["tipo"].items() if id_tipo not in con_regla
+        ])
+
+        result = await self.db.execute(select(ConfiguracionesGenerales.clave))
+        claves = set(result.scalars().all())
+        configuracion = {
+            "tasa_interes_diaria": (str(settings.TASA_INTERES_DIARIA), "Interés diario sobre saldo"),
+            "tasa_mora_diaria": (str(settings.TASA_MORA_DIARIA), "Mora diaria sobre cuotas vencidas"),
+        }
+        await self._insertar(ConfiguracionesGenerales, [
+            {"clave": c, "valor": v, "descripcion": d, "vigente_desde": datetime(2020, 1, 1)}
+            for c, (v, d) in configuracion.items() if c not in claves
+        ])
+        await self.db.commit()
+
+    async def acceso(self) -> None:
+        roles = (*PERSONAL, ROL_CLIENTE)
+        self.ids["rol"] = await self._por_nombre(Rol.id_rol, Rol.nombre, roles)
+        modulos = sorted({c.split(".")[0] for c in PERMISOS})
+        self.ids["modulo"] = await self._por_nombre(
+            Modulo.id_modulo, Modulo.nombre, modulos, extra=lambda n: {"ruta": f"/{n}"}
+        )
+        acciones = sorted({c.split(".")[1] for c in PERMISOS})
+        self.ids["accion"] = await self._por_nombre(Accion.id_accion, Accion.nombre, acciones)
+        self.ids["permiso"] = await self._por_nombre(
+            Permiso.id_permiso,
+            Permiso.codigo,
+            tuple(PERMISOS),
+            extra=lambda c: {"id_modulo": self.ids["modulo"][c.split(".")[0]], "id_accion": self.ids["accion"][c.split(".")[1]]},
+        )
+
+        result = await self.db.execute(select(RolPermiso.id_rol, RolPermiso.id_permiso))
+        asignados = set(result.all())
+        filas = []
+        for codigo, roles_codigo in PERMISOS.items():
+            for rol in ("admin", *roles_codigo):
+                clave = (self.ids["rol"][rol], self.ids["permiso"][codigo])
+                if clave not in asignados:
+                    asignados.add(clave)
+                    filas.append({"id_rol": clave[0], "id_permiso": clave[1], "otorgado": True})
+        await self._insertar(RolPermiso, filas)
+
+        result = await self.db.execute(select(Menu.id_modulo))
+        con_menu = set(result.scalars().all())
+        nuevos = [m for m in modulos if self.ids["modulo"][m] not in con_menu]
+        if nuevos:
+            primero = await self._reservar(Menu.id_menu, len(nuevos))
+            menus = [
+                {"id_menu": primero + i, "id_modulo": self.ids["modulo"][m], "etiqueta": m.capitalize(), "orden": i + 1}
+                for i, m in enumerate(nuevos)
+            ]
+            await self._insertar(Menu, menus)
+            visibles = {m: {"admin"} | {r for c, rs in PERMISOS.items() if c.startswith(f"{m}.") for r in rs} for m in nuevos}
+            await self._insertar(RolMenu, [
+                {"id_rol": self.ids["rol"][rol], "id_menu": fila["id_menu"]}
+                for fila, m in zip(menus, nuevos)
+                for rol in sorted(visibles[m])
+            ])
+        await self.db.commit()
+
+    async def zonas(self) -> None:
+        n = self.conteos["zonas"]
+        municipios = ("Guatemala", "Mixco", "Villa Nueva", "Santa Catarina Pinula", "San Miguel Petapa")
+        filas = []
+        for i in range(n):
+            municipio = municipios[i % len(municipios)]
+            filas.append({
+                "departamento": "Guatemala",
+                "municipio": municipio,
+                "zona": str(i % 25 + 1),
+                "colonia_barrio": f"Colonia {i + 1}",
+                "permite_recoleccion": self.rng.random() < 0.8,
+                "limite_valor": _dinero(self.rng.choice((5000, 10000, 20000))),
+                "dias_habiles": "L-V" if self.rng.random() < 0.7 else "L-S",
+                "riesgo": _elegir(self.rng, {"bajo": 0.6, "medio": 0.3, "alto": 0.1}),
+                "activo": True,
+            })
+        await self._insertar(CoberturaZona, filas)
+        await self.db.commit()
+
+    # -- usuarios --
+
+    async def usuarios(self) -> None:
+        n_personal = sum(PERSONAL.values())
+        total = max(self.conteos["usuarios"], n_personal + 1)
+        # Un solo hash: bcrypt por fila tomaría horas
+        contrasena = hash_password(self.password)
+        primero = await self._reservar(User.ID_Usuario, total)
+        self.clientes = (primero + n_personal, total - n_personal)
+
+        roles_personal = [rol for rol, n in PERSONAL.items() for _ in range(n)]
+        inicio = time.perf_counter()
+        for desde in range(0, total, self.lote):
+            usuarios, roles, preferencias = [], [], []
+            for i in range(desde, min(desde + self.lote, total)):
+                id_usuario = primero + i
+                rol = roles_personal[i] if i < n_personal else ROL_CLIENTE
+                if rol != ROL_CLIENTE:
+                    self.personal.setdefault(rol, []).append(id_usuario)
+                usuarios.append({
+                    "ID_Usuario": id_usuario,
+                    "Nombre": f"{rol.capitalize()} {id_usuario}",
+                    "Correo": f"{rol}{id_usuario}@bench.example.com",
+                    "Contrasena_hash": contrasena,
+                    "Telefono": f"5{self.rng.randint(0, 9999999):07d}",
+                    "Direccion": f"{self.rng.randint(1, 30)} calle {self.rng.randint(1, 40)}-{self.rng.randint(1, 99)} zona {self.rng.randint(1, 25)}",
+                    "Verificado": self.rng.random() < 0.85,
+                    "Estado_Activo": self.rng.random() < 0.98,
+                    "Token_version": 0,
+                })
+                roles.append({"id_usuario": id_usuario, "id_rol": self.ids["rol"][rol]})
+                if self.rng.random() < 0.3:
+                    preferencias.append({"id_usuario": id_usuario, "clave": "tema", "valor": self.rng.choice(("claro", "oscuro"))})
+                if self.rng.random() < 0.2:
+                    preferencias.append({"id_usuario": id_usuario, "clave": "notificaciones", "valor": "correo"})
+            await self._insertar(User, usuarios)
+            await self._insertar(UsuarioRol, roles)
+            await self._insertar(PreferenciasUsuario, preferencias)
+            await self.db.commit()
+            self._progreso("usuarios", min(desde + self.lote, total), total, inicio)
+
+        # Algunas excepciones individuales sobre el rol
+        denegar = self.ids["permiso"]["contrato.emitir"]
+        await self._insertar(UsuarioPermiso, [
+            {"id_usuario": u, "id_permiso": denegar, "decision": "DENY", "motivo": "Datos de prueba"}
+            for u in self.personal["evaluador"][:3]
+        ])
+        await self.db.commit()
+
+    # -- solicitudes, artículos y préstamos --
+
+    def _estado_prestamo(self, vencimiento: date) -> str:
+        if vencimiento < self.hoy:
+            return _elegir(self.rng, {"pagado": 0.70, "rematado": 0.15, "vencido": 0.15})
+        return "vencido" if self.rng.random() < 0.15 else "activo"
+
+    async def prestamos(self) -> None:
+        total = self.conteos["prestamos"]
+        tasa = float(settings.TASA_INTERES_MENSUAL)
+        mora_diaria = float(settings.TASA_MORA_DIARIA)
+        evaluadores = self.personal["evaluador"]
+        tipos = list(self.ids["tipo"].items())
+        pesos_tipo = [TIPOS[n][0] for n, _ in tipos]
+        hechos = 0
+        inicio = time.perf_counter()
+
+        while hechos < total:
+            # Un lote por bloque de préstamos; las tablas hijas van en el mismo commit
+            n = min(self.lote, total - hechos)
+            solicitudes, articulos, fotos, recepciones, prestamos = [], [], [], [], []
+            planes = []  # (fila préstamo, plazo, estado)
+            id_sol = await self._reservar(Solicitud.id_solicitud, 0)
+            id_art = await self._reservar(Articulo.id_articulo, 0)
+            id_pre = await self._reservar(Prestamo.id_prestamo, 0)
+            en_lote = 0
+            while en_lote < n:
+                id_usuario = self._cliente()
+                dias = int(1095 * self.rng.random() ** 1.5)
+                fecha_inicio = self.hoy - timedelta(days=dias)
+                envio = self._momento(fecha_inicio - timedelta(days=self.rng.randint(1, 10)))
+                domicilio = self.rng.random() < 0.35
+                # 1 de cada 5 solicitudes no termina en préstamo
+                aprobada = self.rng.random() >= 0.2
+                estado_sol = "aprobada" if aprobada else self.rng.choice(("pendiente", "en_revision", "rechazada"))
+                solicitudes.append({
+                    "id_solicitud": id_sol,
+                    "id_usuario": id_usuario,
+                    "id_estado": self.ids["solicitud"][estado_sol],
+                    "fecha_envio": envio,
+                    "metodo_entrega": "domicilio" if domicilio else "oficina",
+                    "direccion_entrega": f"{self.rng.randint(1, 30)} avenida {self.rng.randint(1, 40)}-{self.rng.randint(1, 99)}" if domicilio else None,
+                })
+                for _ in range(1 if self.rng.random() < 0.8 else 2):
+                    tipo, id_tipo = self.rng.choices(tipos, weights=pesos_tipo)[0]
+                    monto = min(max(self.rng.lognormvariate(math.log(TIPOS[tipo][1]), 0.8), 100.0), 250_000.0)
+                    avaluo = monto / self.rng.uniform(0.5, 0.8)
+                    con_prestamo = aprobada and en_lote < n
+                    plazo = _elegir(self.rng, PLAZOS)
+                    vencimiento = sumar_meses(fecha_inicio, plazo)
+                    estado = self._estado_prestamo(vencimiento) if con_prestamo else None
+                    if not con_prestamo:
+                        estado_art = settings.ESTADO_ARTICULO_INICIAL if estado_sol != "rechazada" else "devuelto"
+                    else:
+                        estado_art = {"pagado": "devuelto", "rematado": "rematado"}.get(estado, "en_custodia")
+                    articulos.append({
+                        "id_articulo": id_art,
+                        "id_solicitud": id_sol,
+                        "id_tipo": id_tipo,
+                        "id_estado": self.ids["articulo"][estado_art],
+                        "descripcion": f"{tipo} de prueba #{id_art}",
+                        "valor_estimado": _dinero(avaluo),
+                        "valor_aprobado": _dinero(avaluo * 0.95) if con_prestamo else None,
+                        "condicion": _elegir(self.rng, {"nuevo": 0.1, "bueno": 0.6, "regular": 0.3}),
+                    })
+                    fotos.extend(
+                        {"id_articulo": id_art, "url": f"/media/fotos/bench/{id_art}_{k}.jpg", "orden": k}
+                        for k in range(1, self.rng.choice((0, 1, 2, 2, 3, 4)) + 1)
+                    )
+                    if con_prestamo:
+                        recepciones.append({
+                            "id_articulo": id_art,
+                            "id_usuario": self.rng.choice(evaluadores),
+                            "metodo_entrega": "domicilio" if domicilio else "oficina",
+                            "gps": self._gps() if domicilio or self.rng.random() < 0.3 else None,
+                            "estado_verificacion": "verificado",
+                            "fecha_recepcion": self._momento(fecha_inicio),
+                        })
+                        creado = self._momento(fecha_inicio)
+                        fila = {
+                            "id_prestamo": id_pre,
+                            "id_articulo": id_art,
+                            "id_usuario_evaluador": self.rng.choice(evaluadores),
+                            "id_estado": self.ids["prestamo"][estado],
+                            "fecha_inicio": fecha_inicio,
+                            "fecha_vencimiento": vencimiento,
+                            "monto_prestamo": _dinero(monto),
+                            "created_at": creado,
+                            "updated_at": creado,
+                            "ultimo_calculo_en": self.hoy - timedelta(days=1) if estado in ("activo", "vencido") else None,
+                        }
+                        prestamos.append(fila)
+                        planes.append((fila, plazo, estado))
+                        id_pre += 1
+                        en_lote += 1
+                    id_art += 1
+                id_sol += 1
+
+            self.siguiente[Solicitud.__tablename__] = id_sol
+            self.siguiente[Articulo.__tablename__] = id_art
+            self.siguiente[Prestamo.__tablename__] = id_pre
+
+            cuotas_fijas = cuota_fija(
+                [float(f["monto_prestamo"]) for f, _, _ in planes],
+                [tasa] * len(planes),
+                [p for _, p, _ in planes],
+            )
+            hijos = self._hijos_prestamos(planes, cuotas_fijas, mora_diaria)
+            hijos["pagos"] = await self._numerar(Pago.id_pago, hijos["pagos"])
+
+            await self._insertar(Solicitud, solicitudes)
+            await self._insertar(Articulo, articulos)
+            await self._insertar(ArticuloFoto, fotos)
+            await self._insertar(RecepcionArticulo, recepciones)
+            await self._insertar(Prestamo, prestamos)
+            await self._insertar(Cuota, hijos["cuotas"])
+            await self._insertar(Contrato, hijos["contratos"])
+            await self._insertar(Pago, hijos["pagos"])
+            await self._insertar(Comprobante, [
+                {"id_pago": p["id_pago"], "imagen": f"/media/comprobantes/bench/{p['id_pago']}.jpg"}
+                for p in hijos["pagos"] if p["medio_pago"] != "efectivo"
+            ])
+            await self._insertar(PrestamoMovimiento, hijos["movimientos"])
+            await self._remates(hijos["remates"])
+            await self.db.commit()
+            hechos += n
+            self._progreso("prestamos", hechos, total, inicio)
+
+    def _hijos_prestamos(self, planes, cuotas_fijas, mora_diaria: float) -> dict[str, list]:
+        hijos = {"cuotas": [], "contratos": [], "pagos": [], "movimientos": [], "remates": []}
+        validadores = self.personal["evaluador"]
+        id_validado = self.ids["pago"]["validado"]
+        for (fila, plazo, estado), monto_cuota in zip(planes, cuotas_fijas):
+            id_prestamo = fila["id_prestamo"]
+            inicio = fila["fecha_inicio"]
+            fechas = [sumar_meses(inicio, k) for k in range(1, plazo + 1)]
+            vencidas = sum(1 for f in fechas if f < self.hoy)
+            if estado == "pagado":
+                pagadas = plazo
+            elif estado == "vencido":
+                # Deja de pagar en algún momento antes de hoy
+                pagadas = self.rng.randint(0, max(vencidas - 1, 0))
+            elif estado == "rematado":
+                pagadas = self.rng.randint(0, max(plazo - 2, 0))
+            else:
+                pagadas = vencidas
+
+            monto = _dinero(float(monto_cuota))
+            pendiente = Decimal("0.00")
+            for k, fecha in enumerate(fechas, start=1):
+                pagada = k <= pagadas
+                hijos["cuotas"].append({
+                    "id_prestamo": id_prestamo, "numero": k, "fecha_venc": fecha, "monto": monto,
+                    "pagada": int(pagada), "abonado": monto if pagada else Decimal("0.00"),
+                })
+                if pagada:
+                    medio = _elegir(self.rng, MEDIOS_PAGO)
+                    hijos["pagos"].append({
+                        "id_prestamo": id_prestamo,
+                        "id_estado": id_validado,
+                        "id_validador": self.rng.choice(validadores),
+                        "fecha_pago": self._momento(fecha - timedelta(days=self.rng.randint(0, 5))),
+                        "monto": monto,
+                        "tipo_pago": "cuota",
+                        "medio_pago": medio,
+                        "ref_bancaria": None if medio == "efectivo" else f"BK{self.rng.randint(0, 10**10):010d}",
+                    })
+                else:
+                    pendiente += monto
+
+            if estado in ("activo", "vencido"):
+                fila["deuda_actual"] = pendiente
+                primera_vencida = fechas[pagadas] if pagadas < len(fechas) else None
+                dias_mora = (self.hoy - primera_vencida).days if primera_vencida and primera_vencida < self.hoy else 0
+                fila["mora_acumulada"] = _dinero(float(monto) * mora_diaria * dias_mora)
+                fila["interes_acumulada"] = _dinero(float(pendiente) * float(settings.TASA_INTERES_DIARIA) * 30)
+            else:
+                fila["deuda_actual"] = fila["mora_acumulada"] = fila["interes_acumulada"] = Decimal("0.00")
+            if estado == "vencido":
+                self.vencidos.append(id_prestamo)
+            if estado == "rematado":
+                hijos["remates"].append(fila)
+
+            hijos["contratos"].append({
+                "id_prestamo": id_prestamo,
+                "url_pdf": f"/media/contratos/bench/{id_prestamo}.pdf",
+                "hash_doc": hashlib.sha256(f"contrato-{id_prestamo}".encode()).hexdigest(),
+                "firma_cliente_en": fila["created_at"],
+                "firma_empresa_en": fila["created_at"],
+            })
+            hijos["movimientos"].append({
+                "id_prestamo": id_prestamo,
+                "tipo": "DESEMBOLSO",
+                "monto": fila["monto_prestamo"],
+                "fecha": fila["created_at"],
+            })
+        return hijos
+
+    async def _numerar(self, columna, filas: list[dict]) -> list[dict]:
+        """Asigna ids propios para poder colgar hijos (comprobantes, movimientos) sin leerlos de vuelta."""
+        primero = await self._reservar(columna, len(filas))
+        for i, fila in enumerate(filas):
+            fila[columna.key] = primero + i
+        return filas
+
+    async def _remates(self, prestamos: list[dict]) -> None:
+        if not prestamos:
+            return
+        inventario, ventas = [], []
+        primero = await self._reservar(InventarioVenta.id_inventario, len(prestamos))
+        for i, p in enumerate(prestamos):
+            ingreso = min(p["fecha_vencimiento"] + timedelta(days=30), self.hoy)
+            base = p["monto_prestamo"] * Decimal("1.30")
+            dias = (self.hoy - ingreso).days
+            vendido = self.rng.random() < 0.6
+            inventario.append({
+                "id_inventario": primero + i,
+                "id_articulo": p["id_articulo"],
+                "id_estado": self.ids["inventario"]["vendido" if vendido else "disponible"],
+                "precio_base": _dinero(float(base)),
+                "precio_actual": _dinero(float(base) * max(0.5, 1 - dias / 365)),
+                "dias_en_bodega": dias,
+                "fecha_ingreso": ingreso,
+            })
+            if vendido:
+                ventas.append({
+                    "id_inventario": primero + i,
+                    "id_comprador": self._cliente(),
+                    "precio_final": _dinero(float(base) * self.rng.uniform(0.7, 1.0)),
+                    "fecha_venta": min(ingreso + timedelta(days=self.rng.randint(1, 120)), self.hoy),
+                })
+        await self._insertar(InventarioVenta, inventario)
+        await self._insertar(Venta, ventas)
+
+    # -- cobranza, auditoría y requerimientos --
+
+    async def cobranza(self) -> None:
+        cobradores = self.personal[settings.ROL_COBRADOR]
+        dias = [self.hoy - timedelta(days=d) for d in range(60) if (self.hoy - timedelta(days=d)).weekday() < 5]
+        primero = await self._reservar(RutaCobranza.id_ruta, len(cobradores) * len(dias))
+        rutas = [
+            {"id_ruta": primero + i, "id_usuario_cobrador": c, "fecha_asignacion": d}
+            for i, (c, d) in enumerate((c, d) for d in dias for c in cobradores)
+        ]
+        await self._insertar(RutaCobranza, rutas)
+        await self.db.commit()
+
+        total = len(self.vencidos) * 2
+        inicio = time.perf_counter()
+        for desde in range(0, total, self.lote):
+            visitas = []
+            for _ in range(min(self.lote, total - desde)):
+                ruta = self.rng.choice(rutas)
+                resultado = _elegir(self.rng, {"no_encontrado": 0.4, "promesa_pago": 0.35, "pago_parcial": 0.25})
+                visitas.append({
+                    "id_ruta": ruta["id_ruta"],
+                    "id_prestamo": self.rng.choice(self.vencidos),
+                    "resultado": resultado,
+                    "gps": self._gps(),
+                    "monto_pagado": _dinero(self.rng.uniform(50, 500)) if resultado == "pago_parcial" else None,
+                    "fecha_visita": self._momento(ruta["fecha_asignacion"]),
+                })
+            await self._insertar(VisitasCobranza, visitas)
+            await self.db.commit()
+            self._progreso("visitas", min(desde + self.lote, total), total, inicio)
+
+    async def auditoria(self) -> None:
+        total = self.conteos["auditoria"]
+        staff = [u for ids in self.personal.values() for u in ids]
+        inicio = time.perf_counter()
+        for desde in range(0, total, self.lote):
+            filas = []
+            for _ in range(min(self.lote, total - desde)):
+                modulo = _elegir(self.rng, MODULOS_AUDITORIA)
+                accion = _elegir(self.rng, ACCIONES_AUDITORIA)
+                cuando = self.hoy - timedelta(days=int(1095 * self.rng.random() ** 1.5))
+                nuevo = {"id": self.rng.randint(1, 10**6), "estado": self.rng.choice(("activo", "pagado", "pendiente"))}
+                filas.append({
+                    "id_usuario": self.rng.choice(staff) if self.rng.random() < 0.7 else self._cliente(),
+                    "accion": accion,
+                    "modulo": modulo,
+                    "fecha_hora": self._momento(cuando),
+                    "detalle": f"{accion} en {modulo}",
+                    "old_values": json.dumps({"estado": "pendiente"}) if accion == "UPDATE" else None,
+                    "new_values": json.dumps(nuevo) if accion != "DELETE" else None,
+                })
+            await self._insertar(Auditoria, filas)
+            await self.db.commit()
+            self._progreso("auditoria", min(desde + self.lote, total), total, inicio)
+
+    async def requerimientos(self) -> None:
+        total = self.conteos["requerimientos"]
+        asuntos = ("Consulta de saldo", "Ampliación de plazo", "Error en pago", "Cambio de dirección", "Retiro de artículo")
+        for desde in range(0, total, self.lote):
+            filas = []
+            for _ in range(min(self.lote, total - desde)):
+                creado = self._momento(self.hoy - timedelta(days=self.rng.randint(0, 720)))
+                cerrado = self.rng.random() < 0.7
+                filas.append({
+                    "id_usuario": self._cliente(),
+                    "id_estado": 2 if cerrado else 1,
+                    "asunto": self.rng.choice(asuntos),
+                    "detalle": "Generado por benchmarks/seeder.py",
+                    "creado_en": creado,
+                    "cerrado_en": creado + timedelta(hours=self.rng.randint(1, 240)) if cerrado else None,
+                })
+            await self._insertar(RequerimientoCliente, filas)
+            await self.db.commit()
+
+
+async def sembrar(
+    conteos: dict, lote: int, semilla: int, password: str, con_cartera: bool, crear: bool = False
+) -> dict:
+    inicio = time.perf_counter()
+    try:
+        if crear:
+            print("  creando el esquema...", flush=True)
+            await crear_esquema(engine)
+        async with SessionLocal() as db:
+            s = Sembrador(db, random.Random(semilla), conteos, lote, password)
+            await s.catalogos()
+            await s.acceso()
+            await s.zonas()
+            await s.usuarios()
+            await s.prestamos()
+            await s.cobranza()
+            await s.auditoria()
+            await s.requerimientos()
+            if con_cartera:
+                print("  reconstruyendo Resumen_Cartera...", flush=True)
+                await cartera.reconstruir(db)
+    finally:
+        await engine.dispose()
+    primer_cliente = s.clientes[0]
+    admin = s.personal["admin"][0]
+    return {
+        "filas": dict(sorted(s.insertadas.items())),
+        "segundos": round(time.perf_counter() - inicio, 1),
+        "cliente": f"{ROL_CLIENTE}{primer_cliente}@bench.example.com",
+        "admin": f"admin{admin}@bench.example.com",
+        "password": password,
+    }
+
+
+def _conteos(escala: float, extra: list[str]) -> dict:
+    conteos = {k: max(int(v * escala), 0) for k, v in BASE.items()}
+    for par in extra:
+        clave, _, valor = par.partition("=")
+        if clave not in BASE or not valor.isdigit():
+            raise SystemExit(f"--conteo inválido: {par} (claves: {', '.join(BASE)})")
+        conteos[clave] = int(valor)
+    return conteos
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Datos sintéticos a escala")
+    parser.add_argument("--escala", type=float, default=0.01, help="1.0 = 1M préstamos, ~10M cuotas, 5M auditoría")
+    parser.add_argument("--conteo", action="append", default=[], metavar="TABLA=N", help=f"Ajusta un conteo ({', '.join(BASE)})")
+    parser.add_argument("--lote", type=int, default=5000, help="Filas por commit")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--password", default="bench12345", help="Contraseña de todas las cuentas")
+    parser.add_argument("--sin-cartera", action="store_true", help="No reconstruir Resumen_Cartera al final")
+    parser.add_argument("--crear-esquema", action="store_true", help="Crea las tablas antes de sembrar (base vacía)")
+    parser.add_argument("--permitir-remoto", action="store_true", help="Permite un DB_URL que no sea local")
+    args = parser.parse_args(argv)
+
+    if not args.permitir_remoto and not _es_local(settings.DB_URL):
+        raise SystemExit("DB_URL no apunta a una base local; use --permitir-remoto si es intencional")
+    # Las inserciones masivas superan SQL_LENTA_MS por diseño
+    logging.getLogger("app.db.instrumentacion").setLevel(logging.ERROR)
+
+    conteos = _conteos(args.escala, args.conteo)
+    print(f"Sembrando {conteos} (lote {args.lote}, semilla {args.semilla})", flush=True)
+    resumen = asyncio.run(
+        sembrar(conteos, args.lote, args.semilla, args.password, not args.sin_cartera, args.crear_esquema)
+    )
+    print(json.dumps(resumen, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
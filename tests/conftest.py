@@ -0,0 +1,178 @@
+"""Base SQLite temporal con el esquema completo y los catálogos mínimos.
+
+Las variables se fijan antes de importar `app`: settings y engines se crean
+al importar. DB_URL se fuerza para no tocar nunca la base de un .env local;
+PRUEBAS_DB_URL permite correrlas contra una base MySQL desechable (cada
+prueba borra y vuelve a crear todas las tablas).
+"""
+import itertools
+import os
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+
+_DIRECTORIO = tempfile.mkdtemp(prefix="pignoraticios-pruebas-")
+os.environ["DB_URL"] = os.environ.get("PRUEBAS_DB_URL") or f"sqlite+aiosqlite:///{_DIRECTORIO}/pruebas.db"
+os.environ.pop("DB_READ_URL", None)
+os.environ.setdefault("JWT_SECRET", "secreto-de-pruebas")
+os.environ["MEDIA_DIR"] = os.path.join(_DIRECTORIO, "media")
+os.environ["AUDITORIA_RESPALDO"] = os.path.join(_DIRECTORIO, "auditoria_pendiente.jsonl")
+# Sin red: la descarga de certificados falla al instante
+os.environ.setdefault("GOOGLE_CERTS_URL", "http://127.0.0.1:9/certs")
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.db.database import Base, SessionLocal, engine  # noqa: E402
+from app.db.esquema import cargar_modelos, crear_esquema  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db.models.articulo import Articulo  # noqa: E402
+from app.db.models.cuota import Cuota  # noqa: E402
+from app.db.models.permiso import Permiso  # noqa: E402
+from app.db.models.prestamo import Prestamo  # noqa: E402
+from app.db.models.solicitud import Solicitud  # noqa: E402
+from app.db.models.user import User  # noqa: E402
+from app.db.models.usuario_permiso import UsuarioPermiso  # noqa: E402
+from app.services.catalogos import catalogos  # noqa: E402
+from app.services.menus import arboles_menu  # noqa: E402
+from app.services.permisos import resolver_permisos  # noqa: E402
+from app.services.user_cache import cache_usuarios  # noqa: E402
+from app.services.catalogos import _FUENTES, registro_catalogos  # noqa: E402
+
+CATALOGOS = {
+    "estado_solicitud": ("pendiente", "aprobada", "rechazada"),
+    "estado_articulo": ("pendiente", "recibido"),
+    "estado_prestamo": ("activo", "vencido", "pagado"),
+    "estado_pago": ("pendiente", "validado", "rechazado"),
+    "estado_inventario": ("disponible", "vendido"),
+    "tipo_articulo": ("electronica", "joyeria"),
+}
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def bd():
+    """Esquema recién creado con los catálogos cargados; devuelve el engine."""
+    cargar_modelos()
+    # Los ids se repiten entre pruebas: nada en cache puede sobrevivir a la base anterior
+    cache_usuarios.limpiar()
+    resolver_permisos.invalidar()
+    arboles_menu.invalidar()
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await crear_esquema(engine)
+        async with SessionLocal() as db:
+            for catalogo, nombres in CATALOGOS.items():
+                _, col_nombre = _FUENTES[catalogo]
+                await db.execute(insert(col_nombre.class_), [{col_nombre.key: n} for n in nombres])
+            await db.commit()
+            await registro_catalogos.cargar(db)
+        yield engine
+    finally:
+        # Cada prueba corre en su propio event loop: no se reusan conexiones entre pruebas
+        await engine.dispose()
+
+
+@pytest.fixture
+async def cliente(bd):
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://prueba") as c:
+            yield c
+
+
+_correos = itertools.count(1)
+
+
+async def _nuevo_usuario(db) -> User:
+    usuario = User(Nombre="Cliente", Correo=f"cliente{next(_correos)}@prueba.mx", Contrasena_hash="x")
+    db.add(usuario)
+    await db.flush()
+    return usuario
+
+
+@pytest.fixture
+async def crear_usuario(bd):
+    """Crea un usuario con esos permisos (ALLOW directo) y devuelve (id, cabeceras con su token)."""
+    async def crear(*permisos: str) -> tuple[int, dict]:
+        async with SessionLocal() as db:
+            usuario = await _nuevo_usuario(db)
+            for codigo in permisos:
+                permiso = await db.scalar(select(Permiso).where(Permiso.codigo == codigo))
+                if permiso is None:
+                    permiso = Permiso(id_modulo=1, id_accion=1, codigo=codigo)
+                    db.add(permiso)
+                    await db.flush()
+                db.add(UsuarioPermiso(id_usuario=usuario.ID_Usuario, id_permiso=permiso.id_permiso, decision="ALLOW"))
+            await db.commit()
+            token = create_access_token({"sub": str(usuario.ID_Usuario), "ver": 0})
+            return usuario.ID_Usuario, {"Authorization": f"Bearer {token}"}
+
+    return crear
+
+
+@pytest.fixture
+async def crear_prestamo(bd):
+    """Crea un préstamo (con su usuario, solicitud y artículo) y devuelve su id.
+
+    `cuotas` es una lista de (fecha_venc, monto); la deuda por omisión es su suma.
+    """
+    async def crear(
+        cuotas: list[tuple[date, Decimal]] = (),
+        deuda: Decimal | None = None,
+        estado: str = "activo",
+        tipo: str = "joyeria",
+        interes: Decimal = Decimal("0.00"),
+        mora: Decimal = Decimal("0.00"),
+        inicio: date = date(2026, 1, 1),
+    ) -> int:
+        cat = catalogos()
+        deuda = deuda if deuda is not None else sum((m for _, m in cuotas), Decimal("0.00"))
+        async with SessionLocal() as db:
+            usuario = await _nuevo_usuario(db)
+            solicitud = Solicitud(
+                id_usuario=usuario.ID_Usuario,
+                id_estado=cat.estado_solicitud.id("pendiente"),
+                metodo_entrega="sucursal",
+            )
+            db.add(solicitud)
+            await db.flush()
+            articulo = Articulo(
+                id_solicitud=solicitud.id_solicitud,
+                id_tipo=cat.tipo_articulo.id(tipo),
+                id_estado=cat.estado_articulo.id("recibido"),
+                descripcion="Anillo",
+            )
+            db.add(articulo)
+            await db.flush()
+            prestamo = Prestamo(
+                id_articulo=articulo.id_articulo,
+                id_usuario_evaluador=usuario.ID_Usuario,
+                id_estado=cat.estado_prestamo.id(estado),
+                fecha_inicio=inicio,
+                fecha_vencimiento=max((f for f, _ in cuotas), default=inicio),
+                monto_prestamo=deuda - interes - mora,
+                deuda_actual=deuda,
+                interes_acumulada=interes,
+                mora_acumulada=mora,
+                created_at=datetime.now(),
+                updated_at=datetime.now(),
+            )
+            db.add(prestamo)
+            await db.flush()
+            db.add_all([
+                Cuota(id_prestamo=prestamo.id_prestamo, numero=i, fecha_venc=f, monto=m)
+                for i, (f, m) in enumerate(cuotas, start=1)
+            ])
+            await db.commit()
+            return prestamo.id_prestamo
+
+    return crear
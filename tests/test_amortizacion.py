@@ -0,0 +1,129 @@
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+from app.db.database import SessionLocal
+from app.db.models.cuota import Cuota
+from app.db.models.prestamo import Prestamo
+from app.services.amortizacion import cuota_fija, generar_cuotas, meses_entre, planes, simular, sumar_meses
+from app.services.pagos import PagoIn, registrar_pago
+
+pytestmark = pytest.mark.anyio
+
+INICIO = date(2026, 1, 31)
+
+
+def _plan(monto: str, tasa: str, plazo: int):
+    return simular(Decimal(monto), [(Decimal(tasa), plazo)], INICIO)[0]
+
+
+def test_sumar_meses_ajusta_al_fin_de_mes():
+    assert sumar_meses(INICIO, 1) == date(2026, 2, 28)
+    assert sumar_meses(INICIO, 13) == date(2027, 2, 28)
+    assert meses_entre(date(2026, 1, 15), date(2026, 1, 20)) == 1
+
+
+def test_cuota_fija_con_y_sin_tasa():
+    cuotas = cuota_fija(np.array([1200.0, 1000.0]), np.array([0.0, 0.05]), np.array([12, 12]))
+    assert cuotas[0] == pytest.approx(100.0)
+    assert cuotas[1] == pytest.approx(112.825, abs=1e-3)
+
+
+@pytest.mark.parametrize("monto, tasa, plazo", [
+    ("1000", "0.05", 12),
+    ("1000", "0.05", 120),
+    ("1000", "0.5", 120),
+    ("1000", "0.9", 120),
+    ("999.99", "0", 7),
+    ("15000", "0.2", 60),
+    ("0.05", "0.03", 12),
+])
+def test_tabla_cuadra_con_el_saldo_redondeado(monto, tasa, plazo):
+    plan = _plan(monto, tasa, plazo)
+    monto, tasa = Decimal(monto), Decimal(tasa)
+
+    assert len(plan) == plazo
+    assert sum(c.capital for c in plan) == monto
+    assert plan[-1].saldo == 0
+    saldo = monto
+    for c in plan:
+        assert c.capital >= 0 and c.saldo >= 0
+        assert c.interes == (saldo * tasa).quantize(Decimal("0.01"), ROUND_HALF_UP)
+        assert c.monto == c.capital + c.interes
+        saldo -= c.capital
+        assert c.saldo == saldo
+    # El redondeo no se acumula: ninguna cuota se aleja más de unos centavos de la primera
+    assert max(abs(c.monto - plan[0].monto) for c in plan) <= Decimal("0.05")
+
+
+def test_tabla_conocida():
+    plan = _plan("1000", "0.05", 120)
+    assert plan[0].monto == Decimal("50.14")
+    assert plan[-1].monto in (Decimal("50.14"), Decimal("50.15"))
+
+
+def test_planes_con_plazos_distintos_en_un_lote():
+    tablas = planes(
+        [Decimal("500"), Decimal("800")], [Decimal("0.1"), Decimal("0.02")], [3, 18], [INICIO, INICIO]
+    )
+    assert [len(t) for t in tablas] == [3, 18]
+    assert [sum(c.capital for c in t) for t in tablas] == [Decimal("500.00"), Decimal("800.00")]
+
+
+async def test_simulacion_rechaza_tasas_y_plazos_fuera_de_rango(cliente, crear_usuario):
+    _, cabeceras = await crear_usuario()
+    for escenario in ({"tasa_mensual": "0.5", "plazo_meses": 12}, {"tasa_mensual": "0.05", "plazo_meses": 120}):
+        r = await cliente.post(
+            "/prestamos/simulacion", json={"monto": "1000", "escenarios": [escenario]}, headers=cabeceras
+        )
+        assert r.status_code == 422
+
+    r = await cliente.post(
+        "/prestamos/simulacion",
+        json={"monto": "1000", "escenarios": [{"tasa_mensual": "0.05", "plazo_meses": 12}], "incluir_cuotas": False},
+        headers=cabeceras,
+    )
+    assert r.status_code == 200
+    assert Decimal(str(r.json()[0]["cuota"])) == Decimal("112.83")
+
+
+async def test_generar_cuotas_solo_para_prestamos_sin_cuotas(crear_prestamo):
+    nuevo = await crear_prestamo(deuda=Decimal("1200.00"), inicio=date(2026, 1, 1))
+    con_cuotas = await crear_prestamo([(date(2026, 2, 1), Decimal("100.00"))])
+    async with SessionLocal() as db:
+        # crear_prestamo deja vencimiento = inicio: un mes de plazo
+        assert await generar_cuotas(db, [nuevo, con_cuotas], Decimal("0.05")) == 1
+        cuotas = (await db.execute(select(Cuota).where(Cuota.id_prestamo == nuevo))).scalars().all()
+        prestamo = await db.get(Prestamo, nuevo)
+    assert [(c.numero, c.monto) for c in cuotas] == [(1, Decimal("1260.00"))]
+    # El interés programado queda cargado: la deuda es la suma de las cuotas
+    assert (prestamo.deuda_actual, prestamo.interes_acumulada) == (Decimal("1260.00"), Decimal("60.00"))
+
+
+async def test_prestamo_amortizado_se_liquida_con_su_interes(crear_prestamo, crear_usuario):
+    id_prestamo = await crear_prestamo(deuda=Decimal("1000.00"), inicio=date(2026, 1, 1))
+    cajero, _ = await crear_usuario()
+    async with SessionLocal() as db:
+        prestamo = await db.get(Prestamo, id_prestamo)
+        prestamo.fecha_vencimiento = date(2027, 1, 1)
+        await db.commit()
+        assert await generar_cuotas(db, [id_prestamo], Decimal("0.05")) == 12
+        cuotas = (await db.execute(select(Cuota).where(Cuota.id_prestamo == id_prestamo))).scalars().all()
+        total = sum(c.monto for c in cuotas)
+        assert total == Decimal("1353.89")
+        assert (await db.get(Prestamo, id_prestamo)).deuda_actual == total
+
+    # Pagar solo el capital ya no cierra la tabla: se aplica primero al interés
+    async with SessionLocal() as db:
+        parcial = await registrar_pago(db, PagoIn(id_prestamo, Decimal("1000.00"), cajero))
+    assert parcial.aplicado["interes"] == Decimal("353.89")
+    assert parcial.deuda_actual == Decimal("353.89")
+    assert len(parcial.cuotas_pagadas) < 12
+
+    async with SessionLocal() as db:
+        final = await registrar_pago(db, PagoIn(id_prestamo, Decimal("353.89"), cajero))
+    assert final.aplicado["capital"] == Decimal("353.89") and final.deuda_actual == Decimal("0.00")
+    assert sorted(parcial.cuotas_pagadas + final.cuotas_pagadas) == list(range(1, 13))
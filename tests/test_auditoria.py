@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db.database import SessionLocal
+from app.db.models.auditoria import Auditoria
+from app.middlewares.audit_log import EscritorAuditoria
+
+pytestmark = pytest.mark.anyio
+
+
+def _registro(i: int) -> dict:
+    return {
+        "id_usuario": 1,
+        "accion": "PRUEBA",
+        "modulo": "pruebas",
+        "detalle": f"registro {i}",
+        "fecha_hora": datetime(2026, 1, 2, 3, 4, 5),
+        "old_values": None,
+        "new_values": None,
+    }
+
+
+async def _contar() -> int:
+    async with SessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(Auditoria))
+
+
+async def test_lote_fallido_se_respalda_y_se_recupera_al_iniciar(bd, tmp_path, monkeypatch):
+    respaldo = tmp_path / "auditoria.jsonl"
+    escritor = EscritorAuditoria(10, 10, 0.01, 0.1, reintentos=2, espera_reintento=0.001, respaldo=str(respaldo))
+    intentos = []
+    insertar = escritor._insertar
+
+    async def falla(lote):
+        intentos.append(len(lote))
+        raise RuntimeError("base caída")
+
+    monkeypatch.setattr(escritor, "_insertar", falla)
+    await escritor._escribir([_registro(i) for i in range(3)])
+
+    assert intentos == [3, 3, 3]
+    assert escritor.fallidos == 3 and escritor.respaldados == 3
+    assert len(respaldo.read_text(encoding="utf-8").splitlines()) == 3
+    assert await _contar() == 0
+
+    monkeypatch.setattr(escritor, "_insertar", insertar)
+    await escritor.iniciar()
+    await escritor.detener()
+
+    assert await _contar() == 3
+    assert not respaldo.exists()
+    assert not (tmp_path / "auditoria.jsonl.recuperando").exists()
+    async with SessionLocal() as db:
+        fechas = set((await db.execute(select(Auditoria.fecha_hora))).scalars())
+    assert fechas == {datetime(2026, 1, 2, 3, 4, 5)}
+
+
+async def test_reintento_exitoso_no_respalda(bd, tmp_path, monkeypatch):
+    respaldo = tmp_path / "auditoria.jsonl"
+    escritor = EscritorAuditoria(10, 10, 0.01, 0.1, reintentos=2, espera_reintento=0.001, respaldo=str(respaldo))
+    insertar = escritor._insertar
+    fallas = [RuntimeError("bloqueo")]
+
+    async def falla_una_vez(lote):
+        if fallas:
+            raise fallas.pop()
+        await insertar(lote)
+
+    monkeypatch.setattr(escritor, "_insertar", falla_una_vez)
+    await escritor._escribir([_registro(1)])
+
+    assert escritor.escritos == 1 and escritor.fallidos == 0
+    assert not respaldo.exists()
+    assert await _contar() == 1
@@ -0,0 +1,79 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.db.database import SessionLocal
+from app.db.models.resumen_cartera import ResumenCartera
+from app.services import cartera
+from app.services.catalogos import catalogos
+from app.utils.insercion import insertar_o_sumar
+
+pytestmark = pytest.mark.anyio
+
+HOY = date(2026, 3, 15)
+
+
+def _resumen(filas: list[dict]) -> dict:
+    return {(f["id_tipo"], f["id_estado"], f["tramo"]): (f["prestamos"], f["saldo"]) for f in filas}
+
+
+@pytest.mark.parametrize("dias, tramo", [(0, "al_dia"), (1, "1_30"), (30, "1_30"), (31, "31_60"), (91, "90_mas")])
+def test_tramo_para(dias, tramo):
+    assert cartera.tramo_para(dias) == tramo
+
+
+async def test_insertar_o_sumar_crea_y_luego_suma(bd):
+    tipo = catalogos().tipo_articulo.id("joyeria")
+    estado = catalogos().estado_prestamo.id("activo")
+    fila = {"id_tipo": tipo, "id_estado": estado, "tramo": "al_dia", "prestamos": 1, "saldo": Decimal("10.50")}
+    async with SessionLocal() as db:
+        for _ in range(3):
+            await db.execute(insertar_o_sumar(db.bind.dialect, ResumenCartera, fila, ["prestamos", "saldo"]))
+        await db.commit()
+        assert _resumen(await cartera.consultar(db)) == {(tipo, estado, "al_dia"): (3, Decimal("31.50"))}
+
+
+async def test_actualizacion_incremental_coincide_con_reconstruir(crear_prestamo):
+    al_dia = await crear_prestamo([(date(2026, 4, 1), Decimal("100.00"))])
+    atrasado = await crear_prestamo([(date(2026, 2, 1), Decimal("250.00"))], tipo="electronica")
+    async with SessionLocal() as db:
+        await cartera.actualizar_prestamos(db, [al_dia, atrasado], HOY)
+        await db.commit()
+        incremental = _resumen(await cartera.consultar(db))
+
+        await cartera.reconstruir(db, HOY)
+        assert _resumen(await cartera.consultar(db)) == incremental
+
+    activo = catalogos().estado_prestamo.id("activo")
+    assert incremental == {
+        (catalogos().tipo_articulo.id("joyeria"), activo, "al_dia"): (1, Decimal("100.00")),
+        (catalogos().tipo_articulo.id("electronica"), activo, "31_60"): (1, Decimal("250.00")),
+    }
+
+
+async def test_cambio_de_tramo_mueve_el_prestamo(crear_prestamo):
+    id_prestamo = await crear_prestamo([(date(2026, 3, 10), Decimal("80.00"))])
+    async with SessionLocal() as db:
+        await cartera.actualizar_prestamos(db, [id_prestamo], date(2026, 3, 1))
+        await db.commit()
+        assert await cartera.avanzar_dia(db, HOY) == 1
+        resumen = {k[2]: v for k, v in _resumen(await cartera.consultar(db)).items()}
+    assert resumen == {"1_30": (1, Decimal("80.00"))}
+
+
+async def test_prestamo_sin_cuotas_envejece_desde_su_vencimiento(crear_prestamo):
+    sin_cuotas = await crear_prestamo(deuda=Decimal("300.00"), inicio=date(2026, 3, 10))
+    liquidado = await crear_prestamo(deuda=Decimal("0.00"), inicio=date(2026, 1, 1))
+    async with SessionLocal() as db:
+        await cartera.actualizar_prestamos(db, [sin_cuotas, liquidado], date(2026, 3, 1))
+        await db.commit()
+        assert await cartera.avanzar_dia(db, HOY) == 1
+        incremental = _resumen(await cartera.consultar(db))
+
+        await cartera.reconstruir(db, HOY)
+        assert _resumen(await cartera.consultar(db)) == incremental
+    assert {k[2]: v for k, v in incremental.items()} == {
+        "1_30": (1, Decimal("300.00")),
+        "al_dia": (1, Decimal("0.00")),
+    }
@@ -0,0 +1,90 @@
+from datetime import datetime, time
+from decimal import Decimal
+
+import pytest
+
+from app.db.database import SessionLocal
+from app.db.models.cobertura_zona import CoberturaZona
+from app.services.cobertura import DiasInvalidos, IndiceCobertura, indice_cobertura, normalizar, parsear_dias
+
+pytestmark = pytest.mark.anyio
+
+LUNES = datetime(2026, 5, 11, 10, 0)
+SABADO = datetime(2026, 5, 16, 10, 0)
+
+
+@pytest.mark.parametrize("crudo, dias", [
+    ("Lunes a Viernes", {0, 1, 2, 3, 4}),
+    ("lunes-viernes", {0, 1, 2, 3, 4}),
+    ("Lunes, Miércoles, Viernes", {0, 2, 4}),
+    ("Sábados", {5}),
+    ("Sábado y Domingo", {5, 6}),
+    ("lun,mie,vie", {0, 2, 4}),
+    ("L-V", {0, 1, 2, 3, 4}),
+    ("LMXJV", {0, 1, 2, 3, 4}),
+    ("1-5", {0, 1, 2, 3, 4}),
+    ("V-L", {4, 5, 6, 0}),
+    ("ma", {1}),
+    ("", set(range(7))),
+    (None, set(range(7))),
+])
+def test_parsear_dias(crudo, dias):
+    assert parsear_dias(crudo) == dias
+
+
+@pytest.mark.parametrize("crudo", ["feriados", "lunes a", "8", "lunes-fin"])
+def test_parsear_dias_rechaza_lo_ilegible(crudo):
+    with pytest.raises(DiasInvalidos):
+        parsear_dias(crudo)
+
+
+def test_normalizar():
+    assert normalizar("Zona 10") == normalizar("zona  10.") == "10"
+    assert normalizar("MIXCÓ") == "mixco"
+
+
+async def _indice(*zonas: dict) -> IndiceCobertura:
+    async with SessionLocal() as db:
+        db.add_all(CoberturaZona(permite_recoleccion=True, **z) for z in zonas)
+        await db.commit()
+        indice = IndiceCobertura(recarga_segundos=3600)
+        await indice.asegurar(db)
+    return indice
+
+
+async def test_gana_la_regla_mas_especifica_y_el_comodin(bd):
+    indice = await _indice(
+        {"departamento": "Guatemala", "dias_habiles": "Lunes a Viernes"},
+        {"departamento": "Guatemala", "municipio": "Guatemala", "zona": "10", "limite_valor": Decimal("500"),
+         "horario_inicio": time(9), "horario_fin": time(17), "riesgo": "bajo"},
+    )
+    assert indice.configurado
+    assert indice.verificar("GUATEMALA", "Mixco", momento=LUNES).permitido
+    assert indice.verificar("Guatemala", "Mixco", momento=SABADO).motivo == "Día no hábil para recolección en la zona"
+
+    zona10 = indice.verificar("Guatemala", "Guatemala", "Zona 10", valor=Decimal("100"), momento=SABADO)
+    assert zona10.permitido and zona10.riesgo == "bajo"
+    assert not indice.verificar("Guatemala", "Guatemala", "10", valor=Decimal("600"), momento=LUNES).permitido
+    assert not indice.verificar("Guatemala", "Guatemala", "10", momento=LUNES.replace(hour=18)).permitido
+    assert indice.verificar_texto("Calle 5, zona 10, Guatemala, Guatemala", momento=LUNES).id_zona == zona10.id_zona
+    assert indice.verificar("Petén", momento=LUNES).motivo == "Dirección fuera de las zonas de cobertura"
+
+
+async def test_dias_ilegibles_dejan_la_zona_sin_dias(bd, caplog):
+    indice = await _indice({"departamento": "Escuintla", "dias_habiles": "feriados"})
+    assert indice.verificar("Escuintla", momento=LUNES).motivo == "Día no hábil para recolección en la zona"
+    assert "feriados" in caplog.text
+
+
+async def test_cambios_en_zonas_invalidan_al_confirmar(bd):
+    generacion = indice_cobertura.estadisticas()["generacion"]
+    async with SessionLocal() as db:
+        db.add(CoberturaZona(departamento="Sacatepéquez", permite_recoleccion=True))
+        await db.flush()
+        assert indice_cobertura.estadisticas()["generacion"] == generacion
+        await db.rollback()
+        assert indice_cobertura.estadisticas()["generacion"] == generacion
+
+        db.add(CoberturaZona(departamento="Sacatepéquez", permite_recoleccion=True))
+        await db.commit()
+    assert indice_cobertura.estadisticas()["generacion"] == generacion + 1
@@ -0,0 +1,28 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.db.database import SessionLocal
+from app.services.cobranza import _paradas_vencidas
+
+pytestmark = pytest.mark.anyio
+
+HOY = date(2026, 3, 15)
+
+
+async def test_paradas_incluyen_prestamos_vencidos_sin_cuotas(crear_prestamo):
+    con_cuota = await crear_prestamo([(date(2026, 3, 1), Decimal("100.00"))])
+    sin_cuotas = await crear_prestamo(deuda=Decimal("300.00"), inicio=date(2026, 3, 1))
+    sin_cuotas_vigente = await crear_prestamo(deuda=Decimal("300.00"), inicio=date(2026, 4, 1))
+    sin_cuotas_liquidado = await crear_prestamo(deuda=Decimal("0.00"), inicio=date(2026, 3, 1))
+    await crear_prestamo([(date(2026, 4, 1), Decimal("100.00"))])
+    await crear_prestamo(deuda=Decimal("300.00"), inicio=date(2026, 3, 1), estado="pagado")
+
+    async with SessionLocal() as db:
+        paradas, sin_ubicacion = await _paradas_vencidas(db, HOY)
+
+    # Sin GPS de visita ni de recepción todos quedan sin ubicación
+    assert paradas == []
+    assert sin_ubicacion == [con_cuota, sin_cuotas]
+    assert sin_cuotas_vigente not in sin_ubicacion and sin_cuotas_liquidado not in sin_ubicacion
@@ -0,0 +1,185 @@
+import io
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.db.database import SessionLocal
+from app.db.models.pago import Pago
+from app.db.models.prestamo import Prestamo
+from app.services import conciliacion
+from app.services.catalogos import catalogos
+from app.services.conciliacion import ExtractoInvalido, LectorExtracto, _clasificar, _PagoIndexado
+from app.services.pagos import PagoIn, registrar_pago
+
+pytestmark = pytest.mark.anyio
+
+DIA = date(2026, 5, 10)
+
+
+def _leer(contenido: bytes, delimitador: str = ",") -> list[tuple]:
+    lector = LectorExtracto(io.BytesIO(contenido), delimitador)
+    filas = []
+    while bloque := lector.bloque(2):
+        filas.extend(bloque)
+    return filas
+
+
+def test_lector_con_bom_crlf_y_columnas_en_otro_orden():
+    contenido = "﻿Monto , Referencia,FECHA\r\n1,234.50,SPEI-1,2026-05-10\r\n\r\n".encode()
+    contenido = contenido.replace(b"1,234.50", b'"1,234.50"')
+    assert _leer(contenido) == [(2, "SPEI-1", Decimal("1234.50"), DIA, None)]
+
+
+def test_lector_punto_y_coma_con_coma_decimal_y_errores_por_linea():
+    contenido = (
+        "fecha;referencia;monto\n"
+        "10/05/2026;A;99,90\n"
+        "2026-13-01;B;1\n"
+        ";;\n"
+        "2026-05-10;;5\n"
+        "2026-05-10;C\n"
+        "2026-05-10;D;doce\n"
+    ).encode()
+    filas = _leer(contenido, ";")
+    assert filas[0] == (2, "A", Decimal("99.90"), DIA, None)
+    assert [(n, e) for n, *_, e in filas[1:]] == [
+        (3, "fecha inválida: '2026-13-01'"),
+        (5, "referencia vacía"),
+        (6, "faltan columnas"),
+        (7, "monto inválido: 'doce'"),
+    ]
+
+
+def test_lector_corta_bloques_de_bytes_a_mitad_de_linea_y_de_caracter(monkeypatch):
+    monkeypatch.setattr(conciliacion, "BLOQUE_BYTES", 3)
+    contenido = 'fecha,referencia,monto\r\n2026-05-10,"Ñandú, 1",5\r\n2026-05-10,ÁÉ,6'.encode()
+    assert _leer(contenido) == [
+        (2, "Ñandú, 1", Decimal("5.00"), DIA, None),
+        (3, "ÁÉ", Decimal("6.00"), DIA, None),
+    ]
+
+
+def test_lector_rechaza_encabezado_incompleto():
+    with pytest.raises(ExtractoInvalido, match="monto"):
+        LectorExtracto(io.BytesIO(b"fecha,referencia\n2026-05-10,A\n"))
+
+
+def test_lector_rechaza_bytes_que_no_son_utf8():
+    with pytest.raises(UnicodeDecodeError):
+        _leer("fecha,referencia,monto\n2026-05-10,Peña,1\n".encode("latin-1"))
+
+
+def _pago(monto: str, dia: int, pendiente: bool = True) -> _PagoIndexado:
+    return _PagoIndexado(1, Decimal(monto), date(2026, 5, dia), pendiente)
+
+
+def test_clasificar():
+    assert _clasificar(None, Decimal("10"), DIA, 3) == ("huerfana", None)
+    pago = _pago("10.00", 12)
+    assert _clasificar([pago], Decimal("10.00"), DIA, 3) == ("conciliado", pago)
+    assert _clasificar([pago], Decimal("10.00"), DIA, 1)[0] == "fecha_distinta"
+    assert _clasificar([pago], Decimal("11.00"), DIA, 3)[0] == "monto_distinto"
+    assert _clasificar([_pago("10.00", 10, pendiente=False)], Decimal("10.00"), DIA, 0)[0] == "ya_validado"
+    pago.conciliado = True
+    assert _clasificar([pago], Decimal("10.00"), DIA, 3) == ("duplicada", pago)
+
+
+def test_clasificar_prefiere_el_pago_libre_con_el_mismo_monto():
+    usado, otro_monto, libre = _pago("10.00", 10), _pago("12.00", 10), _pago("10.00", 11)
+    usado.conciliado = True
+    assert _clasificar([usado, otro_monto, libre], Decimal("10.00"), DIA, 3) == ("conciliado", libre)
+
+
+async def _crear_pagos(id_prestamo: int, id_validador: int, pagos: list[tuple[str, str, str]]) -> list[int]:
+    estados = catalogos().estado_pago
+    async with SessionLocal() as db:
+        nuevos = [
+            Pago(
+                id_prestamo=id_prestamo,
+                id_estado=estados.id(estado),
+                id_validador=id_validador,
+                fecha_pago=datetime(2026, 5, 10, 12),
+                monto=Decimal(monto),
+                ref_bancaria=ref,
+            )
+            for ref, monto, estado in pagos
+        ]
+        db.add_all(nuevos)
+        await db.commit()
+        return [p.id_pago for p in nuevos]
+
+
+async def test_subida_multipart_concilia_pagos_pendientes(cliente, crear_prestamo, crear_usuario):
+    id_prestamo = await crear_prestamo([(date(2026, 6, 1), Decimal("500.00"))])
+    id_usuario, cabeceras = await crear_usuario("pago.conciliar")
+    ids = await _crear_pagos(id_prestamo, id_usuario, [
+        ("SPEI-1", "100.00", "pendiente"),
+        ("SPEI-2", "50.00", "validado"),
+        ("SPEI-3", "70.00", "pendiente"),
+        ("SPEI-4", "10.00", "pendiente"),
+    ])
+    extracto = (
+        "﻿fecha,referencia,monto\r\n"
+        "2026-05-10,SPEI-1,100.00\r\n"
+        "2026-05-11,SPEI-2,50.00\r\n"
+        "2026-05-10,SPEI-3,75.00\r\n"
+        "2026-05-10,SPEI-1,100.00\r\n"
+        "2026-05-10,SPEI-9,1.00\r\n"
+        "2026-05-10,COMISION,-5.00\r\n"
+    ).encode()
+
+    r = await cliente.post(
+        "/pagos/conciliacion",
+        params={"desde": "2026-05-10"},
+        files={"extracto": ("extracto.csv", extracto, "text/csv")},
+        headers=cabeceras,
+    )
+
+    assert r.status_code == 200, r.text
+    reporte = r.json()
+    assert reporte["lineas"] == 6 and reporte["ignoradas"] == 1
+    assert {c: n for c, n in reporte["conteos"].items() if n} == {
+        "conciliado": 1, "ya_validado": 1, "monto_distinto": 1, "duplicada": 1, "huerfana": 1,
+    }
+    assert reporte["actualizados"] == 1
+    assert reporte["sin_extracto"] == 2
+    async with SessionLocal() as db:
+        estados = dict((await db.execute(select(Pago.id_pago, Pago.id_estado).where(Pago.id_pago.in_(ids)))).all())
+        deuda = (await db.get(Prestamo, id_prestamo)).deuda_actual
+    validado, pendiente = catalogos().estado_pago.id("validado"), catalogos().estado_pago.id("pendiente")
+    assert [estados[i] for i in ids] == [validado, validado, pendiente, pendiente]
+    # El conciliado se aplicó al préstamo, no solo cambió de estado
+    assert deuda == Decimal("400.00")
+
+
+async def test_conciliado_no_queda_como_duplicado_sin_aplicar(crear_prestamo, crear_usuario):
+    id_prestamo = await crear_prestamo([(date(2026, 6, 1), Decimal("80.00"))])
+    id_usuario, _ = await crear_usuario()
+    ok, excede = await _crear_pagos(id_prestamo, id_usuario, [
+        ("SPEI-1", "30.00", "pendiente"),
+        ("SPEI-2", "90.00", "pendiente"),
+    ])
+    extracto = "fecha,referencia,monto\n2026-05-10,SPEI-1,30.00\n2026-05-10,SPEI-2,90.00\n".encode()
+
+    async with SessionLocal() as db:
+        reporte = await conciliacion.conciliar(db, io.BytesIO(extracto), DIA)
+        # Caja registra después el mismo depósito: es el pago ya aplicado, no se cobra dos veces
+        repetido = await registrar_pago(db, PagoIn(id_prestamo, Decimal("30.00"), id_usuario, ref_bancaria="SPEI-1"))
+
+    assert reporte.actualizados == 1
+    assert [d["id_pago"] for d in reporte.detalle["no_aplicado"]] == [excede]
+    assert repetido.duplicado and repetido.id_pago == ok and repetido.deuda_actual == Decimal("50.00")
+
+
+async def test_subida_con_encabezado_incompleto_responde_400(cliente, crear_usuario):
+    _, cabeceras = await crear_usuario("pago.conciliar")
+    r = await cliente.post(
+        "/pagos/conciliacion",
+        params={"desde": "2026-05-10"},
+        files={"extracto": ("extracto.csv", b"fecha,monto\n", "text/csv")},
+        headers=cabeceras,
+    )
+    assert r.status_code == 400
+    assert "referencia" in r.json()["detail"]
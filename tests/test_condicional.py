@@ -0,0 +1,74 @@
+import pytest
+
+from app.api.condicional import coincide, etag_de
+from app.db.database import SessionLocal
+from app.db.models.solicitud import Solicitud
+from app.services import versiones
+from app.services.catalogos import catalogos
+
+pytestmark = pytest.mark.anyio
+
+MIS = "/solicitudes/solicitudes/mis"
+
+
+def test_etag_depende_de_las_partes():
+    assert etag_de("mis", 1, 3) == etag_de("mis", 1, 3)
+    assert etag_de("mis", 1, 3) != etag_de("mis", 1, 4)
+    assert etag_de("mis").startswith('W/"')
+
+
+@pytest.mark.parametrize("cabecera, esperado", [
+    (None, False),
+    ('W/"abc"', True),
+    ('"abc"', True),
+    ('"x", W/"abc"', True),
+    ("*", True),
+    ('"otro"', False),
+])
+def test_coincide_compara_en_forma_debil(cabecera, esperado):
+    assert coincide(cabecera, 'W/"abc"') is esperado
+
+
+async def test_tocar_crea_el_contador_y_luego_lo_incrementa(bd):
+    async with SessionLocal() as db:
+        assert await versiones.version(db, "prueba", 7) == 0
+        await versiones.tocar(db, "prueba", {7})
+        await versiones.tocar(db, "prueba", {7, 8})
+        await db.commit()
+        assert await versiones.version(db, "prueba", 7) == 2
+        assert await versiones.version(db, "prueba", 8) == 1
+
+
+async def test_catalogos_responde_304_con_el_mismo_etag(cliente, crear_usuario):
+    _, cabeceras = await crear_usuario()
+    r = await cliente.get("/catalogos", headers=cabeceras)
+    assert r.status_code == 200
+    etag = r.headers["ETag"]
+    assert r.headers["Cache-Control"] == "private, max-age=300"
+
+    r = await cliente.get("/catalogos", headers={**cabeceras, "If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.headers["ETag"] == etag
+    assert r.content == b""
+
+
+async def test_mis_solicitudes_cambia_de_etag_al_crear_una(cliente, crear_usuario):
+    id_usuario, cabeceras = await crear_usuario()
+    r = await cliente.get(MIS, headers=cabeceras)
+    assert r.status_code == 200 and r.json() == []
+    etag = r.headers["ETag"]
+
+    r = await cliente.get(MIS, headers={**cabeceras, "If-None-Match": etag})
+    assert r.status_code == 304
+
+    # El evento de mapper sube la versión del usuario en la misma transacción
+    async with SessionLocal() as db:
+        db.add(Solicitud(
+            id_usuario=id_usuario, id_estado=catalogos().estado_solicitud.id("pendiente"), metodo_entrega="sucursal"
+        ))
+        await db.commit()
+
+    r = await cliente.get(MIS, headers={**cabeceras, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert len(r.json()) == 1
+    assert r.headers["ETag"] != etag
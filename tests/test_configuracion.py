@@ -0,0 +1,97 @@
+import asyncio
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import update
+
+from app.db.database import SessionLocal
+from app.db.models.configuraciones_generales import ConfiguracionesGenerales
+from app.services.configuracion import Configuracion, parametro_de
+
+pytestmark = pytest.mark.anyio
+
+
+async def _configurar(*filas: tuple) -> None:
+    """Filas (clave, valor, vigente_desde, vigente_hasta)."""
+    async with SessionLocal() as db:
+        db.add_all(
+            ConfiguracionesGenerales(clave=c, valor=v, vigente_desde=d, vigente_hasta=h) for c, v, d, h in filas
+        )
+        await db.commit()
+
+
+async def _cargada(intervalo: float = 60) -> Configuracion:
+    config = Configuracion(intervalo_segundos=intervalo)
+    async with SessionLocal() as db:
+        await config.cargar(db)
+    return config
+
+
+def test_parametro_de_quita_el_sufijo():
+    assert parametro_de("TASA_MORA_DIARIA@2027") == parametro_de(" TASA_MORA_DIARIA") == "TASA_MORA_DIARIA"
+
+
+async def test_tipos_y_filas_invalidas(bd, caplog):
+    await _configurar(
+        ("TASA_MORA_DIARIA", "0.0015", None, None),
+        ("CRON_TAMANO_LOTE", "250", None, None),
+        ("MENSAJE_BIENVENIDA", "Hola", None, None),
+        ("TASA_INTERES_DIARIA", "dos por mil", None, None),
+    )
+    config = await _cargada()
+
+    assert config.valor("TASA_MORA_DIARIA") == Decimal("0.0015")
+    assert config.valor("CRON_TAMANO_LOTE") == 250
+    assert config.valor("MENSAJE_BIENVENIDA") == "Hola"
+    # La fila mal escrita se ignora y se usa settings
+    assert config.valor("TASA_INTERES_DIARIA") == Decimal("0.0020")
+    assert "TASA_INTERES_DIARIA" in caplog.text
+    assert config.valor("NO_EXISTE", defecto=7) == 7
+    assert config.estadisticas()["parametros"] == 3
+
+
+async def test_ventanas_de_vigencia(bd):
+    await _configurar(
+        ("TASA_MORA_DIARIA", "0.0010", None, datetime(2026, 7, 1)),
+        ("TASA_MORA_DIARIA@2026-07", "0.0020", datetime(2026, 7, 1), datetime(2026, 8, 1)),
+        ("TASA_MORA_DIARIA@2026-09", "0.0030", datetime(2026, 9, 1), None),
+    )
+    config = await _cargada()
+
+    assert config.valor("TASA_MORA_DIARIA", date(2026, 6, 30)) == Decimal("0.0010")
+    # Vigente_hasta es exclusivo
+    assert config.valor("TASA_MORA_DIARIA", datetime(2026, 7, 1)) == Decimal("0.0020")
+    # Entre ventanas no hay valor vigente: cae a settings
+    assert config.valor("TASA_MORA_DIARIA", date(2026, 8, 15)) == Decimal("0.0010")
+    assert config.valor("TASA_MORA_DIARIA", date(2030, 1, 1)) == Decimal("0.0030")
+
+    resolver = config.resolvedor("TASA_MORA_DIARIA")
+    assert [resolver(date(2026, m, 15)) for m in (6, 7, 8, 9)] == [
+        Decimal("0.0010"), Decimal("0.0020"), Decimal("0.0010"), Decimal("0.0030"),
+    ]
+    assert config.resolvedor("CRON_TAMANO_LOTE")(date(2026, 7, 1)) == 5000
+    assert config.vigentes(date(2026, 8, 15)) == {}
+
+
+async def test_recarga_periodica(bd):
+    await _configurar(("CRON_TAMANO_LOTE", "100", None, None))
+    config = Configuracion(intervalo_segundos=0.05)
+    await config.iniciar(SessionLocal)
+    try:
+        assert config.valor("CRON_TAMANO_LOTE") == 100
+        resolver = config.resolvedor("CRON_TAMANO_LOTE")
+        async with SessionLocal() as db:
+            await db.execute(update(ConfiguracionesGenerales).values(valor="200"))
+            await db.commit()
+
+        for _ in range(100):
+            if config.valor("CRON_TAMANO_LOTE") == 200:
+                break
+            await asyncio.sleep(0.02)
+        assert config.valor("CRON_TAMANO_LOTE") == 200
+        # Un resolvedor ya entregado sigue atado a su instantánea
+        assert resolver(date.today()) == 100
+    finally:
+        await config.detener()
+    assert config._tarea is None
@@ -0,0 +1,98 @@
+import asyncio
+import hashlib
+import json
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db.database import SessionLocal
+from app.db.models.articulo import Articulo
+from app.db.models.contrato import Contrato
+from app.db.models.prestamo import Prestamo
+from app.db.models.solicitud import Solicitud
+from app.db.models.user import User
+from app.services import contratos
+from app.utils.almacen import almacen
+
+pytestmark = pytest.mark.anyio
+
+DATOS = {
+    "numero": "00000001", "cliente": "Ana", "correo": "ana@prueba.mx", "telefono": "-", "direccion": "-",
+    "monto": "1,000.00", "fecha_inicio": "2026-01-01", "fecha_vencimiento": "2026-03-01",
+    "tipo_articulo": "joyeria", "articulo": "Anillo", "valor_avaluo": "2,000.00",
+    "cuotas": [{"numero": 1, "fecha_venc": "2026-02-01", "monto": "500.00"}],
+}
+
+
+def test_render_es_determinista_y_usa_los_datos():
+    texto = "\n".join(t for _, t, _ in contratos.lineas_contrato(DATOS))
+    assert "Ana" in texto and "500.00" in texto
+    primero, segundo = contratos.renderizar(DATOS), contratos.renderizar(DATOS)
+    assert primero.sha256 == segundo.sha256
+    assert almacen.ruta(primero.relativa).read_bytes().startswith(b"%PDF")
+    assert contratos.renderizar({**DATOS, "cliente": "Otra"}).sha256 != primero.sha256
+
+
+@pytest.fixture
+async def contrato(cliente, crear_prestamo, crear_usuario):
+    """Préstamo con contrato emitido; devuelve (id_prestamo, hash_doc, cabeceras con contrato.ver)."""
+    id_prestamo = await crear_prestamo([])
+    async with SessionLocal() as db:
+        prestamo = await db.get(Prestamo, id_prestamo)
+        (await db.get(Articulo, prestamo.id_articulo)).valor_estimado = Decimal("2000.00")
+        await db.commit()
+    _, emisor = await crear_usuario("contrato.emitir")
+    r = await cliente.post(f"/prestamos/{id_prestamo}/contrato", headers=emisor)
+    assert r.status_code == 200 and r.json()["nuevo"] is True
+    _, lector = await crear_usuario("contrato.ver")
+    return id_prestamo, r.json()["hash_doc"], lector
+
+
+async def _contratos(id_prestamo: int) -> int:
+    async with SessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(Contrato).where(Contrato.id_prestamo == id_prestamo))
+
+
+async def test_descarga_con_etag(cliente, contrato):
+    id_prestamo, hash_doc, cabeceras = contrato
+    r = await cliente.get(f"/prestamos/{id_prestamo}/contrato", headers=cabeceras)
+    assert r.status_code == 200
+    assert hashlib.sha256(r.content).hexdigest() == hash_doc
+    r = await cliente.get(f"/prestamos/{id_prestamo}/contrato", headers={**cabeceras, "If-None-Match": f'"{hash_doc}"'})
+    assert r.status_code == 304
+
+
+async def test_sin_el_pdf_en_el_nodo_regenera_el_documento_emitido(cliente, contrato):
+    id_prestamo, hash_doc, cabeceras = contrato
+    almacen.eliminar(almacen.relativa(contratos.COLECCION, hash_doc, ".pdf"))
+    # Los datos actuales del cliente cambiaron después de firmar
+    async with SessionLocal() as db:
+        id_usuario = await db.scalar(
+            select(Solicitud.id_usuario).join(Articulo).join(Prestamo).where(Prestamo.id_prestamo == id_prestamo)
+        )
+        (await db.get(User, id_usuario)).Nombre = "Nombre nuevo"
+        await db.commit()
+
+    respuestas = await asyncio.gather(
+        *(cliente.get(f"/prestamos/{id_prestamo}/contrato", headers=cabeceras) for _ in range(2))
+    )
+
+    assert [r.status_code for r in respuestas] == [200, 200]
+    assert {hashlib.sha256(r.content).hexdigest() for r in respuestas} == {hash_doc}
+    # Una lectura nunca emite otro contrato
+    assert await _contratos(id_prestamo) == 1
+
+
+async def test_si_no_se_puede_reconstruir_identico_responde_503(cliente, contrato):
+    id_prestamo, hash_doc, cabeceras = contrato
+    almacen.eliminar(almacen.relativa(contratos.COLECCION, hash_doc, ".pdf"))
+    async with SessionLocal() as db:
+        fila = await db.scalar(select(Contrato).where(Contrato.id_prestamo == id_prestamo))
+        fila.datos = json.dumps({**json.loads(fila.datos), "monto": "1.00"})
+        await db.commit()
+
+    r = await cliente.get(f"/prestamos/{id_prestamo}/contrato", headers=cabeceras)
+
+    assert r.status_code == 503
+    assert await _contratos(id_prestamo) == 1
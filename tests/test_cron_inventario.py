@@ -0,0 +1,99 @@
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.db.database import SessionLocal
+from app.db.models.configuraciones_generales import ConfiguracionesGenerales
+from app.db.models.inventario_venta import InventarioVenta
+from app.db.models.prestamo import Prestamo
+from app.db.models.venta import Venta
+from app.services.catalogos import catalogos
+from app.tasks.cron_inventario import cargar_curvas, revalorizar_inventario
+
+pytestmark = pytest.mark.anyio
+
+HOY = date(2026, 6, 30)
+
+
+def test_cargar_curvas_ordena_y_agrega_default():
+    curvas = cargar_curvas('{"3": [[0, 1], [60, "0.8"], [30, 0.9]]}')
+    assert curvas == {"3": [(60, 0.8), (30, 0.9), (0, 1.0)], "default": []}
+
+
+@pytest.fixture
+def crear_inventario(crear_prestamo):
+    """Pone en venta el artículo de un préstamo nuevo; devuelve (id_inventario, id_usuario)."""
+    async def crear(dias: int, tipo: str = "joyeria") -> tuple[int, int]:
+        id_prestamo = await crear_prestamo(tipo=tipo)
+        async with SessionLocal() as db:
+            prestamo = await db.get(Prestamo, id_prestamo)
+            fila = InventarioVenta(
+                id_articulo=prestamo.id_articulo,
+                id_estado=catalogos().estado_inventario.id("disponible"),
+                precio_base=Decimal("100.00"),
+                precio_actual=Decimal("100.00"),
+                dias_en_bodega=0,
+                fecha_ingreso=HOY - timedelta(days=dias),
+            )
+            db.add(fila)
+            await db.commit()
+            return fila.id_inventario, prestamo.id_usuario_evaluador
+
+    return crear
+
+
+async def _inventario() -> dict[int, tuple[Decimal, int]]:
+    async with SessionLocal() as db:
+        filas = (await db.execute(select(
+            InventarioVenta.id_inventario, InventarioVenta.precio_actual, InventarioVenta.dias_en_bodega
+        ))).all()
+    return {i: (p, d) for i, p, d in filas}
+
+
+async def test_curva_por_omision_y_vendidos_intactos(crear_inventario):
+    # La curva sale de settings: {"default": [[0, 1.0], [30, 0.9], [60, 0.8], [90, 0.7], [180, 0.5]]}
+    ids = [(await crear_inventario(dias))[0] for dias in (0, 29, 30, 65, 200)]
+    vendido, comprador = await crear_inventario(200)
+    async with SessionLocal() as db:
+        db.add(Venta(id_inventario=vendido, id_comprador=comprador, precio_final=Decimal("100.00"), fecha_venta=HOY))
+        await db.commit()
+
+    resumen = await revalorizar_inventario(HOY, tamano_lote=2)
+
+    assert resumen.filas == 5 and resumen.lotes == 3
+    inventario = await _inventario()
+    assert [inventario[i] for i in ids] == [
+        (Decimal("100.00"), 0), (Decimal("100.00"), 29), (Decimal("90.00"), 30),
+        (Decimal("80.00"), 65), (Decimal("50.00"), 200),
+    ]
+    assert inventario[vendido] == (Decimal("100.00"), 0)
+
+
+async def test_curva_por_tipo_desde_configuracion(crear_inventario):
+    joyeria = catalogos().tipo_articulo.id("joyeria")
+    async with SessionLocal() as db:
+        db.add(ConfiguracionesGenerales(
+            clave="CURVA_REBAJA_INVENTARIO",
+            valor=json.dumps({"default": [[30, 0.5]], str(joyeria): [[10, 0.9]]}),
+        ))
+        await db.commit()
+    joya_nueva, _ = await crear_inventario(5)
+    joya_vieja, _ = await crear_inventario(40)
+    equipo_nuevo, _ = await crear_inventario(5, tipo="electronica")
+    equipo_viejo, _ = await crear_inventario(40, tipo="electronica")
+
+    assert (await revalorizar_inventario(HOY, dry_run=True)).filas == 4
+    assert {p for p, _ in (await _inventario()).values()} == {Decimal("100.00")}
+
+    await revalorizar_inventario(HOY)
+    precios = {i: p for i, (p, _) in (await _inventario()).items()}
+    # El tipo con curva propia no cae en "default" aunque supere sus umbrales
+    assert precios == {
+        joya_nueva: Decimal("100.00"),
+        joya_vieja: Decimal("90.00"),
+        equipo_nuevo: Decimal("100.00"),
+        equipo_viejo: Decimal("50.00"),
+    }
@@ -0,0 +1,96 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models.prestamo import Prestamo
+from app.db.models.prestamo_movimiento import PrestamoMovimiento
+from app.services import cartera
+from app.tasks.cron_prestamos import calcular_devengo, calcular_mora_cuotas, devengar_cartera
+
+pytestmark = pytest.mark.anyio
+
+INTERES = Decimal("0.002")
+MORA = Decimal("0.001")
+
+
+def test_devengo_solo_los_dias_pendientes():
+    assert calcular_devengo(
+        Decimal("1000"), date(2026, 1, 1), date(2026, 3, 1), date(2026, 1, 10), date(2026, 1, 15), INTERES, MORA
+    ) == (5, Decimal("10.00"), Decimal("0.00"))
+
+
+def test_devengo_mora_solo_despues_del_vencimiento():
+    assert calcular_devengo(
+        Decimal("1000"), date(2026, 1, 1), date(2026, 1, 10), None, date(2026, 1, 13), INTERES, MORA
+    ) == (12, Decimal("24.00"), Decimal("3.00"))
+
+
+@pytest.mark.parametrize("capital, ultimo, dias", [
+    (Decimal("1000"), date(2026, 1, 15), 0),
+    (Decimal("1000"), date(2026, 1, 20), 0),
+    (Decimal("0"), date(2026, 1, 10), 5),
+])
+def test_devengo_sin_dias_o_sin_capital(capital, ultimo, dias):
+    assert calcular_devengo(
+        capital, date(2026, 1, 1), date(2026, 3, 1), ultimo, date(2026, 1, 15), INTERES, MORA
+    ) == (dias, Decimal("0.00"), Decimal("0.00"))
+
+
+def test_mora_de_cuotas_cuenta_desde_cada_vencimiento():
+    vencidas = [(date(2026, 1, 5), Decimal("100.00")), (date(2026, 1, 12), Decimal("50.00"))]
+    # 100 × 5 días (10..15) + 50 × 3 días (12..15)
+    assert calcular_mora_cuotas(vencidas, date(2026, 1, 10), date(2026, 1, 15), MORA) == Decimal("0.65")
+    assert calcular_mora_cuotas(vencidas, date(2026, 1, 1), date(2026, 1, 5), MORA) == Decimal("0.00")
+
+
+async def _prestamo(id_prestamo: int) -> Prestamo:
+    async with SessionLocal() as db:
+        return await db.get(Prestamo, id_prestamo)
+
+
+async def test_devengo_no_cobra_interes_dos_veces_a_prestamos_con_cuotas(crear_prestamo, monkeypatch):
+    monkeypatch.setattr(settings, "TASA_INTERES_DIARIA", INTERES)
+    monkeypatch.setattr(settings, "TASA_MORA_DIARIA", MORA)
+    inicio = date(2026, 1, 1)
+    sin_cuotas = await crear_prestamo(deuda=Decimal("1000.00"), inicio=inicio)
+    con_cuotas = await crear_prestamo(
+        [(date(2026, 1, 21), Decimal("300.00")), (date(2026, 2, 21), Decimal("300.00"))], inicio=inicio
+    )
+    async with SessionLocal() as db:
+        await cartera.reconstruir(db, inicio)
+
+    resumen = await devengar_cartera(date(2026, 1, 31))
+
+    assert resumen.prestamos == 2
+    p = await _prestamo(sin_cuotas)
+    # 30 días de interés sobre 1000; vence el mismo día que inicia, así que también 30 de mora
+    assert (p.interes_acumulada, p.mora_acumulada, p.deuda_actual) == (
+        Decimal("60.00"), Decimal("30.00"), Decimal("1090.00")
+    )
+    p = await _prestamo(con_cuotas)
+    # Sin interés ordinario; mora de 10 días sobre la primera cuota vencida
+    assert (p.interes_acumulada, p.mora_acumulada, p.deuda_actual) == (
+        Decimal("0.00"), Decimal("3.00"), Decimal("603.00")
+    )
+    async with SessionLocal() as db:
+        tipos = (await db.execute(
+            select(PrestamoMovimiento.tipo).where(PrestamoMovimiento.id_prestamo == con_cuotas)
+        )).scalars().all()
+        assert tipos == ["MORA"]
+        # La cartera ya refleja la deuda nueva sin reconstruir
+        saldos = [f["saldo"] for f in await cartera.consultar(db)]
+    assert sum(saldos) == Decimal("1693.00")
+
+    # Correr otra vez el mismo día no devenga nada
+    assert (await devengar_cartera(date(2026, 1, 31))).prestamos == 0
+
+
+async def test_dry_run_no_escribe(crear_prestamo):
+    id_prestamo = await crear_prestamo(deuda=Decimal("500.00"))
+    resumen = await devengar_cartera(date(2026, 2, 1), dry_run=True)
+    assert resumen.prestamos == 1 and resumen.interes_total > 0
+    assert (await _prestamo(id_prestamo)).deuda_actual == Decimal("500.00")
@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import inspect
+
+from app.db.esquema import migraciones, migrar, pendientes, sentencias
+
+pytestmark = pytest.mark.anyio
+
+
+def test_sentencias_ignora_comentarios_y_separa_por_linea(tmp_path):
+    archivo = tmp_path / "001_prueba.sql"
+    archivo.write_text(
+        "-- comentario\nCREATE INDEX a ON `T` (`X`);\n\nUPDATE `T`\nSET `X` = ';'\nWHERE 1;\n",
+        encoding="utf-8",
+    )
+    assert sentencias(archivo) == ["CREATE INDEX a ON `T` (`X`)", "UPDATE `T`\nSET `X` = ';'\nWHERE 1"]
+
+
+def test_migraciones_numeradas():
+    nombres = [m.name for m in migraciones()]
+    assert nombres
+    assert all(n[:3].isdigit() and n[3] == "_" for n in nombres)
+
+
+async def test_esquema_nuevo_no_tiene_migraciones_pendientes(bd):
+    assert await pendientes(bd) == []
+    assert await migrar(bd) == []
+
+
+async def test_migrar_aplica_y_registra_los_archivos_pendientes(bd):
+    async with bd.begin() as conn:
+        await conn.exec_driver_sql("DROP INDEX ix_solicitud_usuario_fecha")
+        await conn.exec_driver_sql("DELETE FROM Migracion_Esquema WHERE Nombre = '008_solicitud_indice.sql'")
+
+    assert [m.name for m in await pendientes(bd)] == ["008_solicitud_indice.sql"]
+    assert await migrar(bd) == ["008_solicitud_indice.sql"]
+    assert await pendientes(bd) == []
+    async with bd.connect() as conn:
+        indices = await conn.run_sync(lambda c: inspect(c).get_indexes("Solicitud"))
+    assert "ix_solicitud_usuario_fecha" in {i["name"] for i in indices}
+
+
+async def test_migracion_de_versiones_siembra_un_contador_por_usuario(bd, crear_usuario):
+    ids = [(await crear_usuario())[0] for _ in range(2)]
+    async with bd.begin() as conn:
+        await conn.exec_driver_sql("DROP TABLE Version_Recurso")
+        await conn.exec_driver_sql("DELETE FROM Migracion_Esquema WHERE Nombre = '020_version_recurso.sql'")
+
+    assert await migrar(bd) == ["020_version_recurso.sql"]
+    async with bd.connect() as conn:
+        filas = set((await conn.exec_driver_sql("SELECT Recurso, Clave, Version FROM Version_Recurso")).all())
+    assert filas == {("menu", 0, 1)} | {("solicitudes", i, 1) for i in ids}
@@ -0,0 +1,76 @@
+import io
+import os
+import time
+
+import pytest
+from PIL import Image
+
+from app.db.database import SessionLocal
+from app.db.models.articulo_foto import ArticuloFoto
+from app.db.models.prestamo import Prestamo
+from app.services.fotos import COLECCION
+from app.tasks.cron_fotos import barrer_fotos
+from app.utils.almacen import almacen
+
+pytestmark = pytest.mark.anyio
+
+HACE_DOS_DIAS = time.time() - 2 * 24 * 3600
+
+
+def _png(color: tuple[int, int, int]) -> bytes:
+    salida = io.BytesIO()
+    Image.new("RGB", (8, 8), color).save(salida, "PNG")
+    return salida.getvalue()
+
+
+def _guardar_viejo(contenido: bytes, sufijo: str = ".png") -> str:
+    guardado = almacen.guardar_bloques([contenido], COLECCION, sufijo)
+    os.utime(almacen.ruta(guardado.relativa), (HACE_DOS_DIAS, HACE_DOS_DIAS))
+    return guardado.relativa
+
+
+async def _id_articulo(id_prestamo: int) -> int:
+    async with SessionLocal() as db:
+        return (await db.get(Prestamo, id_prestamo)).id_articulo
+
+
+async def test_subida_fallida_no_borra_lo_que_ya_guardo(cliente, crear_prestamo, crear_usuario):
+    id_articulo = await _id_articulo(await crear_prestamo())
+    _, cabeceras = await crear_usuario("articulo.subir_fotos")
+    valida = _png((1, 2, 3))
+    r = await cliente.post(
+        f"/articulos/{id_articulo}/fotos",
+        files=[("fotos", ("a.png", valida, "image/png")), ("fotos", ("b.png", b"no es imagen", "image/png"))],
+        headers=cabeceras,
+    )
+    assert r.status_code == 400
+    # Otra subida concurrente del mismo contenido podría estar usándolo: queda para el barrido
+    assert almacen.existe(almacen.guardar_bloques([valida], COLECCION, ".png").relativa)
+
+
+async def test_barrido_borra_solo_huerfanas_viejas(crear_prestamo):
+    id_articulo = await _id_articulo(await crear_prestamo())
+    referenciada = _guardar_viejo(_png((10, 0, 0)))
+    variante = _guardar_viejo(b"variante", "_1600.jpg")
+    huerfana = _guardar_viejo(_png((20, 0, 0)))
+    reciente = almacen.guardar_bloques([_png((30, 0, 0))], COLECCION, ".png").relativa
+    async with SessionLocal() as db:
+        db.add(ArticuloFoto(id_articulo=id_articulo, url=almacen.url(referenciada), orden=1))
+        await db.commit()
+
+    resumen = await barrer_fotos(gracia_segundos=3600, dry_run=True)
+    assert resumen.huerfanas >= 2 and almacen.existe(huerfana)
+
+    await barrer_fotos(gracia_segundos=3600)
+    assert almacen.existe(referenciada) and almacen.existe(reciente)
+    assert not almacen.existe(huerfana) and not almacen.existe(variante)
+
+
+async def test_deduplicar_renueva_la_gracia(bd):
+    contenido = _png((40, 0, 0))
+    relativa = _guardar_viejo(contenido)
+    # Una subida en curso reutiliza el archivo y todavía no hace commit de su Articulo_Foto
+    assert not almacen.guardar_bloques([contenido], COLECCION, ".png").nuevo
+
+    await barrer_fotos(gracia_segundos=3600)
+    assert almacen.existe(relativa)
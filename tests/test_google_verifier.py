@@ -0,0 +1,146 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt
+from google.auth import jwt as google_jwt
+
+from app.services.google_verifier import CertificadosNoDisponibles, VerificadorGoogle
+
+pytestmark = pytest.mark.anyio
+
+AUDIENCIA = "cliente-de-prueba.apps.googleusercontent.com"
+KID = "llave-1"
+MAX_AGE = 600
+
+
+def _llave_y_certificado() -> tuple[str, str]:
+    llave = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    nombre = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "prueba")])
+    ahora = datetime.now(timezone.utc)
+    certificado = (
+        x509.CertificateBuilder()
+        .subject_name(nombre)
+        .issuer_name(nombre)
+        .public_key(llave.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(ahora - timedelta(days=1))
+        .not_valid_after(ahora + timedelta(days=1))
+        .sign(llave, hashes.SHA256())
+    )
+    pem_llave = llave.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    return pem_llave.decode(), certificado.public_bytes(serialization.Encoding.PEM).decode()
+
+
+class _ServidorCerts:
+    """Sustituto local de https://www.googleapis.com/oauth2/v1/certs."""
+
+    def __init__(self, certs: dict[str, str]):
+        self.certs = certs
+        self.caido = False
+        self.descargas = 0
+        servidor = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                servidor.descargas += 1
+                if servidor.caido:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                cuerpo = json.dumps(servidor.certs).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", f"public, max-age={MAX_AGE}")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, *args):
+                pass
+
+        self._http = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+        self.url = f"http://127.0.0.1:{self._http.server_port}/certs"
+        threading.Thread(target=self._http.serve_forever, daemon=True).start()
+
+    def cerrar(self):
+        self._http.shutdown()
+        self._http.server_close()
+
+
+@pytest.fixture(scope="module")
+def llaves():
+    return _llave_y_certificado()
+
+
+@pytest.fixture
+def servidor(llaves):
+    s = _ServidorCerts({KID: llaves[1]})
+    yield s
+    s.cerrar()
+
+
+def _token(llave: str, kid: str = KID) -> str:
+    ahora = int(time.time())
+    datos = {"iss": "https://accounts.google.com", "aud": AUDIENCIA, "sub": "123",
+             "email": "ana@prueba.mx", "iat": ahora, "exp": ahora + 300}
+    return google_jwt.encode(crypt.RSASigner.from_string(llave, kid), datos).decode()
+
+
+def _envejecer(verificador: VerificadorGoogle, segundos: float) -> None:
+    verificador._obtenidos_en -= segundos
+    if verificador._fallo_en is not None:
+        verificador._fallo_en -= segundos
+
+
+async def test_verifica_con_los_certificados_descargados(servidor, llaves):
+    verificador = VerificadorGoogle(servidor.url, AUDIENCIA)
+    assert (await verificador.verificar(_token(llaves[0])))["email"] == "ana@prueba.mx"
+    assert (await verificador.verificar(_token(llaves[0])))["sub"] == "123"
+    # max-age respetado: una sola descarga
+    assert servidor.descargas == 1
+
+
+async def test_certificados_vencidos_sirven_durante_la_gracia(servidor, llaves):
+    verificador = VerificadorGoogle(servidor.url, AUDIENCIA, gracia=3600, espera_reintento=30)
+    await verificador.refrescar()
+    servidor.caido = True
+    _envejecer(verificador, MAX_AGE + 10)
+
+    assert (await verificador.verificar(_token(llaves[0])))["sub"] == "123"
+    # El fallo se recuerda: la siguiente verificación no vuelve a descargar
+    await verificador.verificar(_token(llaves[0]))
+    assert servidor.descargas == 2
+
+    # Google vuelve: pasada la espera se renuevan
+    servidor.caido = False
+    _envejecer(verificador, 31)
+    await verificador.verificar(_token(llaves[0]))
+    assert servidor.descargas == 3 and verificador._vigentes()
+
+
+async def test_pasada_la_gracia_no_hay_certificados(servidor, llaves):
+    verificador = VerificadorGoogle(servidor.url, AUDIENCIA, gracia=3600)
+    await verificador.refrescar()
+    servidor.caido = True
+    _envejecer(verificador, MAX_AGE + 3600 + 1)
+    with pytest.raises(CertificadosNoDisponibles):
+        await verificador.verificar(_token(llaves[0]))
+
+
+async def test_llave_desconocida_con_google_caido_no_es_503(servidor, llaves):
+    verificador = VerificadorGoogle(servidor.url, AUDIENCIA, gracia=3600)
+    await verificador.refrescar()
+    servidor.caido = True
+    _envejecer(verificador, 60)
+    with pytest.raises(ValueError, match="desconocida"):
+        await verificador.verificar(_token(llaves[0], kid="otra"))
@@ -0,0 +1,40 @@
+import pytest
+
+from app.services.salud import monitor_salud
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_live_no_depende_de_la_bd(cliente):
+    r = await cliente.get("/health/live")
+    assert r.status_code == 200
+    assert r.json() == {"status": "ok"}
+
+
+async def test_ready_con_la_bd_disponible(cliente):
+    r = await cliente.get("/health/ready")
+    assert r.status_code == 200
+    cuerpo = r.json()
+    assert cuerpo["listo"] is True
+    assert cuerpo["engines"]["primario"]["ok"] is True
+
+
+async def test_health_legado(cliente):
+    r = await cliente.get("/health")
+    assert r.status_code == 200
+    assert r.json() == {"status": "ok - conectado a BD"}
+
+
+async def test_health_legado_sigue_a_ready(cliente):
+    # Con la BD respondiendo, apagar basta para que ambos dejen de estar listos
+    monitor_salud.apagar()
+    r = await cliente.get("/health")
+    assert r.status_code == 503
+    assert r.json() == {"status": "error - apagando"}
+
+
+async def test_ready_deja_de_estar_listo_al_apagar(cliente):
+    monitor_salud.apagar()
+    r = await cliente.get("/health/ready")
+    assert r.status_code == 503
+    assert r.json()["motivo"] == "apagando"
@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import select
+
+from app.db.database import SessionLocal
+from app.db.models.modulo import Modulo
+from app.utils import insercion
+from app.utils.insercion import insertar_con_ids
+
+pytestmark = pytest.mark.anyio
+
+
+async def _insertar(n: int) -> list[tuple[int, str]]:
+    filas = [{"nombre": f"m{i}", "ruta": f"/m{i}"} for i in range(n)]
+    async with SessionLocal() as db:
+        ids = await insertar_con_ids(db, Modulo, filas)
+        await db.commit()
+        nombres = dict((await db.execute(
+            select(Modulo.id_modulo, Modulo.nombre).where(Modulo.id_modulo.in_(ids))
+        )).all())
+    return [(i, nombres[i]) for i in ids]
+
+
+async def test_lista_vacia_no_inserta(bd):
+    async with SessionLocal() as db:
+        assert await insertar_con_ids(db, Modulo, []) == []
+
+
+async def test_returning_devuelve_los_ids_en_el_orden_de_las_filas(bd, monkeypatch):
+    monkeypatch.setattr(insercion, "TAMANO_BLOQUE", 2)
+    insertados = await _insertar(5)
+    assert [nombre for _, nombre in insertados] == [f"m{i}" for i in range(5)]
+    assert len({i for i, _ in insertados}) == 5
+
+
+async def test_sin_returning_ni_mysql_inserta_fila_por_fila(bd, monkeypatch):
+    async with SessionLocal() as db:
+        dialecto = db.bind.dialect
+    monkeypatch.setattr(dialecto, "insert_executemany_returning_sort_by_parameter_order", False)
+    insertados = await _insertar(3)
+    assert [nombre for _, nombre in insertados] == ["m0", "m1", "m2"]
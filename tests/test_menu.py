@@ -0,0 +1,95 @@
+import pytest
+from sqlalchemy import select
+
+from app.db.database import SessionLocal
+from app.db.models.menu import Menu
+from app.db.models.modulo import Modulo
+from app.db.models.rol_menu import RolMenu
+from app.db.models.roles import Rol
+from app.db.models.usuario_rol import UsuarioRol
+from app.services.menus import arboles_menu
+
+pytestmark = pytest.mark.anyio
+
+
+async def _menus() -> dict:
+    """Prestamos > (Cartera, Cobranza), Config > Usuarios, y un menú de un módulo inactivo."""
+    async with SessionLocal() as db:
+        activo = Modulo(nombre="prestamos", ruta="/prestamos", activo=True)
+        inactivo = Modulo(nombre="viejo", ruta="/viejo", activo=False)
+        cajero, admin = Rol(nombre="cajero", activo=True), Rol(nombre="admin", activo=True)
+        db.add_all([activo, inactivo, cajero, admin])
+        await db.flush()
+        prestamos = Menu(id_modulo=activo.id_modulo, etiqueta="Préstamos", orden=1)
+        config = Menu(id_modulo=activo.id_modulo, etiqueta="Configuración", orden=2)
+        db.add_all([prestamos, config])
+        await db.flush()
+        cobranza = Menu(id_modulo=activo.id_modulo, id_padre=prestamos.id_menu, etiqueta="Cobranza", orden=2)
+        cartera = Menu(id_modulo=activo.id_modulo, id_padre=prestamos.id_menu, etiqueta="Cartera", orden=1)
+        usuarios = Menu(id_modulo=activo.id_modulo, id_padre=config.id_menu, etiqueta="Usuarios", orden=1)
+        oculto = Menu(id_modulo=inactivo.id_modulo, etiqueta="Viejo", orden=3)
+        db.add_all([cobranza, cartera, usuarios, oculto])
+        await db.flush()
+        db.add_all([RolMenu(id_rol=cajero.id_rol, id_menu=m.id_menu) for m in (cobranza, cartera, oculto)])
+        db.add_all([RolMenu(id_rol=admin.id_rol, id_menu=m.id_menu) for m in (config, usuarios)])
+        await db.commit()
+        return {"cajero": cajero.id_rol, "admin": admin.id_rol, "cartera": cartera.id_menu}
+
+
+def _etiquetas(nodos: list[dict]) -> list:
+    return [(n["etiqueta"], _etiquetas(n["hijos"])) if n["hijos"] else n["etiqueta"] for n in nodos]
+
+
+async def test_arbol_por_roles_arrastra_ancestros_y_respeta_el_orden(bd):
+    ids = await _menus()
+    async with SessionLocal() as db:
+        cajero = await arboles_menu.arbol_para(db, frozenset({ids["cajero"]}))
+        ambos = await arboles_menu.arbol_para(db, frozenset({ids["cajero"], ids["admin"]}))
+        sin_roles = await arboles_menu.arbol_para(db, frozenset())
+
+    # El padre no está asignado al rol pero cuelga a sus hijos; el módulo inactivo no aparece
+    assert _etiquetas(cajero) == [("Préstamos", ["Cartera", "Cobranza"])]
+    assert _etiquetas(ambos) == [("Préstamos", ["Cartera", "Cobranza"]), ("Configuración", ["Usuarios"])]
+    assert sin_roles == []
+
+
+async def test_cambios_en_menus_se_ven_tras_el_commit(bd):
+    ids = await _menus()
+    roles = frozenset({ids["cajero"]})
+    async with SessionLocal() as db:
+        assert await arboles_menu.arbol_para(db, roles) is await arboles_menu.arbol_para(db, roles)
+
+        (await db.get(Menu, ids["cartera"])).etiqueta = "Cartera vencida"
+        await db.flush()
+        assert _etiquetas(await arboles_menu.arbol_para(db, roles)) == [("Préstamos", ["Cartera", "Cobranza"])]
+        await db.commit()
+
+        db.add(RolMenu(id_rol=ids["cajero"], id_menu=await db.scalar(
+            select(Menu.id_menu).where(Menu.etiqueta == "Usuarios")
+        )))
+        await db.flush()
+        await db.rollback()
+        assert _etiquetas(await arboles_menu.arbol_para(db, roles)) == [
+            ("Préstamos", ["Cartera vencida", "Cobranza"]),
+        ]
+
+
+async def test_endpoint_responde_304_hasta_que_cambia_el_menu(cliente, crear_usuario):
+    ids = await _menus()
+    id_usuario, cabeceras = await crear_usuario()
+    async with SessionLocal() as db:
+        db.add(UsuarioRol(id_usuario=id_usuario, id_rol=ids["cajero"]))
+        await db.commit()
+
+    r = await cliente.get("/menu", headers=cabeceras)
+    assert r.status_code == 200 and _etiquetas(r.json()) == [("Préstamos", ["Cartera", "Cobranza"])]
+    etag = r.headers["ETag"]
+    assert (await cliente.get("/menu", headers={**cabeceras, "If-None-Match": etag})).status_code == 304
+
+    async with SessionLocal() as db:
+        await db.delete(await db.get(RolMenu, (ids["cajero"], ids["cartera"])))
+        await db.commit()
+
+    r = await cliente.get("/menu", headers={**cabeceras, "If-None-Match": etag})
+    assert r.status_code == 200 and r.headers["ETag"] != etag
+    assert _etiquetas(r.json()) == [("Préstamos", ["Cobranza"])]
@@ -0,0 +1,136 @@
+import asyncio
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db.database import SessionLocal
+from app.db.models.cuota import Cuota
+from app.db.models.pago import Pago
+from app.db.models.prestamo import Prestamo
+from app.services.catalogos import catalogos
+from app.services.pagos import PagoConflicto, PagoIn, abonar_cuotas, registrar_pago, repartir
+
+pytestmark = pytest.mark.anyio
+
+CUOTAS = [(date(2026, 2, 1), Decimal("100.00")), (date(2026, 3, 1), Decimal("100.00"))]
+
+
+def test_repartir_cubre_mora_interes_y_capital_en_orden():
+    assert repartir(Decimal("50"), Decimal("10"), Decimal("15")) == (Decimal("10"), Decimal("15"), Decimal("25"))
+    assert repartir(Decimal("12"), Decimal("10"), Decimal("15")) == (Decimal("10"), Decimal("2"), Decimal("0"))
+
+
+def test_abonar_cuotas_acumula_abonos_parciales():
+    cuotas = [Cuota(numero=n, monto=Decimal("100.00"), abonado=Decimal("0.00"), pagada=0) for n in (1, 2)]
+    assert abonar_cuotas(cuotas, Decimal("60.00")) == []
+    assert abonar_cuotas(cuotas, Decimal("60.00")) == [1]
+    assert [c.abonado for c in cuotas] == [Decimal("100.00"), Decimal("20.00")]
+    assert abonar_cuotas(cuotas[1:], Decimal("0.00"), saldar=True) == [2]
+
+
+async def _estado(id_prestamo: int) -> tuple[Decimal, int, int]:
+    async with SessionLocal() as db:
+        prestamo = await db.get(Prestamo, id_prestamo)
+        pagos = await db.scalar(select(func.count()).select_from(Pago).where(Pago.id_prestamo == id_prestamo))
+        return prestamo.deuda_actual, prestamo.id_estado, pagos
+
+
+async def _pagar(pago: PagoIn):
+    async with SessionLocal() as db:
+        return await registrar_pago(db, pago)
+
+
+async def test_reintento_con_la_misma_clave_no_aplica_dos_veces(crear_prestamo, crear_usuario):
+    id_prestamo = await crear_prestamo(CUOTAS)
+    cajero, _ = await crear_usuario()
+    pago = PagoIn(id_prestamo, Decimal("120.00"), cajero, clave_idempotencia="caja-1")
+
+    primero = await _pagar(pago)
+    segundo = await _pagar(pago)
+
+    assert not primero.duplicado and primero.cuotas_pagadas == [1]
+    assert segundo.duplicado and segundo.id_pago == primero.id_pago
+    assert segundo.aplicado == primero.aplicado
+    assert await _estado(id_prestamo) == (Decimal("80.00"), catalogos().estado_prestamo.id("activo"), 1)
+
+
+async def test_clave_explicita_no_coincide_por_referencia(crear_prestamo, crear_usuario):
+    id_prestamo = await crear_prestamo(CUOTAS)
+    cajero, _ = await crear_usuario()
+    primero = await _pagar(PagoIn(id_prestamo, Decimal("50.00"), cajero, ref_bancaria="SPEI-9", clave_idempotencia="a"))
+    segundo = await _pagar(PagoIn(id_prestamo, Decimal("50.00"), cajero, ref_bancaria="SPEI-9", clave_idempotencia="b"))
+
+    assert not segundo.duplicado and segundo.id_pago != primero.id_pago
+    assert (await _estado(id_prestamo))[0] == Decimal("100.00")
+
+
+async def test_sin_clave_la_referencia_bancaria_hace_de_clave(crear_prestamo, crear_usuario):
+    id_prestamo = await crear_prestamo(CUOTAS)
+    cajero, _ = await crear_usuario()
+    pago = PagoIn(id_prestamo, Decimal("50.00"), cajero, ref_bancaria="SPEI-10")
+    primero = await _pagar(pago)
+    assert (await _pagar(pago)).id_pago == primero.id_pago
+
+    with pytest.raises(PagoConflicto):
+        await _pagar(PagoIn(id_prestamo, Decimal("70.00"), cajero, ref_bancaria="SPEI-10"))
+
+
+async def test_registrar_aplica_el_pendiente_con_la_misma_referencia(crear_prestamo, crear_usuario):
+    id_prestamo = await crear_prestamo(CUOTAS)
+    cajero, _ = await crear_usuario()
+    async with SessionLocal() as db:
+        reportado = Pago(
+            id_prestamo=id_prestamo, id_estado=catalogos().estado_pago.id("pendiente"), id_validador=cajero,
+            fecha_pago=datetime(2026, 2, 1), monto=Decimal("50.00"), ref_bancaria="SPEI-11",
+        )
+        db.add(reportado)
+        await db.commit()
+
+    resultado = await _pagar(PagoIn(id_prestamo, Decimal("50.00"), cajero, ref_bancaria="SPEI-11"))
+
+    assert not resultado.duplicado and resultado.id_pago == reportado.id_pago
+    assert await _estado(id_prestamo) == (Decimal("150.00"), catalogos().estado_prestamo.id("activo"), 1)
+    assert (await _pagar(PagoIn(id_prestamo, Decimal("50.00"), cajero, ref_bancaria="SPEI-11"))).duplicado
+
+
+async def test_pago_total_salda_el_prestamo(crear_prestamo, crear_usuario):
+    id_prestamo = await crear_prestamo(CUOTAS, interes=Decimal("15.00"))
+    cajero, _ = await crear_usuario()
+    resultado = await _pagar(PagoIn(id_prestamo, Decimal("200.00"), cajero))
+
+    assert resultado.aplicado == {"mora": Decimal("0.00"), "interes": Decimal("15.00"), "capital": Decimal("185.00")}
+    assert resultado.cuotas_pagadas == [1, 2]
+    assert await _estado(id_prestamo) == (Decimal("0.00"), catalogos().estado_prestamo.id("pagado"), 1)
+
+
+async def test_monto_mayor_que_la_deuda(crear_prestamo, crear_usuario):
+    id_prestamo = await crear_prestamo(CUOTAS)
+    cajero, _ = await crear_usuario()
+    with pytest.raises(ValueError):
+        await _pagar(PagoIn(id_prestamo, Decimal("200.01"), cajero))
+
+
+async def test_dos_reintentos_simultaneos_registran_un_solo_pago(crear_prestamo, crear_usuario):
+    id_prestamo = await crear_prestamo(CUOTAS)
+    cajero, _ = await crear_usuario()
+    pago = PagoIn(id_prestamo, Decimal("30.00"), cajero, clave_idempotencia="movil-7")
+
+    resultados = await asyncio.gather(*(_pagar(pago) for _ in range(2)))
+
+    assert len({r.id_pago for r in resultados}) == 1
+    assert sorted(r.duplicado for r in resultados) == [False, True]
+    assert (await _estado(id_prestamo))[0::2] == (Decimal("170.00"), 1)
+
+
+async def test_endpoint_responde_201_y_luego_200(cliente, crear_prestamo, crear_usuario):
+    id_prestamo = await crear_prestamo(CUOTAS)
+    _, cabeceras = await crear_usuario("pago.registrar")
+    cabeceras["Idempotency-Key"] = "web-1"
+
+    r = await cliente.post(f"/prestamos/{id_prestamo}/pagos", json={"monto": "40.00"}, headers=cabeceras)
+    assert r.status_code == 201
+    r2 = await cliente.post(f"/prestamos/{id_prestamo}/pagos", json={"monto": "40.00"}, headers=cabeceras)
+    assert r2.status_code == 200
+    assert r2.json()["duplicado"] is True and r2.json()["id_pago"] == r.json()["id_pago"]
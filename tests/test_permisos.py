@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import select
+
+from app.db.database import SessionLocal, get_read_db
+from app.db.models.roles import Rol
+from app.db.models.usuario_permiso import UsuarioPermiso
+from app.main import app
+from app.services.permisos import resolver_permisos
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_tiene_usa_el_indice_con_que_se_compilaron_los_permisos(crear_usuario):
+    id_usuario, _ = await crear_usuario("prestamo.aprobar")
+    async with SessionLocal() as db:
+        permisos = await resolver_permisos.permisos_de(db, id_usuario)
+        # Otra petición cambia Rol_Permiso entre permisos_de y tiene
+        resolver_permisos.invalidar()
+        assert resolver_permisos.tiene(permisos, "prestamo.aprobar")
+        assert not resolver_permisos.tiene(permisos, "contrato.ver")
+
+        recompilados = await resolver_permisos.permisos_de(db, id_usuario)
+    assert recompilados.generacion == permisos.generacion + 1
+    assert resolver_permisos.tiene(recompilados, "prestamo.aprobar")
+
+
+async def test_require_responde_403_sin_el_permiso(cliente, crear_usuario):
+    _, cabeceras = await crear_usuario()
+    r = await cliente.post("/pagos/conciliacion", params={"desde": "2026-05-10"}, headers=cabeceras,
+                           files={"extracto": ("e.csv", b"fecha,referencia,monto\n", "text/csv")})
+    assert r.status_code == 403
+    assert "pago.conciliar" in r.json()["detail"]
+
+
+async def test_exportar_resuelve_permisos_sin_la_replica(cliente, crear_usuario):
+    async def replica_caida():
+        raise AssertionError("los permisos no se leen de la réplica")
+        yield
+
+    otro, _ = await crear_usuario()
+    _, cabeceras = await crear_usuario()
+    app.dependency_overrides[get_read_db] = replica_caida
+    try:
+        r = await cliente.get("/solicitudes/solicitudes/exportar", params={"id_usuario": otro}, headers=cabeceras)
+    finally:
+        app.dependency_overrides.pop(get_read_db)
+    assert r.status_code == 403
+
+
+async def test_invalida_al_confirmar_no_al_escribir(crear_usuario):
+    id_usuario, _ = await crear_usuario("prestamo.aprobar")
+
+    async def puede() -> bool:
+        async with SessionLocal() as lector:
+            return resolver_permisos.tiene(await resolver_permisos.permisos_de(lector, id_usuario), "prestamo.aprobar")
+
+    async with SessionLocal() as escritor:
+        fila = await escritor.scalar(select(UsuarioPermiso).where(UsuarioPermiso.id_usuario == id_usuario))
+        fila.decision = "DENY"
+        await escritor.flush()
+        # Otra petición entre el flush y el commit cachea lo que sigue vigente
+        assert await puede()
+        await escritor.commit()
+    assert not await puede()
+
+
+async def test_rollback_no_invalida(bd):
+    generacion = resolver_permisos.estadisticas()["generacion"]
+    async with SessionLocal() as db:
+        db.add(Rol(nombre="temporal", activo=True))
+        await db.flush()
+        await db.rollback()
+    assert resolver_permisos.estadisticas()["generacion"] == generacion
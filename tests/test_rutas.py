@@ -0,0 +1,66 @@
+import random
+
+from app.services import rutas
+
+CELDA = 0.01
+
+
+def _paradas(n: int, semilla: int = 7) -> list[rutas.Parada]:
+    azar = random.Random(semilla)
+    return [(i, 14.55 + azar.random() * 0.1, -90.55 + azar.random() * 0.1) for i in range(n)]
+
+
+def test_parsear_gps():
+    assert rutas.parsear_gps("14.6, -90.5") == (14.6, -90.5)
+    assert rutas.parsear_gps("14.6;-90.5") == (14.6, -90.5)
+    assert rutas.parsear_gps("norte") is None
+    assert rutas.parsear_gps("95,0") is None
+    assert rutas.parsear_gps(None) is None
+
+
+def test_grilla_halla_la_mas_cercana_aunque_este_en_otra_celda():
+    paradas = _paradas(200)
+    grilla = rutas.Grilla(paradas, CELDA)
+    origen = (-1, 14.6001, -90.4999)
+    esperada = min(paradas, key=lambda q: rutas.distancia_km(origen, q))
+    assert grilla.mas_cercana(origen) == esperada
+    # Muy lejos de todo: cae al barrido completo
+    assert grilla.mas_cercana((-2, 0.0, 0.0)) == min(paradas, key=lambda q: rutas.distancia_km((-2, 0.0, 0.0), q))
+
+
+def test_agrupar_reparte_parejo_y_por_zonas():
+    oeste = [(i, 14.60 + i * 0.001, -90.60) for i in range(6)]
+    este = [(10 + i, 14.60 + i * 0.001, -90.40) for i in range(6)]
+    grupos = rutas.agrupar(oeste + este, 2, CELDA)
+    assert [len(g) for g in grupos] == [6, 6]
+    assert {frozenset(p[0] for p in g) for g in grupos} == {frozenset(p[0] for p in oeste), frozenset(p[0] for p in este)}
+
+    tamanos = [len(g) for g in rutas.agrupar(_paradas(103), 4, CELDA)]
+    assert sum(tamanos) == 103 and max(tamanos) - min(tamanos) <= 1
+    assert rutas.agrupar([], 3, CELDA) == [] and rutas.agrupar(oeste, 0, CELDA) == []
+
+
+def test_vecino_mas_cercano_recorre_una_linea_en_orden():
+    linea = [(i, 14.6, -90.6 + i * 0.002) for i in range(20)]
+    revuelta = random.Random(1).sample(linea, len(linea))
+    assert rutas.vecino_mas_cercano(revuelta, CELDA) == linea
+
+
+def test_dos_opt_deshace_cruces_y_nunca_empeora():
+    # Zig-zag que se cruza consigo mismo: 2-opt lo vuelve la línea recta
+    linea = [(i, 14.6, -90.6 + i * 0.01) for i in range(6)]
+    cruzada = [linea[0], linea[3], linea[2], linea[1], linea[4], linea[5]]
+    assert rutas.dos_opt(cruzada) == linea
+
+    paradas = _paradas(150)
+    inicial = rutas.vecino_mas_cercano(paradas, CELDA)
+    mejorada = rutas.dos_opt(inicial, limite_segundos=5)
+    assert sorted(mejorada) == sorted(paradas)
+    assert rutas.longitud_km(mejorada) <= rutas.longitud_km(inicial)
+
+
+def test_planificar_visita_cada_parada_una_vez():
+    paradas = _paradas(60)
+    recorridos = rutas.planificar(paradas, 3, CELDA, limite_segundos=1)
+    assert len(recorridos) == 3
+    assert sorted(p for r in recorridos for p in r) == sorted(paradas)
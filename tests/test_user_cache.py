@@ -0,0 +1,42 @@
+import pytest
+
+from app.db.database import SessionLocal
+from app.db.models.user import User
+from app.services.user_cache import cache_usuarios
+
+pytestmark = pytest.mark.anyio
+
+MIS = "/solicitudes/solicitudes/mis"
+
+
+async def test_invalida_solo_al_confirmar(cliente, crear_usuario):
+    id_usuario, cabeceras = await crear_usuario()
+    assert (await cliente.get(MIS, headers=cabeceras)).status_code == 200
+    assert cache_usuarios.obtener(id_usuario) is not None
+
+    async with SessionLocal() as db:
+        usuario = await db.get(User, id_usuario)
+        usuario.Token_version = 1
+        await db.flush()
+        # Hasta el commit otra petición leería la fila vieja: la entrada sigue
+        assert cache_usuarios.obtener(id_usuario) is not None
+        await db.commit()
+    assert cache_usuarios.obtener(id_usuario) is None
+
+    # El token con "ver": 0 quedó revocado
+    assert (await cliente.get(MIS, headers=cabeceras)).status_code == 401
+
+
+async def test_rollback_no_invalida(cliente, crear_usuario):
+    id_usuario, cabeceras = await crear_usuario()
+    assert (await cliente.get(MIS, headers=cabeceras)).status_code == 200
+
+    async with SessionLocal() as db:
+        usuario = await db.get(User, id_usuario)
+        usuario.Estado_Activo = False
+        await db.flush()
+        await db.rollback()
+        # Un commit posterior en la misma sesión no arrastra el cambio descartado
+        await db.commit()
+    assert cache_usuarios.obtener(id_usuario) is not None
+    assert (await cliente.get(MIS, headers=cabeceras)).status_code == 200